@@ -0,0 +1,30 @@
+"""
+ASGI entry point: serves the Flask app under uvicorn.
+
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT --workers 2
+
+The event loop accepts and parses connections, and each request runs the
+existing blueprints on a pool of ASGI_THREADS threads. Database calls
+(psycopg2) and bcrypt checks release the GIL while they wait, so a slow query
+holds one thread instead of a whole worker process. Size the connection pool
+to match: DB_POOL_SIZE + DB_MAX_OVERFLOW should cover ASGI_THREADS, otherwise
+requests queue on the pool (DB_POOL_TIMEOUT) instead of in the adapter.
+
+a2wsgi is preferred; without it uvicorn's built-in WSGI adapter is used.
+"""
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:  # pragma: no cover - optional dependency
+    from uvicorn.middleware.wsgi import WSGIMiddleware
+
+from main import app as flask_app
+
+threads = flask_app.config.get('ASGI_THREADS', 15)
+pool_capacity = flask_app.config.get('DB_POOL_SIZE', 5) + flask_app.config.get('DB_MAX_OVERFLOW', 10)
+if not flask_app.config.get('DB_PGBOUNCER', False) and pool_capacity < threads:
+    flask_app.logger.warning(
+        'ASGI_THREADS=%d exceeds the connection pool (%d connections): '
+        'requests will wait for a free connection', threads, pool_capacity
+    )
+
+app = WSGIMiddleware(flask_app, workers=threads)
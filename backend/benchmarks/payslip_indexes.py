@@ -0,0 +1,176 @@
+"""
+Query-plan benchmark for the payslip and contract indexes.
+
+Seeds a scratch PostgreSQL database with a large payslip history (1M rows by
+default) using generate_series, then runs EXPLAIN ANALYZE on the queries
+issued by the payslip listing, payroll runs, employee listing and dashboard,
+first without and then with the indexes declared on the models.
+
+Usage (against a throwaway database - the payslip/contract tables are wiped):
+    DATABASE_URL=postgresql://.../smartpay_bench python benchmarks/payslip_indexes.py --payslips 1000000
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.schema import CreateIndex  # noqa: E402
+from main import app  # noqa: E402
+from models import db  # noqa: E402
+from models.payslips import Payslips  # noqa: E402
+from models.contract import Contract  # noqa: E402
+
+INDEXED_TABLES = (Payslips.__table__, Contract.__table__)
+
+QUERIES = {
+    'payslip listing (year/month, newest first)': """
+        SELECT * FROM payslips WHERE pay_year = 2024 AND pay_month = 6
+        ORDER BY pay_year DESC, pay_month DESC, id DESC LIMIT 50
+    """,
+    'payslip listing (company + period)': """
+        SELECT * FROM payslips WHERE company_id = 3 AND pay_year = 2024 AND pay_month = 6
+        ORDER BY pay_year DESC, pay_month DESC, id DESC LIMIT 50
+    """,
+    'employee payslip history': """
+        SELECT * FROM payslips WHERE employee_id = 4242
+        ORDER BY pay_year DESC, pay_month DESC
+    """,
+    'payroll run: already paid this period': """
+        SELECT employee_id FROM payslips WHERE company_id = 3 AND pay_year = 2024 AND pay_month = 6
+    """,
+    'pending payslips count': """
+        SELECT count(*) FROM payslips WHERE status = 'pending'
+    """,
+    'latest contract per employee (page of 50)': """
+        SELECT * FROM contracts WHERE employee_id BETWEEN 1000 AND 1049
+        ORDER BY employee_id, created_at DESC, id DESC
+    """,
+    'dashboard: active contracts': """
+        SELECT count(*), sum(base_salary) FROM contracts
+        WHERE expiration_date IS NULL OR expiration_date >= CURRENT_DATE
+    """,
+}
+
+
+def seed(conn, payslips, employees, companies):
+    """Fill the scratch database with synthetic companies, employees, contracts and payslips."""
+    print(f"Seeding {companies} companies, {employees} employees, {payslips} payslips...")
+    conn.execute(text("TRUNCATE payslips, contracts, employees, companies RESTART IDENTITY CASCADE"))
+    conn.execute(text("""
+        INSERT INTO companies (company_name, fiscal_id, ice, cnss_number, address, phone, email, created_at, updated_at)
+        SELECT 'Company ' || g, 'FISCAL-' || g, 'ICE' || g, 'CNSS-C' || g, 'Address ' || g, '0600000000',
+               'company' || g || '@bench.local', now(), now()
+        FROM generate_series(1, :companies) g
+    """), {'companies': companies})
+    conn.execute(text("""
+        INSERT INTO employees (first_name, last_name, email, phone, address, city, zip, country, cin,
+                               cnss_number, amo_number, bank_account, status, created_at, updated_at)
+        SELECT 'First' || g, 'Last' || g, 'employee' || g || '@bench.local', '0600000000', 'Address',
+               'Casablanca', '20000', 'Morocco', 'CIN' || g, 'CNSS' || g, 'AMO' || g, 'BANK' || g, 'active', now(), now()
+        FROM generate_series(1, :employees) g
+    """), {'employees': employees})
+    # Two contracts per employee: an expired one and the current one
+    conn.execute(text("""
+        INSERT INTO contracts (employee_id, company_id, contract_type, hiring_date, expiration_date,
+                               position, department, base_salary, payments_status, created_at, updated_at)
+        SELECT e, 1 + e % :companies, 'CDD', DATE '2020-01-01', DATE '2021-12-31',
+               'Engineer', 'R&D', 8000, 'paid', TIMESTAMPTZ '2020-01-01', now()
+        FROM generate_series(1, :employees) e
+        UNION ALL
+        SELECT e, 1 + e % :companies, 'CDI', DATE '2022-01-01', NULL,
+               'Engineer', 'R&D', 9000 + e % 5000, 'pending', TIMESTAMPTZ '2022-01-01', now()
+        FROM generate_series(1, :employees) e
+    """), {'employees': employees, 'companies': companies})
+    # One payslip per employee and month, going back as many months as needed
+    conn.execute(text("""
+        INSERT INTO payslips (employee_id, company_id, pay_period_start, pay_period_end, pay_month, pay_year,
+                              base_salary, gross_salary, net_salary, total_cost, cnss_employee, cnss_employer,
+                              amo_employee, amo_employer, income_tax, other_deduction, total_deductions,
+                              status, generated_at, updated_at)
+        SELECT 1 + g % :employees, 1 + (1 + g % :employees) % :companies,
+               make_date(2025 - (g / :employees / 12)::int, 12 - (g / :employees % 12)::int, 1),
+               make_date(2025 - (g / :employees / 12)::int, 12 - (g / :employees % 12)::int, 28),
+               12 - (g / :employees % 12)::int, 2025 - (g / :employees / 12)::int,
+               9000, 9000, 7200, 11000, '268.80', '1158.30', '203.40', '370.80', 500, '{}', 1800,
+               CASE WHEN g % 20 = 0 THEN 'pending' ELSE 'paid' END, now(), now()
+        FROM generate_series(0, :payslips - 1) g
+    """), {'payslips': payslips, 'employees': employees, 'companies': companies})
+    conn.execute(text("ANALYZE companies, employees, contracts, payslips"))
+
+
+def drop_indexes(conn):
+    for table in INDEXED_TABLES:
+        for index in table.indexes:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    conn.execute(text("ANALYZE contracts, payslips"))
+
+
+def create_indexes(conn):
+    for table in INDEXED_TABLES:
+        for index in table.indexes:
+            # Compiled from the model, so unique indexes stay UNIQUE
+            conn.execute(CreateIndex(index, if_not_exists=True))
+    conn.execute(text("ANALYZE contracts, payslips"))
+
+
+def explain(conn, sql):
+    """Return (top plan node, execution ms, shared buffers read+hit) for a query."""
+    plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]
+
+    def scan_nodes(node):
+        nodes = [node['Node Type'] + (f" on {node['Index Name']}" if 'Index Name' in node else '')]
+        for child in node.get('Plans', []):
+            nodes.extend(scan_nodes(child))
+        return nodes
+
+    top = root['Plan']
+    buffers = top.get('Shared Hit Blocks', 0) + top.get('Shared Read Blocks', 0)
+    scans = [n for n in scan_nodes(top) if 'Scan' in n]
+    return ', '.join(scans) or top['Node Type'], root['Execution Time'], buffers
+
+
+def run(conn, label):
+    results = {}
+    for name, sql in QUERIES.items():
+        explain(conn, sql)  # warm the cache so both runs compare plans, not disk reads
+        results[name] = explain(conn, sql)
+    print(f"\n== {label} ==")
+    for name, (plan, ms, buffers) in results.items():
+        print(f"{name:45s} {ms:10.2f} ms {buffers:8d} buffers  {plan}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--payslips', type=int, default=1_000_000)
+    parser.add_argument('--employees', type=int, default=20_000)
+    parser.add_argument('--companies', type=int, default=50)
+    parser.add_argument('--skip-seed', action='store_true', help='Reuse the data already in the database')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            sys.exit("This benchmark needs a PostgreSQL DATABASE_URL")
+        db.create_all()
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            if not args.skip_seed:
+                seed(conn, args.payslips, args.employees, args.companies)
+            drop_indexes(conn)
+            before = run(conn, 'without indexes')
+            create_indexes(conn)
+            after = run(conn, 'with indexes')
+
+    print("\n== speedup ==")
+    for name in QUERIES:
+        speedup = before[name][1] / after[name][1] if after[name][1] else float('inf')
+        print(f"{name:45s} {speedup:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
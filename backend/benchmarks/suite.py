@@ -0,0 +1,398 @@
+"""
+Benchmark suite for the payroll math, model serializers and list endpoints.
+
+Groups:
+  math         compute_simulation, calculate_igr (cold and warm cache), the NumPy engine
+  serializers  to_dict() of every model, JSON encoding of a 100-payslip page
+  endpoints    list endpoints end to end through the Flask test client, against a
+               scratch database seeded with --employees x --months payslips
+
+Results are written as JSON (--output) and can be compared with a stored
+baseline: a benchmark whose median is more than --threshold slower than in
+the baseline is reported as a regression and the script exits with status 1.
+
+Usage:
+    python benchmarks/suite.py --save-baseline benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --output results.json
+    python benchmarks/suite.py --only math,serializers
+
+The endpoints group uses a temporary SQLite database unless --database-url
+points to a throwaway PostgreSQL database (its tables are created and filled).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+GROUPS = ('math', 'serializers', 'endpoints')
+
+
+def measure(fn, items=1, repeat=7, min_time=0.2):
+    """
+    Time `fn` and return per-item statistics.
+
+    `fn` is called in loops long enough to last about `min_time` seconds;
+    the median of `repeat` loops is reported.
+    """
+    fn()  # warm-up (imports, caches, connections)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1_000_000:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / (number * items))
+
+    median = statistics.median(samples)
+    return {
+        'median_us': round(median * 1e6, 3),
+        'min_us': round(min(samples) * 1e6, 3),
+        'ops_per_sec': round(1 / median, 1) if median else None,
+        'samples': repeat,
+        'loops': number,
+        'items': items,
+    }
+
+
+# ---------------------------------------------------------------- math
+
+def bench_math():
+    from utils.simulation import build_contribution_rates, build_simulation_input, compute_simulation
+    from utils.tax import _calculate_igr, calculate_igr
+    from utils.vectorized_simulation import calculate_igr_array, compute_simulation_vectorized
+    import numpy as np
+
+    rng = random.Random(42)
+    rates = build_contribution_rates()
+    inputs = [
+        build_simulation_input({
+            'employee_id': i,
+            'gross_salary': rng.uniform(3000, 60000),
+            'overtime_hours': rng.choice([0, 0, 5, 10]),
+            'bonuses': rng.choice([0, 500, 1000]),
+        })
+        for i in range(1000)
+    ]
+    incomes = [rng.uniform(0, 800000) for _ in range(1000)]
+    income_array = np.array(incomes)
+
+    def igr_cold():
+        _calculate_igr.cache_clear()
+        for income in incomes:
+            calculate_igr(income)
+
+    def igr_warm():
+        for income in incomes:
+            calculate_igr(income)
+
+    def simulation():
+        for sim_input in inputs:
+            compute_simulation(sim_input, rates)
+
+    return {
+        'math.compute_simulation': measure(simulation, items=len(inputs)),
+        'math.calculate_igr_cold': measure(igr_cold, items=len(incomes)),
+        'math.calculate_igr_warm': measure(igr_warm, items=len(incomes)),
+        'math.calculate_igr_array': measure(lambda: calculate_igr_array(income_array), items=len(incomes)),
+        'math.compute_simulation_vectorized': measure(
+            lambda: compute_simulation_vectorized(inputs, rates), items=len(inputs)
+        ),
+    }
+
+
+# ---------------------------------------------------------------- serializers
+
+def sample_instances():
+    """One representative, unsaved instance of every model."""
+    from models.company import Company
+    from models.contract import Contract
+    from models.contribution_rate import ContributionRate
+    from models.employee import Employee
+    from models.employer import Employer
+    from models.job import Job
+    from models.payroll_rollup import PayrollMonthlyRollup
+    from models.payslips import Payslips
+    from models.user import User
+
+    now = datetime.now(timezone.utc)
+    money = Decimal('12345.67')
+    return {
+        'company': Company(
+            id=1, company_name='Atlas SARL', fiscal_id='F1', ice='I1', cnss_number='C1', address='1 rue',
+            phone='0600000000', email='contact@atlas.ma', created_at=now, updated_at=now,
+        ),
+        'employee': Employee(
+            id=1, first_name='Salma', last_name='Idrissi', email='s@atlas.ma', phone='0600000000', address='1 rue',
+            city='Rabat', zip='10000', country='Morocco', cin='AB123', cnss_number='N1', amo_number='A1',
+            cimr_number=None, bank_account='B1', status='active', created_at=now, updated_at=now,
+        ),
+        'contract': Contract(
+            id=1, employee_id=1, company_id=1, contract_type='CDI', hiring_date=date(2022, 1, 1),
+            expiration_date=None, position='Engineer', department='R&D', base_salary=money,
+            payments_status='paid', payments_date=date(2025, 1, 31), created_at=now, updated_at=now,
+        ),
+        'payslip': Payslips(
+            id=1, employee_id=1, company_id=1, pay_period_start=date(2025, 1, 1), pay_period_end=date(2025, 1, 31),
+            pay_month=1, pay_year=2025, base_salary=money, gross_salary=money, net_salary=money, total_cost=money,
+            overtime_hours=Decimal('5'), overtime_rate=Decimal('1.5'), overtime_amount=money, bonus_amount=money,
+            commission_amount=money, transportation_allowance=money, housing_allowance=money, other_allowances=money,
+            cnss_employee='268.80', cnss_employer='1158.30', amo_employee='203.40', amo_employer='370.80',
+            cimr_employee='0', cimr_employer='0', income_tax=money, other_deduction={}, total_deductions=money,
+            status='paid', generated_at=now, updated_at=now,
+        ),
+        'user': User(id=1, email='admin@atlas.ma', role='admin', is_active=True, created_at=now, updated_at=now),
+        'employer': Employer(
+            id=1, company_id=1, first_name='Omar', last_name='Benali', email='o@atlas.ma', phone='0600000000',
+            address='1 rue', city='Rabat', zip='10000', country='Morocco', created_at=now, updated_at=now,
+        ),
+        'contribution_rate': ContributionRate(
+            id=1, name='CNSS Employee', rate=Decimal('4.48'), effective_date=now, description='CNSS',
+            created_at=now, updated_at=now,
+        ),
+        'job': Job(
+            id='a' * 32, job_type='payroll_run', status='completed', params={'company_id': 1}, progress_current=10,
+            progress_total=10, result={'created': 10}, created_at=now, started_at=now, finished_at=now,
+        ),
+        'payroll_rollup': PayrollMonthlyRollup(
+            company_id=1, pay_year=2025, pay_month=1, headcount=10, gross_total=money, net_total=money,
+            employer_cost=money, cnss_employee=money, cnss_employer=money, amo_employee=money, amo_employer=money,
+            cimr_employee=money, cimr_employer=money, income_tax=money, total_deductions=money, updated_at=now,
+        ),
+    }
+
+
+def bench_serializers(app):
+    results = {}
+    with app.app_context():
+        for name, instance in sample_instances().items():
+            results[f'serializers.{name}.to_dict'] = measure(instance.to_dict)
+
+        payslip = sample_instances()['payslip']
+        page = {'payslips': [payslip.to_dict() for _ in range(100)]}
+        results['serializers.payslip_page.json'] = measure(lambda: app.json.dumps(page), items=100)
+    return results
+
+
+# ---------------------------------------------------------------- endpoints
+
+def seed_database(app, employees, months, companies=5):
+    """Fill the scratch database with multi-row INSERTs; returns an admin Authorization header."""
+    from sqlalchemy import insert
+    from models import db
+    from models.company import Company
+    from models.contract import Contract
+    from models.employee import Employee
+    from models.payslips import Payslips
+    from models.user import User
+    from utils.jwt_utils import generate_token
+
+    now = datetime.now(timezone.utc)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(insert(Company), [
+            {'id': c, 'company_name': f'Company {c}', 'fiscal_id': f'F{c}', 'ice': f'I{c}', 'cnss_number': f'C{c}',
+             'address': 'Address', 'phone': '0600000000', 'email': f'company{c}@bench.local',
+             'created_at': now, 'updated_at': now}
+            for c in range(1, companies + 1)
+        ])
+        db.session.execute(insert(Employee), [
+            {'id': e, 'first_name': f'First{e}', 'last_name': f'Last{e}', 'email': f'employee{e}@bench.local',
+             'phone': '0600000000', 'address': 'Address', 'city': 'Casablanca', 'zip': '20000', 'country': 'Morocco',
+             'cin': f'CIN{e}', 'cnss_number': f'CNSS{e}', 'amo_number': f'AMO{e}', 'bank_account': f'BANK{e}',
+             'status': 'active', 'created_at': now, 'updated_at': now}
+            for e in range(1, employees + 1)
+        ])
+        db.session.execute(insert(Contract), [
+            {'employee_id': e, 'company_id': 1 + e % companies, 'contract_type': 'CDI', 'hiring_date': date(2022, 1, 1),
+             'position': 'Engineer', 'department': 'R&D', 'base_salary': 9000 + e % 5000,
+             'payments_status': 'pending', 'created_at': now, 'updated_at': now}
+            for e in range(1, employees + 1)
+        ])
+        batch = []
+        for month_index in range(months):
+            year, month = 2025 - month_index // 12, 12 - month_index % 12
+            for e in range(1, employees + 1):
+                batch.append({
+                    'employee_id': e, 'company_id': 1 + e % companies,
+                    'pay_period_start': date(year, month, 1), 'pay_period_end': date(year, month, 28),
+                    'pay_month': month, 'pay_year': year, 'base_salary': 9000, 'gross_salary': 9000,
+                    'net_salary': 7200, 'total_cost': 11000, 'cnss_employee': '268.80', 'cnss_employer': '1158.30',
+                    'amo_employee': '203.40', 'amo_employer': '370.80', 'income_tax': 500, 'other_deduction': {},
+                    'total_deductions': 1800, 'status': 'paid', 'generated_at': now, 'updated_at': now,
+                })
+                if len(batch) >= 5000:
+                    db.session.execute(insert(Payslips), batch)
+                    batch = []
+        if batch:
+            db.session.execute(insert(Payslips), batch)
+
+        admin = User(email='admin@bench.local', role='admin', is_active=True)
+        admin.set_password(secrets.token_hex(8))
+        db.session.add(admin)
+        db.session.commit()
+        return {'Authorization': f'Bearer {generate_token(admin)}'}
+
+
+ENDPOINTS = {
+    'payslips': '/api/payslips/?limit=100',
+    'payslips_cursor': '/api/payslips/?limit=100&cursor=',
+    'payslips_fields': '/api/payslips/?limit=100&fields=pay_month,pay_year,net_salary,status',
+    'payslips_deep_page': '/api/payslips/?limit=100&page=10',
+    'employees': '/api/employees/?limit=100',
+    'contracts': '/api/contracts/?limit=100',
+    'companies': '/api/companies/?limit=100',
+    'dashboard': '/api/dashboard/stats',
+}
+
+
+def bench_endpoints(app, headers):
+    client = app.test_client()
+    results = {}
+    for name, url in ENDPOINTS.items():
+        response = client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}')
+
+        def request(url=url):
+            client.get(url, headers=headers)
+
+        results[f'endpoints.{name}'] = measure(request, repeat=5)
+    return results
+
+
+# ---------------------------------------------------------------- baseline
+
+def compare(results, baseline, threshold):
+    """Return (rows, regressions) comparing medians with the baseline."""
+    rows, regressions = [], []
+    for name, current in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous.get('median_us'):
+            rows.append((name, current['median_us'], None, None))
+            continue
+        ratio = current['median_us'] / previous['median_us']
+        rows.append((name, current['median_us'], previous['median_us'], ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', default=','.join(GROUPS), help=f"Comma-separated groups ({', '.join(GROUPS)})")
+    parser.add_argument('--employees', type=int, default=1000, help='Employees seeded for the endpoints group')
+    parser.add_argument('--months', type=int, default=12, help='Payslip months seeded per employee')
+    parser.add_argument('--database-url', help='Throwaway database for the endpoints group (default: temporary SQLite)')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare with the results stored in this file')
+    parser.add_argument('--save-baseline', help='Store the results as the new baseline in this file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown before a regression (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    groups = [group.strip() for group in args.only.split(',') if group.strip()]
+    unknown = set(groups).difference(GROUPS)
+    if unknown:
+        parser.error(f"Unknown groups: {', '.join(sorted(unknown))}")
+
+    # The app reads its settings at import time
+    scratch = None
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        scratch = tempfile.NamedTemporaryFile(prefix='smartpay-bench-', suffix='.db', delete=False)
+        scratch.close()
+        os.environ['DATABASE_URL'] = f'sqlite:///{scratch.name}'
+    os.environ.setdefault('JWT_SECRET_KEY', secrets.token_hex(32))
+    os.environ['QUERY_PROFILER_ENABLED'] = 'false'
+
+    from main import create_app
+    app = create_app('production')
+
+    results = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': os.environ['DATABASE_URL'].split(':', 1)[0],
+            'employees': args.employees,
+            'months': args.months,
+        },
+        'results': {},
+    }
+    try:
+        if 'math' in groups:
+            print('Running math benchmarks...')
+            results['results'].update(bench_math())
+        if 'serializers' in groups:
+            print('Running serializer benchmarks...')
+            results['results'].update(bench_serializers(app))
+        if 'endpoints' in groups:
+            print(f'Seeding {args.employees} employees x {args.months} months of payslips...')
+            headers = seed_database(app, args.employees, args.months)
+            print('Running endpoint benchmarks...')
+            results['results'].update(bench_endpoints(app, headers))
+    finally:
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+                f.write('\n')
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(results, baseline, args.threshold)
+        print(f"\n{'benchmark':45s} {'median us':>12s} {'baseline us':>12s} {'change':>8s}")
+        for name, current, previous, ratio in rows:
+            change = f'{(ratio - 1) * 100:+7.1f}%' if ratio is not None else '     new'
+            flag = '  REGRESSION' if name in regressions else ''
+            previous = f'{previous:12.3f}' if previous is not None else f"{'-':>12s}"
+            print(f'{name:45s} {current:12.3f} {previous} {change}{flag}')
+    else:
+        print(f"\n{'benchmark':45s} {'median us':>12s} {'ops/s':>14s}")
+        for name, stats in results['results'].items():
+            print(f"{name:45s} {stats['median_us']:12.3f} {stats['ops_per_sec']:14,.1f}")
+
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) over {args.threshold:.0%}: {", ".join(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
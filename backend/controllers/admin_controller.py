@@ -0,0 +1,28 @@
+import os
+from flask import current_app, jsonify
+from models import db
+from utils.db_pool import pool_stats
+
+
+def get_pool_stats():
+    """Get the connection pool statistics of the worker serving the request"""
+    try:
+        return jsonify({
+            'message': 'Pool statistics fetched successfully',
+            'pid': os.getpid(),
+            'pool': pool_stats(db.engine),
+            'settings': {
+                'pool_size': current_app.config.get('DB_POOL_SIZE'),
+                'max_overflow': current_app.config.get('DB_MAX_OVERFLOW'),
+                'pool_timeout': current_app.config.get('DB_POOL_TIMEOUT'),
+                'pool_recycle': current_app.config.get('DB_POOL_RECYCLE'),
+                'pre_ping': current_app.config.get('DB_POOL_PRE_PING'),
+                'statement_timeout_ms': current_app.config.get('DB_STATEMENT_TIMEOUT_MS'),
+                'pgbouncer': current_app.config.get('DB_PGBOUNCER'),
+            }
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to fetch pool statistics',
+            'details': str(e)
+        }), 500
@@ -2,9 +2,26 @@ from flask import request, jsonify, make_response
 from models import db
 from models.user import User
 from utils.jwt_utils import generate_token
+from utils.password_hashing import PasswordHasherBusy
+from utils.rate_limit import check_auth_rate
 from config import Config
 
 
+def _too_many_attempts(retry_after):
+    response = make_response(jsonify({
+        'error': 'Too many attempts',
+        'retry_after': retry_after
+    }), 429)
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def _hasher_busy():
+    response = make_response(jsonify({'error': 'Authentication service busy, try again shortly'}), 503)
+    response.headers['Retry-After'] = '1'
+    return response
+
+
 def register_user():
     """Register a new user"""
     try:
@@ -16,6 +33,10 @@ def register_user():
             if not data.get(field):
                 return jsonify({'error': f'{field} is required'}), 400
         
+        retry_after = check_auth_rate()
+        if retry_after:
+            return _too_many_attempts(retry_after)
+        
         # Check if user already exists
         if User.query.filter_by(email=data['email']).first():
             return jsonify({'error': 'Email already registered'}), 400
@@ -52,6 +73,9 @@ def register_user():
 
         return response
 
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return _hasher_busy()
     except Exception as e:
         return jsonify({
             'error': 'Registration failed', 
@@ -68,6 +92,10 @@ def login_user():
         if not data.get('email') or not data.get('password'):
             return jsonify({'error': 'Email and password are required'}), 400
         
+        retry_after = check_auth_rate(data['email'])
+        if retry_after:
+            return _too_many_attempts(retry_after)
+        
         # Find user by email
         user = User.query.filter_by(email=data['email']).first()
         
@@ -98,6 +126,8 @@ def login_user():
         
         return response
         
+    except PasswordHasherBusy:
+        return _hasher_busy()
     except Exception as e:
         return jsonify({
             'error': 'Login failed',
@@ -1,7 +1,9 @@
 from flask import jsonify, make_response, request
 from models.company import Company
 from models import db
-from utils.pagination import get_pagination_params, paginate_query, create_pagination_response
+from sqlalchemy.exc import IntegrityError
+from utils.validation import COMPANY_FIELD_LABELS, COMPANY_UNIQUE_FIELDS, find_unique_conflicts, integrity_error_response, unique_conflict_response
+from utils.pagination import get_pagination_params, get_count_param, get_cursor_param, paginate_query, create_pagination_response, get_fields_param, load_fields, InvalidCursorError, InvalidFieldsError
 
 
 def create_company():
@@ -26,13 +28,10 @@ def create_company():
                     'message': 'Please provide all required fields'
                 }), 400
 
-        # Uniqueness checks where applicable
-        if Company.query.filter_by(fiscal_id=data['fiscal_id']).first():
-            return jsonify({'error': 'Company with this fiscal_id already exists'}), 400
-        if Company.query.filter_by(ice=data['ice']).first():
-            return jsonify({'error': 'Company with this ICE already exists'}), 400
-        if Company.query.filter_by(cnss_number=data['cnss_number']).first():
-            return jsonify({'error': 'Company with this CNSS number already exists'}), 400
+        # Uniqueness checks where applicable (one query for every unique field)
+        conflicts = find_unique_conflicts(Company, data, COMPANY_UNIQUE_FIELDS)
+        if conflicts:
+            return unique_conflict_response('Company', conflicts, COMPANY_FIELD_LABELS)
 
         company = Company(
             company_name=data['company_name'],
@@ -44,8 +43,12 @@ def create_company():
             email=data['email'],
         )
         db.session.add(company)
-        db.session.flush()
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            # A concurrent request took one of the values since the check
+            db.session.rollback()
+            return integrity_error_response('Company', e, COMPANY_UNIQUE_FIELDS, COMPANY_FIELD_LABELS)
 
         response = make_response(jsonify({
             'message': 'Company created successfully',
@@ -82,15 +85,32 @@ def get_all_companies():
         # Order by most recent first
         query = query.order_by(Company.id.desc())
         
+        # Only load and return the requested fields (?fields=...)
+        keyset = (Company.id,)
+        fields = get_fields_param(list(Company.SERIALIZED_FIELDS))
+        query = load_fields(query, Company, fields, keyset)
+        
         # Paginate the query
-        paginated_companies, total_count, total_pages = paginate_query(query, page, limit)
+        paginated_companies, pagination = paginate_query(
+            query, page, limit, keyset=keyset, cursor=get_cursor_param(), count=get_count_param()
+        )
         
         # Create paginated response
         response_data = create_pagination_response(
-            paginated_companies, page, limit, total_count, total_pages, 'companies'
+            paginated_companies, pagination, 'companies', fields
         )
         
         return jsonify(response_data), 200
+    except InvalidCursorError as e:
+        return jsonify({
+            'error': 'Invalid cursor',
+            'details': str(e)
+        }), 400
+    except InvalidFieldsError as e:
+        return jsonify({
+            'error': 'Invalid fields',
+            'details': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'error': 'Failed to fetch companies',
@@ -130,7 +150,11 @@ def update_company(company_id):
         company.phone = data.get('phone', company.phone)
         company.email = data.get('email', company.email)
         
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            return integrity_error_response('Company', e, COMPANY_UNIQUE_FIELDS, COMPANY_FIELD_LABELS)
         return jsonify({
             'message': 'Company updated successfully',
             'company': company.to_dict()
@@ -2,7 +2,8 @@ from flask import jsonify, make_response, request
 from models.contract import Contract
 from models import db
 from models.employee import Employee
-from utils.pagination import get_pagination_params, paginate_query, create_pagination_response
+from models.company import Company
+from utils.pagination import get_pagination_params, get_count_param, get_cursor_param, paginate_query, create_pagination_response, get_fields_param, load_fields, InvalidCursorError, InvalidFieldsError
 
 def create_contract():
     """Create a new contract"""
@@ -29,8 +30,13 @@ def create_contract():
         if not employee:
             return jsonify({'error': 'Invalid employee_id: employee not found'}), 400
 
+        # Validate that the referenced company exists (optional field)
+        if data.get('company_id') and not Company.query.get(data['company_id']):
+            return jsonify({'error': 'Invalid company_id: company not found'}), 400
+
         contract = Contract(
             employee_id=data['employee_id'],
+            company_id=data.get('company_id'),
             contract_type=data.get('contract_type', 'CDI'),
             hiring_date=data['hiring_date'],
             expiration_date=data.get('expiration_date'),
@@ -88,18 +94,38 @@ def get_all_contracts():
         if request.args.get('employee_id'):
             query = query.filter(Contract.employee_id == request.args.get('employee_id'))
         
+        if request.args.get('company_id'):
+            query = query.filter(Contract.company_id == request.args.get('company_id'))
+        
         # Order by most recent first
         query = query.order_by(Contract.id.desc())
         
+        # Only load and return the requested fields (?fields=...)
+        keyset = (Contract.id,)
+        fields = get_fields_param(list(Contract.SERIALIZED_FIELDS))
+        query = load_fields(query, Contract, fields, keyset)
+        
         # Paginate the query
-        paginated_contracts, total_count, total_pages = paginate_query(query, page, limit)
+        paginated_contracts, pagination = paginate_query(
+            query, page, limit, keyset=keyset, cursor=get_cursor_param(), count=get_count_param()
+        )
         
         # Create paginated response
         response_data = create_pagination_response(
-            paginated_contracts, page, limit, total_count, total_pages, 'contracts'
+            paginated_contracts, pagination, 'contracts', fields
         )
         
         return jsonify(response_data), 200
+    except InvalidCursorError as e:
+        return jsonify({
+            'error': 'Invalid cursor',
+            'details': str(e)
+        }), 400
+    except InvalidFieldsError as e:
+        return jsonify({
+            'error': 'Invalid fields',
+            'details': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'error': 'Failed to fetch contracts',
@@ -129,6 +155,9 @@ def update_contract(contract_id):
         contract = Contract.query.get(contract_id)
         if not contract:
             return jsonify({'error': 'Contract not found'}), 404
+        if data.get('company_id') and not Company.query.get(data['company_id']):
+            return jsonify({'error': 'Invalid company_id: company not found'}), 400
+        contract.company_id = data.get('company_id', contract.company_id)
         contract.contract_type = data.get('contract_type', contract.contract_type)
         contract.hiring_date = data.get('hiring_date', contract.hiring_date)
         contract.expiration_date = data.get('expiration_date', contract.expiration_date)
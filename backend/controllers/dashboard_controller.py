@@ -1,76 +1,135 @@
-from flask import jsonify
+from flask import jsonify, request
 from models import db
-from models.employee import Employee
-from models.contract import Contract
-from sqlalchemy import func, extract
+from models.payroll_rollup import PayrollMonthlyRollup
+from models.workforce_rollup import WorkforceRollup
+from utils.workforce_rollup import CONTRACTS_CREATED, CONTRACTS_EXPIRING, EMPLOYEES_CREATED
+from sqlalchemy import and_, case, func, select
 from datetime import datetime, date
 
+
+def _month_start(year, month):
+    return datetime(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+
+
+def _payroll_period_totals(period_year, period_month, company_id=None):
+    """
+    Read the payroll totals of the latest paid month (up to the given one) and
+    of the month before it from the rollup table (a handful of rows).
+    """
+    period_key = PayrollMonthlyRollup.pay_year * 12 + PayrollMonthlyRollup.pay_month
+    query = db.session.query(
+        PayrollMonthlyRollup.pay_year,
+        PayrollMonthlyRollup.pay_month,
+        func.sum(PayrollMonthlyRollup.headcount).label('headcount'),
+        func.sum(PayrollMonthlyRollup.gross_total).label('gross_total'),
+        func.sum(PayrollMonthlyRollup.net_total).label('net_total'),
+        func.sum(PayrollMonthlyRollup.employer_cost).label('employer_cost'),
+        func.sum(PayrollMonthlyRollup.cnss_employee + PayrollMonthlyRollup.cnss_employer).label('cnss'),
+        func.sum(PayrollMonthlyRollup.amo_employee + PayrollMonthlyRollup.amo_employer).label('amo'),
+        func.sum(PayrollMonthlyRollup.cimr_employee + PayrollMonthlyRollup.cimr_employer).label('cimr'),
+        func.sum(PayrollMonthlyRollup.income_tax).label('income_tax'),
+    ).filter(
+        period_key <= period_year * 12 + period_month,
+        PayrollMonthlyRollup.headcount > 0,
+    )
+    if company_id:
+        query = query.filter(PayrollMonthlyRollup.company_id == company_id)
+    rows = query.group_by(
+        PayrollMonthlyRollup.pay_year, PayrollMonthlyRollup.pay_month
+    ).order_by(
+        PayrollMonthlyRollup.pay_year.desc(), PayrollMonthlyRollup.pay_month.desc()
+    ).limit(2).all()
+
+    def to_dict(row):
+        return {
+            'year': row.pay_year,
+            'month': row.pay_month,
+            'headcount': int(row.headcount or 0),
+            'gross_total': float(row.gross_total or 0),
+            'net_total': float(row.net_total or 0),
+            'employer_cost': float(row.employer_cost or 0),
+            'contributions': {
+                'cnss': float(row.cnss or 0),
+                'amo': float(row.amo or 0),
+                'cimr': float(row.cimr or 0),
+                'income_tax': float(row.income_tax or 0),
+            },
+        }
+
+    current = to_dict(rows[0]) if rows else None
+    previous = None
+    # Only compare with the calendar month right before the latest paid one
+    if len(rows) > 1 and rows[0].pay_year * 12 + rows[0].pay_month - (rows[1].pay_year * 12 + rows[1].pay_month) == 1:
+        previous = to_dict(rows[1])
+    return current, previous
+
+
+def _workforce_total(metric, *criteria, column=WorkforceRollup.count):
+    return func.coalesce(func.sum(case(
+        (and_(WorkforceRollup.metric == metric, *criteria), column), else_=0
+    )), 0)
+
+
 def get_dashboard_stats():
     """Get dashboard statistics"""
     try:
         # Get current month and year
-        current_month = datetime.now().month
-        current_year = datetime.now().year
-        
-        # Total employees
-        total_employees = Employee.query.count()
-        
-        # Active contracts (contracts that are not expired)
-        active_contracts = Contract.query.filter(
-            (Contract.expiration_date.is_(None)) | (Contract.expiration_date >= date.today())
-        ).count()
-        
-        # Employees added this month
-        employees_this_month = Employee.query.filter(
-            extract('month', Employee.created_at) == current_month,
-            extract('year', Employee.created_at) == current_year
-        ).count()
-        
-        # Contracts added this month
-        contracts_this_month = Contract.query.filter(
-            extract('month', Contract.created_at) == current_month,
-            extract('year', Contract.created_at) == current_year
-        ).count()
-        
-        # Monthly payroll (sum of all active contracts' base salaries)
-        monthly_payroll = db.session.query(
-            func.sum(Contract.base_salary)
-        ).filter(
-            (Contract.expiration_date.is_(None)) | (Contract.expiration_date >= date.today())
-        ).scalar() or 0
-        
-        # Average salary (based on active contracts, not all employees)
-        average_salary = monthly_payroll / active_contracts if active_contracts > 0 else 0
-        
-        # Payroll trend (compare with last month)
-        # Calculate last month's payroll (simplified - using current active contracts)
-        # Note: For a more accurate comparison, you'd need historical data
-        last_month_payroll = monthly_payroll  # Simplified - assumes same contracts
-        
+        today = date.today()
+        current_month = today.month
+        current_year = today.year
+        month_start = _month_start(current_year, current_month).date()
+        # Contracts without an expiration date sit in the last bucket
+        active_contract = WorkforceRollup.bucket >= today
+
+        # Headcount figures from the workforce rollup (one row per month or
+        # expiration date, see utils/workforce_rollup.py), in a single round trip
+        counts = db.session.execute(select(
+            _workforce_total(EMPLOYEES_CREATED).label('total_employees'),
+            _workforce_total(CONTRACTS_EXPIRING, active_contract).label('active_contracts'),
+            _workforce_total(CONTRACTS_EXPIRING, active_contract, column=WorkforceRollup.salary_total)
+                .label('contract_payroll'),
+            _workforce_total(EMPLOYEES_CREATED, WorkforceRollup.bucket == month_start).label('employees_this_month'),
+            _workforce_total(CONTRACTS_CREATED, WorkforceRollup.bucket == month_start).label('contracts_this_month'),
+        )).one()
+
+        # Payroll figures come from the monthly rollup (latest paid month vs the one before)
+        current, previous = _payroll_period_totals(current_year, current_month, request.args.get('company_id'))
+
+        if current:
+            monthly_payroll = current['gross_total']
+            average_salary = monthly_payroll / current['headcount'] if current['headcount'] else 0
+        else:
+            # No payroll run yet: estimate from the base salaries of active contracts
+            monthly_payroll = float(counts.contract_payroll or 0)
+            average_salary = monthly_payroll / counts.active_contracts if counts.active_contracts > 0 else 0
+
         payroll_trend = 0
         payroll_trend_up = True
-        if last_month_payroll > 0:
-            payroll_trend = round(((monthly_payroll - last_month_payroll) / last_month_payroll) * 100, 1)
+        if current and previous and previous['gross_total'] > 0:
+            payroll_trend = round(((current['gross_total'] - previous['gross_total']) / previous['gross_total']) * 100, 1)
             payroll_trend_up = payroll_trend >= 0
-        
+
         return jsonify({
             'stats': {
-                'total_employees': total_employees,
-                'active_contracts': active_contracts,
+                'total_employees': counts.total_employees,
+                'active_contracts': counts.active_contracts,
                 'monthly_payroll': float(monthly_payroll),
                 'average_salary': float(average_salary),
+                'payroll': {
+                    'current': current,
+                    'previous': previous,
+                },
                 'trends': {
-                    'employees_this_month': employees_this_month,
-                    'contracts_this_month': contracts_this_month,
+                    'employees_this_month': counts.employees_this_month,
+                    'contracts_this_month': counts.contracts_this_month,
                     'payroll_trend': abs(payroll_trend),
                     'payroll_trend_up': payroll_trend_up
                 }
             }
         }), 200
-        
+
     except Exception as e:
         return jsonify({
             'error': 'Failed to fetch dashboard statistics',
             'details': str(e)
         }), 500
-
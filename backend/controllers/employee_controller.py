@@ -1,9 +1,23 @@
-from flask import jsonify, make_response, request
+from flask import current_app, jsonify, make_response, request
 from models.employee import Employee
 from models.contract import Contract
 from models import db
-from utils.pagination import get_pagination_params, paginate_query
+from models.serialization import fmt_datetime
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from utils.payroll import latest_contract_join
+from utils.validation import EMPLOYEE_UNIQUE_FIELDS, find_unique_conflicts, integrity_error_response, unique_conflict_response
+from utils.employee_import import CsvImportError, insert_import, read_csv_rows, validate_import
+from utils.pagination import get_pagination_params, get_count_param, get_cursor_param, paginate_query, get_fields_param, load_fields, InvalidCursorError, InvalidFieldsError
 
+# Latest-contract values added to each employee in the listing (key -> contract column)
+EMPLOYEE_CONTRACT_FIELDS = {
+    'position': 'position',
+    'department': 'department',
+    'base_salary': 'base_salary',
+    'hiring_date': 'hiring_date',
+    'paiments_status': 'payments_status',
+}
 
 def create_employee():
     """Create a new employee"""
@@ -33,40 +47,10 @@ def create_employee():
                     'message': 'Please provide all required fields'
                 }), 400
         
-        # Check if employee already exists
-        if Employee.query.filter_by(email=data['email']).first():
-            return jsonify({
-                'error': 'Employee already exists',
-                'message': 'Employee with this email already exists'
-            }), 400
-        
-        # check if cin already exists
-        if Employee.query.filter_by(cin=data['cin']).first():
-            return jsonify({
-                'error': 'Employee already exists',
-                'message': 'Employee with this cin already exists'
-            }), 400
-        
-        # check if cnss_number already exists
-        if Employee.query.filter_by(cnss_number=data['cnss_number']).first():
-            return jsonify({
-                'error': 'Employee already exists',
-                'message': 'Employee with this cnss_number already exists'
-            }), 400
-        
-        # check if amo_number already exists
-        if Employee.query.filter_by(amo_number=data['amo_number']).first():
-            return jsonify({
-                'error': 'Employee already exists',
-                'message': 'Employee with this amo_number already exists'
-            }), 400
-        
-        # check if bank_account already exists
-        if Employee.query.filter_by(bank_account=data['bank_account']).first():
-            return jsonify({
-                'error': 'Employee already exists',
-                'message': 'Employee with this bank_account already exists'
-            }), 400
+        # Check every unique field in one query
+        conflicts = find_unique_conflicts(Employee, data, EMPLOYEE_UNIQUE_FIELDS)
+        if conflicts:
+            return unique_conflict_response('Employee', conflicts)
         
         # Create employee
         employee = Employee(
@@ -86,8 +70,12 @@ def create_employee():
             status=data['status']
         )
         db.session.add(employee)
-        db.session.flush()
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            # A concurrent request took one of the values since the check
+            db.session.rollback()
+            return integrity_error_response('Employee', e, EMPLOYEE_UNIQUE_FIELDS)
         
         response = make_response(jsonify({
             'message': 'Employee created successfully',
@@ -102,14 +90,84 @@ def create_employee():
             'details': str(e)
         }), 500
 
+def import_employees():
+    """
+    Import employees (and optionally their contracts) from a CSV upload.
+
+    Accepts a multipart `file` field or a raw text/csv body. Columns are the
+    create_employee fields, plus optional contract columns (hiring_date,
+    position, department, base_salary, contract_type, expiration_date,
+    payments_status, company_id). Valid rows are inserted and invalid ones are
+    reported; `dry_run=true` only validates.
+    """
+    try:
+        upload = request.files.get('file')
+        raw = upload.read() if upload else request.get_data()
+        if not raw:
+            return jsonify({
+                'error': 'file is required',
+                'message': 'Upload a CSV file in the "file" field or as the request body'
+            }), 400
+        try:
+            rows = read_csv_rows(raw.decode('utf-8-sig'))
+        except UnicodeDecodeError:
+            return jsonify({'error': 'Invalid file', 'details': 'The CSV file must be UTF-8 encoded'}), 400
+        except CsvImportError as e:
+            return jsonify({'error': 'Invalid file', 'details': str(e)}), 400
+
+        max_rows = current_app.config.get('EMPLOYEE_IMPORT_MAX_ROWS', 20000)
+        if len(rows) > max_rows:
+            return jsonify({
+                'error': 'File too large',
+                'message': f'An import accepts at most {max_rows} rows'
+            }), 400
+
+        options = {**request.args, **request.form}
+        dry_run = str(options.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        valid, errors = validate_import(rows, default_company_id=options.get('company_id'))
+
+        created = {'employees': 0, 'contracts': 0}
+        if valid and not dry_run:
+            created = insert_import(valid, batch_size=current_app.config.get('EMPLOYEE_IMPORT_BATCH_SIZE', 1000))
+            db.session.commit()
+
+        status_code = 200 if dry_run else 201 if created['employees'] else 400
+        return jsonify({
+            'message': 'Import validated' if dry_run else 'Import completed' if created['employees'] else 'Nothing imported',
+            'dry_run': dry_run,
+            'total': len(rows),
+            'valid': len(valid),
+            'failed': len(errors),
+            'created': created,
+            'errors': errors,
+        }), status_code
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'error': 'Failed to import employees',
+            'details': str(e)
+        }), 500
+
 def get_all_employees():
     """Get all employees with pagination"""
     try:
         # Get pagination parameters
         page, limit = get_pagination_params(default_page=1, default_limit=12, max_limit=100)
         
-        # Build query with optional filters
-        query = Employee.query
+        # Only load and return the requested fields (?fields=...)
+        fields = get_fields_param(list(Employee.SERIALIZED_FIELDS) + list(EMPLOYEE_CONTRACT_FIELDS))
+        contract_fields = [
+            field for field in EMPLOYEE_CONTRACT_FIELDS if fields is None or field in fields
+        ]
+        
+        # Join each employee with their latest contract in the same query, when
+        # a contract field is returned or filtered on
+        query = db.session.query(Employee)
+        if contract_fields or request.args.get('paiments_status'):
+            latest, onclause = latest_contract_join()
+            query = query.outerjoin(latest, onclause).add_columns(
+                *(latest.c[EMPLOYEE_CONTRACT_FIELDS[field]].label(field) for field in contract_fields)
+            )
         
         # Apply filters if provided
         if request.args.get('search'):
@@ -130,75 +188,57 @@ def get_all_employees():
         if request.args.get('end_date'):
             query = query.filter(Employee.created_at <= request.args.get('end_date'))
         
+        # Filter by payment status of the latest contract (no contract = pending)
+        if request.args.get('paiments_status'):
+            query = query.filter(
+                func.coalesce(latest.c.payments_status, 'pending') == request.args.get('paiments_status')
+            )
+        
         # Order by most recent first
         query = query.order_by(Employee.id.desc())
         
-        # Paginate the query
-        paginated_employees, total_count, total_pages = paginate_query(query, page, limit)
-        
-        # Get contract data for each employee
-        employee_ids = [emp.id for emp in paginated_employees]
-        contracts = Contract.query.filter(Contract.employee_id.in_(employee_ids)).all() if employee_ids else []
+        keyset = (Employee.id,)
+        query = load_fields(query, Employee, fields, keyset)
         
-        # Create a map of employee_id to latest contract
-        contract_map = {}
-        for contract in contracts:
-            employee_id = contract.employee_id
-            # Keep the latest contract for each employee
-            if employee_id not in contract_map:
-                contract_map[employee_id] = contract
-            elif contract.created_at > contract_map[employee_id].created_at:
-                contract_map[employee_id] = contract
-        
-        # Filter by payment status if provided (after getting contracts)
-        payment_status_filter = request.args.get('paiments_status')
-        if payment_status_filter:
-            # Filter employees that have contracts matching the payment status
-            filtered_employees = []
-            for employee in paginated_employees:
-                contract = contract_map.get(employee.id)
-                if contract and contract.payments_status == payment_status_filter:
-                    filtered_employees.append(employee)
-                # If no contract but filter is 'pending', include it (no contract = pending)
-                elif not contract and payment_status_filter == 'pending':
-                    filtered_employees.append(employee)
-            paginated_employees = filtered_employees
-            # Update count after filtering
-            total_count = len(filtered_employees)
-            total_pages = (total_count + limit - 1) // limit if limit > 0 else 1
+        # Paginate the query
+        paginated_rows, pagination = paginate_query(
+            query, page, limit, keyset=keyset, cursor=get_cursor_param(), count=get_count_param()
+        )
         
         # Add contract info to employee data
         employees_with_contracts = []
-        for employee in paginated_employees:
-            emp_dict = employee.to_dict()
-            contract = contract_map.get(employee.id)
-            if contract:
-                emp_dict['position'] = contract.position
-                emp_dict['department'] = contract.department
-                emp_dict['base_salary'] = float(contract.base_salary) if contract.base_salary else None
-                emp_dict['hiring_date'] = contract.hiring_date.strftime('%a, %d %b %Y') if contract.hiring_date else None
-                emp_dict['paiments_status'] = contract.payments_status
-            else:
-                emp_dict['position'] = None
-                emp_dict['department'] = None
-                emp_dict['base_salary'] = None
-                emp_dict['hiring_date'] = None
-                emp_dict['paiments_status'] = None
+        for row in paginated_rows:
+            # Without contract columns the query returns plain Employee entities
+            employee, contract = (row[0], row._mapping) if contract_fields else (row, {})
+            emp_dict = employee.to_dict(fields)
+            if 'position' in contract_fields:
+                emp_dict['position'] = contract['position']
+            if 'department' in contract_fields:
+                emp_dict['department'] = contract['department']
+            if 'base_salary' in contract_fields:
+                emp_dict['base_salary'] = float(contract['base_salary']) if contract['base_salary'] else None
+            if 'hiring_date' in contract_fields:
+                emp_dict['hiring_date'] = fmt_datetime(contract['hiring_date'])
+            if 'paiments_status' in contract_fields:
+                emp_dict['paiments_status'] = contract['paiments_status']
             employees_with_contracts.append(emp_dict)
         
         # Create paginated response with enriched data
         return jsonify({
             'message': 'Employees fetched successfully',
             'employees': employees_with_contracts,
-            'pagination': {
-                'page': page,
-                'limit': limit,
-                'total': total_count,
-                'pages': total_pages,
-                'has_next': page < total_pages,
-                'has_prev': page > 1
-            }
+            'pagination': pagination
         }), 200
+    except InvalidCursorError as e:
+        return jsonify({
+            'error': 'Invalid cursor',
+            'details': str(e)
+        }), 400
+    except InvalidFieldsError as e:
+        return jsonify({
+            'error': 'Invalid fields',
+            'details': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'error': 'Failed to fetch employees',
@@ -241,7 +281,11 @@ def update_employee(employee_id):
         employee.cimr_number = data.get('cimr_number', employee.cimr_number)
         employee.bank_account = data.get('bank_account', employee.bank_account)
         employee.status = data.get('status', employee.status)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            return integrity_error_response('Employee', e, EMPLOYEE_UNIQUE_FIELDS)
         return jsonify({
             'message': 'Employee updated successfully',
             'employee': employee.to_dict()
@@ -279,12 +323,17 @@ def delete_employee(employee_id):
         
         # Delete all payslips for this employee FIRST (they reference employee)
         from models.payslips import Payslips
+        from utils.payroll_rollup import subtract_payslips
+        # Bulk delete bypasses the ORM events that maintain the payroll rollup
+        subtract_payslips(db.session.connection(), Payslips.employee_id == employee_id)
         payslip_count = Payslips.query.filter_by(employee_id=employee_id).delete()
         if payslip_count > 0:
             # Flush to ensure payslips are deleted in the database before we delete contracts/employee
             db.session.flush()
         
         # Delete all contracts for this employee
+        from utils.workforce_rollup import subtract_contracts
+        subtract_contracts(db.session.connection(), Contract.employee_id == employee_id)
         contract_count = Contract.query.filter_by(employee_id=employee_id).delete()
         if contract_count > 0:
             # Flush to ensure contracts are deleted in the database before we delete employee
@@ -0,0 +1,55 @@
+from flask import jsonify, request
+from models.job import Job
+from utils.pagination import get_pagination_params, get_count_param, get_cursor_param, paginate_query, create_pagination_response, InvalidCursorError
+
+
+def get_all_jobs():
+    """Get background jobs with pagination, most recent first"""
+    try:
+        page, limit = get_pagination_params(default_page=1, default_limit=10, max_limit=100)
+
+        query = Job.query
+
+        if request.args.get('status'):
+            query = query.filter(Job.status == request.args.get('status'))
+
+        if request.args.get('job_type'):
+            query = query.filter(Job.job_type == request.args.get('job_type'))
+
+        query = query.order_by(Job.created_at.desc(), Job.id.desc())
+
+        paginated_jobs, pagination = paginate_query(
+            query, page, limit, keyset=(Job.created_at, Job.id), cursor=get_cursor_param(), count=get_count_param()
+        )
+
+        response_data = create_pagination_response(
+            paginated_jobs, pagination, 'jobs'
+        )
+
+        return jsonify(response_data), 200
+    except InvalidCursorError as e:
+        return jsonify({
+            'error': 'Invalid cursor',
+            'details': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to fetch jobs',
+            'details': str(e)
+        }), 500
+
+def get_job_by_id(job_id):
+    """Get a background job's status, progress and result location"""
+    try:
+        job = Job.query.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify({
+            'message': 'Job fetched successfully',
+            'job': job.to_dict()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to fetch job',
+            'details': str(e)
+        }), 500
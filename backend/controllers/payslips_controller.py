@@ -1,9 +1,20 @@
-from flask import jsonify, make_response, request
+import csv
+import io
+import json
+from itertools import chain, islice
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Response, jsonify, make_response, request, current_app, stream_with_context
+from sqlalchemy.exc import IntegrityError
 from models.payslips import Payslips
 from models import db
 from models.employee import Employee
 from models.company import Company
-from utils.pagination import get_pagination_params, paginate_query, create_pagination_response
+from utils.pagination import get_pagination_params, get_count_param, get_cursor_param, paginate_query, create_pagination_response, get_fields_param, load_fields, InvalidCursorError, InvalidFieldsError
+from utils.payroll import generate_company_payslips, missing_company_contracts, parse_variables, period_end
+from utils.jobs import submit_job
+from utils.auth_decorator import get_current_user
+from utils.simulation import build_contribution_rates
 
 
 def create_payslip():
@@ -71,8 +82,15 @@ def create_payslip():
             status=data.get('status', 'pending'),
         )
         db.session.add(payslip)
-        db.session.flush()
-        db.session.commit()
+        try:
+            db.session.flush()
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({
+                'error': 'Payslip already exists for this period',
+                'message': 'This employee already has a payslip for this company and month'
+            }), 400
 
         response = make_response(jsonify({
             'message': 'Payslip created successfully',
@@ -86,52 +104,279 @@ def create_payslip():
             'details': str(e)
         }), 500
 
+def run_payroll():
+    """Generate the payslips of every active employee of a company for a pay month"""
+    try:
+        data = request.get_json() or {}
+
+        required_fields = ['company_id', 'pay_month', 'pay_year']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({
+                    'error': f'{field} is required',
+                    'message': 'Please provide all required fields'
+                }), 400
+
+        try:
+            pay_month = int(data['pay_month'])
+            pay_year = int(data['pay_year'])
+        except (ValueError, TypeError):
+            return jsonify({'error': 'pay_month and pay_year must be integers'}), 400
+        if not 1 <= pay_month <= 12:
+            return jsonify({'error': 'pay_month must be between 1 and 12'}), 400
+
+        try:
+            parse_variables(data.get('variables'))
+        except ValueError as e:
+            return jsonify({'error': 'Invalid variables', 'details': str(e)}), 400
+
+        company = Company.query.get(data['company_id'])
+        if not company:
+            return jsonify({'error': 'Invalid company_id: company not found'}), 400
+
+        if missing_company_contracts(company.id):
+            return jsonify({
+                'error': 'No contracts assigned to this company',
+                'message': 'Set company_id on the contracts (running init_db.py backfills it from payslips)'
+            }), 400
+
+        batch_size = current_app.config.get('PAYROLL_RUN_BATCH_SIZE', 1000)
+
+        # Large companies can run in the background: return the job right away
+        if data.get('async'):
+            user = get_current_user()
+            job = submit_job('payroll_run', {
+                'company_id': company.id,
+                'pay_month': pay_month,
+                'pay_year': pay_year,
+                'rates': data.get('rates') or {},
+                'variables': data.get('variables') or {},
+                'batch_size': batch_size,
+            }, user_id=getattr(user, 'id', None))
+            response = make_response(jsonify({
+                'message': 'Payroll run queued',
+                'job': job.to_dict()
+            }), 202)
+            response.headers['Location'] = f'/api/jobs/{job.id}'
+            return response
+
+        # Rates in force at the end of the pay period
+        rates = build_contribution_rates(data.get('rates') or {}, as_of=period_end(pay_month, pay_year))
+        summary = generate_company_payslips(
+            company.id,
+            pay_month,
+            pay_year,
+            rates,
+            variables=data.get('variables'),
+            batch_size=batch_size,
+        )
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Payroll run completed successfully',
+            'payroll_run': summary
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'error': 'Failed to run payroll',
+            'details': str(e)
+        }), 500
+
+def parse_payslip_filters():
+    """
+    Read the payslip listing filters from the query string.
+
+    Returns:
+        dict: Filter name -> typed value (missing filters are left out)
+
+    Raises:
+        ValueError: If a numeric filter or a date is malformed
+    """
+    filters = {}
+    for key in ('month', 'year', 'company_id', 'employee_id'):
+        if request.args.get(key):
+            try:
+                filters[key] = int(request.args[key])
+            except ValueError:
+                raise ValueError(f'{key} must be an integer') from None
+    for key in ('start_date', 'end_date'):
+        if request.args.get(key):
+            try:
+                filters[key] = date.fromisoformat(request.args[key])
+            except ValueError:
+                raise ValueError(f'{key} must be a date (YYYY-MM-DD)') from None
+    if request.args.get('status'):
+        filters['status'] = request.args['status']
+    return filters
+
+def _filter_payslips(query, filters):
+    """Apply the payslip listing filters (shared by listing and export)."""
+    # Note: Search filter for payslips would require joining with Employee table
+    # For now, we'll skip search filter and use specific filters instead
+    
+    if 'month' in filters:
+        query = query.filter(Payslips.pay_month == filters['month'])
+    
+    if 'year' in filters:
+        query = query.filter(Payslips.pay_year == filters['year'])
+    
+    if 'company_id' in filters:
+        query = query.filter(Payslips.company_id == filters['company_id'])
+    
+    if 'employee_id' in filters:
+        query = query.filter(Payslips.employee_id == filters['employee_id'])
+    
+    if 'status' in filters:
+        query = query.filter(Payslips.status == filters['status'])
+    
+    if 'start_date' in filters:
+        query = query.filter(Payslips.pay_period_start >= filters['start_date'])
+    
+    if 'end_date' in filters:
+        query = query.filter(Payslips.pay_period_end <= filters['end_date'])
+    
+    return query
+
 def get_all_payslips():
     """Get all payslips with pagination"""
     try:
         # Get pagination parameters
         page, limit = get_pagination_params(default_page=1, default_limit=10, max_limit=100)
+        try:
+            filters = parse_payslip_filters()
+        except ValueError as e:
+            return jsonify({
+                'error': 'Invalid filters',
+                'details': str(e)
+            }), 400
         
         # Build query with optional filters
-        query = Payslips.query
-        
-        # Apply filters if provided
-        # Note: Search filter for payslips would require joining with Employee table
-        # For now, we'll skip search filter and use specific filters instead
-        
-        if request.args.get('month'):
-            query = query.filter(Payslips.pay_month == request.args.get('month'))
-        
-        if request.args.get('employee_id'):
-            query = query.filter(Payslips.employee_id == request.args.get('employee_id'))
-        
-        if request.args.get('status'):
-            query = query.filter(Payslips.status == request.args.get('status'))
-        
-        if request.args.get('start_date'):
-            query = query.filter(Payslips.pay_period_start >= request.args.get('start_date'))
-        
-        if request.args.get('end_date'):
-            query = query.filter(Payslips.pay_period_end <= request.args.get('end_date'))
+        query = _filter_payslips(Payslips.query, filters)
         
         # Order by most recent first
-        query = query.order_by(Payslips.pay_year.desc(), Payslips.pay_month.desc())
+        query = query.order_by(Payslips.pay_year.desc(), Payslips.pay_month.desc(), Payslips.id.desc())
+        
+        # Only load and return the requested fields (?fields=...)
+        keyset = (Payslips.pay_year, Payslips.pay_month, Payslips.id)
+        fields = get_fields_param(list(Payslips.SERIALIZED_FIELDS))
+        query = load_fields(query, Payslips, fields, keyset)
         
         # Paginate the query
-        paginated_payslips, total_count, total_pages = paginate_query(query, page, limit)
+        paginated_payslips, pagination = paginate_query(
+            query, page, limit, keyset=keyset, cursor=get_cursor_param(), count=get_count_param()
+        )
         
         # Create paginated response
         response_data = create_pagination_response(
-            paginated_payslips, page, limit, total_count, total_pages, 'payslips'
+            paginated_payslips, pagination, 'payslips', fields
         )
         
         return jsonify(response_data), 200
+    except InvalidCursorError as e:
+        return jsonify({
+            'error': 'Invalid cursor',
+            'details': str(e)
+        }), 400
+    except InvalidFieldsError as e:
+        return jsonify({
+            'error': 'Invalid fields',
+            'details': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'error': 'Failed to fetch payslips',
             'details': str(e)
         }), 500
 
+def _export_value(value):
+    # NDJSON values follow the JSON API (numbers as floats)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def _csv_value(value):
+    # CSV keeps exact decimal amounts for accounting
+    if isinstance(value, dict):
+        return json.dumps(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def export_payslips():
+    """
+    Stream every payslip matching the listing filters as CSV or NDJSON.
+
+    Rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE
+    and written out as they arrive, so memory stays flat for any export size.
+    The first batch is fetched before the response starts, so bad filters and
+    query errors are answered with a JSON error instead of a truncated file.
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({
+            'error': 'Invalid format',
+            'details': "format must be 'csv' or 'ndjson'"
+        }), 400
+    try:
+        filters = parse_payslip_filters()
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid filters',
+            'details': str(e)
+        }), 400
+
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    columns = list(Payslips.__table__.columns)
+    names = [column.name for column in columns]
+    try:
+        query = _filter_payslips(db.session.query(*columns), filters).order_by(
+            Payslips.pay_year.desc(), Payslips.pay_month.desc(), Payslips.id.desc()
+        ).execution_options(yield_per=batch_size)
+        result = iter(query)
+        first_batch = list(islice(result, batch_size))
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'error': 'Failed to export payslips',
+            'details': str(e)
+        }), 500
+    rows = chain(first_batch, result)
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        for count, row in enumerate(rows, start=1):
+            writer.writerow([_csv_value(value) for value in row])
+            if count % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        yield buffer.getvalue()
+
+    def generate_ndjson():
+        lines = []
+        for row in rows:
+            lines.append(json.dumps({name: _export_value(value) for name, value in zip(names, row)}))
+            if len(lines) == batch_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    period = '-'.join(f"{filters[key]:02d}" for key in ('year', 'month') if key in filters) or 'all'
+    if export_format == 'csv':
+        body, mimetype = generate_csv(), 'text/csv'
+    else:
+        body, mimetype = generate_ndjson(), 'application/x-ndjson'
+
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=payslips-{period}.{export_format}'
+    return response
+
 def get_payslip_by_id(payslip_id):
     """Get a payslip by id"""
     try:
@@ -1,5 +1,7 @@
-from flask import jsonify, request
-from utils.simulation import build_contribution_rates, build_simulation_input, compute_simulation
+from flask import jsonify, request, current_app
+from models.company import Company
+from utils.simulation import build_contribution_rates, build_simulation_input, compute_simulation, compute_simulation_batch
+from utils.payroll import get_active_contracts, missing_company_contracts
 
 
 def simulate_pay():
@@ -29,3 +31,109 @@ def simulate_pay():
             'details': str(e)
         }), 500
 
+
+def _batch_too_large(max_size):
+    return jsonify({
+        'error': 'Batch too large',
+        'message': f'A batch simulation accepts at most {max_size} employees'
+    }), 400
+
+
+def simulate_pay_batch():
+    """
+    Simulate pay for many employees in one call.
+
+    Accepts either a list of simulation inputs (`inputs`), or a `company_id`
+    whose active contracts are simulated with their base salary as gross salary
+    and the optional shared `defaults` (overtime_hours, bonuses, ...).
+    `rates` overrides apply to every employee.
+    """
+    try:
+        data = request.get_json() or {}
+
+        inputs = data.get('inputs')
+        company_id = data.get('company_id')
+        if not inputs and not company_id:
+            return jsonify({
+                'error': 'inputs or company_id is required',
+                'message': 'Please provide a list of inputs or a company_id'
+            }), 400
+
+        max_size = current_app.config.get('SIMULATION_BATCH_MAX_SIZE', 10000)
+
+        errors = []
+        sim_inputs = []
+        if inputs:
+            if not isinstance(inputs, list):
+                return jsonify({'error': 'inputs must be a list'}), 400
+            if len(inputs) > max_size:
+                return _batch_too_large(max_size)
+            for index, item in enumerate(inputs):
+                item = item or {}
+                missing = [field for field in ('employee_id', 'gross_salary') if item.get(field) in (None, "")]
+                if missing:
+                    errors.append({
+                        'index': index,
+                        'employee_id': item.get('employee_id'),
+                        'error': f'{missing[0]} is required'
+                    })
+                    continue
+                try:
+                    sim_inputs.append(build_simulation_input(item))
+                except (ValueError, TypeError) as e:
+                    errors.append({'index': index, 'employee_id': item.get('employee_id'), 'error': str(e)})
+        else:
+            company = Company.query.get(company_id)
+            if not company:
+                return jsonify({'error': 'Invalid company_id: company not found'}), 400
+            defaults = data.get('defaults') or {}
+            if missing_company_contracts(company.id):
+                return jsonify({
+                    'error': 'No contracts assigned to this company',
+                    'message': 'Set company_id on the contracts (running init_db.py backfills it from payslips)'
+                }), 400
+            contracts = get_active_contracts(company.id)
+            if len(contracts) > max_size:
+                return _batch_too_large(max_size)
+            try:
+                for contract in contracts:
+                    sim_inputs.append(build_simulation_input({
+                        **defaults,
+                        'employee_id': contract.employee_id,
+                        'gross_salary': contract.base_salary,
+                    }))
+            except (ValueError, TypeError) as e:
+                # The defaults are shared, so every employee would fail the same way
+                return jsonify({
+                    'error': 'Invalid defaults',
+                    'details': str(e)
+                }), 400
+
+        # Rates are resolved once and shared by every simulation in the batch
+        rates = build_contribution_rates(data.get('rates') or {})
+        simulations = compute_simulation_batch(
+            sim_inputs,
+            rates,
+            workers=current_app.config.get('SIMULATION_WORKERS', 1),
+            chunk_size=current_app.config.get('SIMULATION_BATCH_CHUNK_SIZE', 500),
+            vectorize_threshold=current_app.config.get('SIMULATION_VECTORIZE_THRESHOLD', 1000),
+        )
+
+        results = [
+            {'employee_id': sim_input['employee_id'], 'simulation': simulation}
+            for sim_input, simulation in zip(sim_inputs, simulations)
+        ]
+        return jsonify({
+            'message': 'Batch simulation computed successfully',
+            'rates': rates,
+            'results': results,
+            'errors': errors,
+            'total': len(results) + len(errors),
+            'successful': len(results),
+            'failed': len(errors),
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to compute batch simulation',
+            'details': str(e)
+        }), 500
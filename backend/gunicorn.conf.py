@@ -0,0 +1,27 @@
+"""
+gunicorn hooks for multi-process Prometheus metrics.
+
+gunicorn loads this file from the working directory; bind address, workers
+and timeout stay on the command line (Procfile, Dockerfile). Workers write
+their samples to PROMETHEUS_MULTIPROC_DIR (default /tmp/smartpay-metrics),
+which is emptied when the master starts, and the samples of exited workers
+are marked dead so /metrics aggregates the live ones.
+"""
+import os
+import shutil
+
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/smartpay-metrics')
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
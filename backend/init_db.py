@@ -2,6 +2,8 @@
 Database initialization script.
 Run this once after deployment to create all database tables.
 """
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from main import app
 from models import db
 from models.user import User # noqa: F401
@@ -11,6 +13,10 @@ from models.contract import Contract # noqa: F401
 from models.employer import Employer # noqa: F401
 from models.payslips import Payslips # noqa: F401
 from models.contribution_rate import ContributionRate # noqa: F401
+from models.job import Job # noqa: F401
+from models.payroll_rollup import PayrollMonthlyRollup # noqa: F401
+from models.cache_version import CacheVersion # noqa: F401
+from models.workforce_rollup import WorkforceRollup # noqa: F401
 
 def init_database():
     """Create all database tables."""
@@ -26,10 +32,109 @@ def init_database():
             print("- Employer")
             print("- Payslips")
             print("- ContributionRate")
+            print("- Job")
+            print("- PayrollMonthlyRollup")
+            print("- CacheVersion")
+            print("- WorkforceRollup")
         except Exception as e:
             print(f"❌ Error creating tables: {e}")
             raise
 
+def upgrade_schema():
+    """Add columns introduced after the initial release to existing tables."""
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            print("Skipping schema upgrade (only supported on PostgreSQL)")
+            return
+        statements = [
+            "ALTER TABLE contracts ADD COLUMN IF NOT EXISTS company_id INTEGER REFERENCES companies(id)",
+            "CREATE INDEX IF NOT EXISTS ix_contracts_company_id ON contracts (company_id)",
+            "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS worker VARCHAR(100)",
+            # Contracts created before company_id existed: use the company of the employee's latest payslip
+            """
+            UPDATE contracts c SET company_id = p.company_id
+            FROM (
+                SELECT DISTINCT ON (employee_id) employee_id, company_id
+                FROM payslips
+                WHERE company_id IS NOT NULL
+                ORDER BY employee_id, pay_year DESC, pay_month DESC, id DESC
+            ) p
+            WHERE c.company_id IS NULL AND c.employee_id = p.employee_id
+            """,
+        ]
+        with db.engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+        print("✅ Database schema upgraded successfully!")
+
+def create_indexes_concurrently(tables=('payslips', 'contracts')):
+    """
+    Create the indexes declared on the models without locking writes.
+
+    CREATE INDEX CONCURRENTLY cannot run inside a transaction, so each statement
+    is executed in autocommit mode. A concurrent build that was interrupted
+    leaves an INVALID index behind; those are dropped and rebuilt. A unique
+    index that existing duplicates prevent is reported and dropped, so the
+    script can be re-run once they are cleaned up.
+    """
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            print("Skipping concurrent index creation (only supported on PostgreSQL)")
+            return
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            invalid = set(conn.execute(text(
+                "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE NOT i.indisvalid"
+            )).scalars())
+            for table_name in tables:
+                for index in sorted(db.metadata.tables[table_name].indexes, key=lambda ix: ix.name):
+                    if index.name in invalid:
+                        print(f"Rebuilding invalid index {index.name}")
+                        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+                    columns = ', '.join(column.name for column in index.columns)
+                    unique = 'UNIQUE ' if index.unique else ''
+                    try:
+                        conn.execute(text(
+                            f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {index.name} ON {table_name} ({columns})"
+                        ))
+                    except IntegrityError as e:
+                        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+                        print(f"❌ {index.name}: duplicate rows in {table_name} ({columns}), remove them and re-run: {e.orig}")
+                        continue
+                    print(f"- {unique}{index.name} ON {table_name} ({columns})")
+                conn.execute(text(f"ANALYZE {table_name}"))
+        print("✅ Indexes created successfully!")
+
+def backfill_payroll_rollup():
+    """Rebuild payroll_monthly_rollup from the existing payslips."""
+    from utils.payroll_rollup import rebuild_payroll_rollup
+    with app.app_context():
+        try:
+            rebuild_payroll_rollup()
+            db.session.commit()
+            print("✅ Payroll rollup rebuilt successfully!")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error rebuilding payroll rollup: {e}")
+            raise
+
+def backfill_workforce_rollup():
+    """Rebuild workforce_rollup from the existing employees and contracts."""
+    from utils.workforce_rollup import rebuild_workforce_rollup
+    with app.app_context():
+        try:
+            rebuild_workforce_rollup()
+            db.session.commit()
+            print("✅ Workforce rollup rebuilt successfully!")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error rebuilding workforce rollup: {e}")
+            raise
+
 if __name__ == '__main__':
     init_database()
+    upgrade_schema()
+    create_indexes_concurrently()
+    backfill_payroll_rollup()
+    backfill_workforce_rollup()
 
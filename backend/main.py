@@ -10,8 +10,14 @@ from routes.payslips_route import payslips_bp
 from routes.simulation_route import simulation_bp
 from routes.contribution_rate_route import contribution_rate_bp
 from routes.dashboard_route import dashboard_bp
+from routes.job_route import job_bp
+from routes.admin_route import admin_bp
 from models import db
 from config import config
+from utils.json_provider import install_json_provider
+from utils.db_pool import engine_options
+from utils.metrics import init_metrics
+from utils.query_profiler import init_query_profiler
 
 
 def create_app(config_name=None):
@@ -24,6 +30,18 @@ def create_app(config_name=None):
   # Load configuration
   app.config.from_object(config[config_name])
 
+  # Connection pool settings (an explicit SQLALCHEMY_ENGINE_OPTIONS wins)
+  app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+
+  # Fast JSON serialization for every jsonify() response
+  install_json_provider(app)
+
+  # Request latency, status and SQL metrics on /metrics
+  init_metrics(app)
+
+  # Per-request query log with N+1 / slow query warnings (development, tests)
+  init_query_profiler(app)
+
   # Configure CORS
   # Allow common localhost origins in dev, with credentials
   cors_origins = app.config.get('CORS_ORIGINS', ['http://localhost:5173', 'http://localhost:5000'])
@@ -50,6 +68,14 @@ def create_app(config_name=None):
     from models.employer import Employer # noqa: F401
     from models.payslips import Payslips # noqa: F401
     from models.contribution_rate import ContributionRate # noqa: F401
+    from models.job import Job # noqa: F401
+    from models.payroll_rollup import PayrollMonthlyRollup # noqa: F401
+    from models.cache_version import CacheVersion # noqa: F401
+    from models.workforce_rollup import WorkforceRollup # noqa: F401
+    import utils.payroll_rollup # noqa: F401  (keeps the rollup in sync with payslips)
+    import utils.workforce_rollup # noqa: F401  (keeps the dashboard headcounts in sync)
+    import utils.contribution_rates # noqa: F401  (refreshes the rate snapshot on changes)
+    import utils.http_cache # noqa: F401  (versions tables for ETags on every write)
     
     # Create tables (only if they don't exist)
     # In production, tables should be created via init_db.py script
@@ -66,6 +92,16 @@ def create_app(config_name=None):
           print("Connected to database and tables created")
         else:
           print("Connected to database (tables need to be created - run init_db.py)")
+
+      # Jobs left queued/running by a worker that died will never finish
+      try:
+        from utils.jobs import fail_orphaned_jobs
+        failed = fail_orphaned_jobs(app.config.get('JOB_MAX_AGE_HOURS', 24))
+        if failed:
+          print(f"Marked {failed} orphaned job(s) as failed")
+      except Exception as e:
+        db.session.rollback()
+        print(f"Could not check for orphaned jobs: {e}")
     print("Database connection initialized")
   except Exception as e:
     print(f"Failed to connect to database: {e}")
@@ -80,6 +116,8 @@ def create_app(config_name=None):
   app.register_blueprint(contribution_rate_bp, url_prefix='/api/contribution_rate')
   app.register_blueprint(simulation_bp, url_prefix='/api/simulation')
   app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+  app.register_blueprint(job_bp, url_prefix='/api/jobs')
+  app.register_blueprint(admin_bp, url_prefix='/api/admin')
 
 
   # Health check route
@@ -104,7 +142,9 @@ def create_app(config_name=None):
               "payslips": "/api/payslips",
               "contribution_rate": "/api/contribution_rate",
               "simulation": "/api/simulation",
-              "dashboard": "/api/dashboard"
+              "dashboard": "/api/dashboard",
+              "jobs": "/api/jobs",
+              "admin": "/api/admin"
           }
       })
 
@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from models import db
+
+
+class CacheVersion(db.Model):
+    """
+    Monotonic version counter per cached dataset.
+
+    Writers bump the counter in the same transaction as their change; every
+    worker compares it with the version of its in-memory copy (one primary-key
+    read) to know when to reload.
+    """
+    __tablename__ = 'cache_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -1,6 +1,7 @@
  
 from datetime import datetime, timezone
 from models import db
+from models.serialization import fmt_datetime, serialize
     
 class Company(db.Model):
     __tablename__ = 'companies'
@@ -16,19 +17,19 @@ class Company(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.now(timezone.utc), nullable=False)
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc), nullable=False)
     
-    def to_dict(self):
-        def fmt_datetime(dt):
-            return dt.strftime('%a, %d %b %Y') if getattr(dt, 'strftime', None) else str(dt) if dt else None
-        
-        return {
-            "id": self.id,
-            "company_name": self.company_name,
-            "fiscal_id": self.fiscal_id,
-            "ice": self.ice,
-            "cnss_number": self.cnss_number,
-            "address": self.address,
-            "phone": self.phone,
-            "email": self.email,
-            "created_at": fmt_datetime(self.created_at),
-            "updated_at": fmt_datetime(self.updated_at),
-        }
\ No newline at end of file
+    # Serialized fields (key -> formatter), see models/serialization.serialize
+    SERIALIZED_FIELDS = {
+        "id": None,
+        "company_name": None,
+        "fiscal_id": None,
+        "ice": None,
+        "cnss_number": None,
+        "address": None,
+        "phone": None,
+        "email": None,
+        "created_at": fmt_datetime,
+        "updated_at": fmt_datetime,
+    }
+
+    def to_dict(self, fields=None):
+        return serialize(self, self.SERIALIZED_FIELDS, fields)
\ No newline at end of file
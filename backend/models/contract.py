@@ -1,12 +1,14 @@
 from sqlalchemy import CheckConstraint
 from datetime import datetime, timezone
 from models import db
+from models.serialization import fmt_datetime, fmt_numeric, serialize
 
 class Contract(db.Model):
     __tablename__ = 'contracts'
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     employee_id = db.Column(db.Integer, db.ForeignKey('employees.id'), nullable=False)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=True, index=True)
     contract_type = db.Column(db.String(50), nullable=False, default='CDI')
     hiring_date = db.Column(db.Date, nullable=False)
     expiration_date = db.Column(db.Date)
@@ -15,30 +17,34 @@ class Contract(db.Model):
     base_salary = db.Column(db.Numeric(10, 2), nullable=False)
     payments_status = db.Column(db.String(50), nullable=False, default='pending')
     payments_date = db.Column(db.Date)
-    created_at = db.Column(db.DateTime(timezone=True), default=datetime.now(timezone.utc), nullable=False)
-    updated_at = db.Column(db.DateTime(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc), nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
 
     # Add check constraint at table level
     __table_args__ = (
         CheckConstraint("payments_status IN ('pending', 'paid')", name='check_payments_status'),
         CheckConstraint("contract_type IN ('CDI', 'CDD', 'Intern', 'Freelance')", name='check_contract_type'),
+        # Latest-contract lookup per employee and active-contract (not expired) filters
+        db.Index('ix_contracts_employee_created', 'employee_id', 'created_at', 'id'),
+        db.Index('ix_contracts_expiration_date', 'expiration_date'),
     )
     
-    def to_dict(self):
-        def fmt_datetime(dt):
-            return dt.strftime('%a, %d %b %Y') if getattr(dt, 'strftime', None) else str(dt) if dt else None
-        
-        return {
-            "id": self.id,
-            "employee_id": self.employee_id,
-            "contract_type": self.contract_type,
-            "hiring_date": fmt_datetime(self.hiring_date),
-            "expiration_date": fmt_datetime(self.expiration_date),
-            "position": self.position,
-            "department": self.department,
-            "base_salary": float(self.base_salary) if self.base_salary is not None else None,
-            "payments_status": self.payments_status,
-            "payments_date": fmt_datetime(self.payments_date),
-            "created_at": fmt_datetime(self.created_at),
-            "updated_at": fmt_datetime(self.updated_at),
-        }
+    # Serialized fields (key -> formatter), see models/serialization.serialize
+    SERIALIZED_FIELDS = {
+        "id": None,
+        "employee_id": None,
+        "company_id": None,
+        "contract_type": None,
+        "hiring_date": fmt_datetime,
+        "expiration_date": fmt_datetime,
+        "position": None,
+        "department": None,
+        "base_salary": fmt_numeric,
+        "payments_status": None,
+        "payments_date": fmt_datetime,
+        "created_at": fmt_datetime,
+        "updated_at": fmt_datetime,
+    }
+
+    def to_dict(self, fields=None):
+        return serialize(self, self.SERIALIZED_FIELDS, fields)
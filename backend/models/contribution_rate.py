@@ -1,6 +1,7 @@
  
 from datetime import datetime, timezone
 from models import db
+from models.serialization import fmt_datetime
 
 class ContributionRate(db.Model):
     __tablename__ = 'contribution_rates'
@@ -14,9 +15,6 @@ class ContributionRate(db.Model):
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc), nullable=False)
 
     def to_dict(self):
-        def fmt_datetime(dt):
-            return dt.strftime('%a, %d %b %Y') if getattr(dt, 'strftime', None) else str(dt) if dt else None
-        
         return {
             "id": self.id,
             "name": self.name,
@@ -1,6 +1,7 @@
 from sqlalchemy import CheckConstraint
 from datetime import datetime, timezone
 from models import db
+from models.serialization import fmt_datetime, serialize
 
 
 class Employee(db.Model):
@@ -21,43 +22,50 @@ class Employee(db.Model):
     cimr_number = db.Column(db.String(30), unique=True, nullable=True)
     bank_account = db.Column(db.String(100), nullable=False)
     status = db.Column(db.String(20), nullable=False, default='active')
-    created_at = db.Column(db.DateTime(timezone=True), default=datetime.now(timezone.utc), nullable=False)
-    updated_at = db.Column(db.DateTime(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc), nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
     
     # Add check constraint at table level
     __table_args__ = (
         CheckConstraint("status IN ('active', 'on_leave', 'fired')", name='check_status'),
     )
     
-    def to_dict(self):
-        def fmt_datetime(dt):
-            return dt.strftime('%a, %d %b %Y') if getattr(dt, 'strftime', None) else str(dt) if dt else None
-        def full_name(self):
-            if self.first_name and self.last_name:
-                return f"{self.first_name} {self.last_name}"
-            elif self.first_name:
-                return self.first_name
-            elif self.last_name:
-                return self.last_name
-            else:
-                return "-"
-        return {
-            "id": self.id,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "email": self.email,
-            "phone": self.phone,
-            "address": self.address,
-            "city": self.city,
-            "zip": self.zip,
-            "country": self.country,
-            "cin": self.cin,
-            "cnss_number": self.cnss_number,
-            "amo_number": self.amo_number,
-            "cimr_number": self.cimr_number,
-            "bank_account": self.bank_account,
-            "status": self.status,
-            "created_at": fmt_datetime(self.created_at),
-            "updated_at": fmt_datetime(self.updated_at),
-            "full_name": full_name(self),
-        }
\ No newline at end of file
+    @property
+    def full_name(self):
+        if self.first_name and self.last_name:
+            return f"{self.first_name} {self.last_name}"
+        elif self.first_name:
+            return self.first_name
+        elif self.last_name:
+            return self.last_name
+        else:
+            return "-"
+
+    # Serialized fields (key -> formatter), see models/serialization.serialize
+    SERIALIZED_FIELDS = {
+        "id": None,
+        "first_name": None,
+        "last_name": None,
+        "email": None,
+        "phone": None,
+        "address": None,
+        "city": None,
+        "zip": None,
+        "country": None,
+        "cin": None,
+        "cnss_number": None,
+        "amo_number": None,
+        "cimr_number": None,
+        "bank_account": None,
+        "status": None,
+        "created_at": fmt_datetime,
+        "updated_at": fmt_datetime,
+        "full_name": None,
+    }
+    # Columns read by computed fields (for load_only)
+    FIELD_COLUMNS = {
+        "full_name": ("first_name", "last_name"),
+    }
+
+    def to_dict(self, fields=None):
+        return serialize(self, self.SERIALIZED_FIELDS, fields)
\ No newline at end of file
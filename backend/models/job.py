@@ -0,0 +1,60 @@
+from sqlalchemy import CheckConstraint
+from datetime import datetime, timezone
+from models import db
+from models.serialization import fmt_isoformat
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.String(32), primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    params = db.Column(db.JSON, nullable=False, default=dict)
+
+    # Progress reporting
+    progress_current = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer, nullable=True)
+
+    # Outcome
+    result = db.Column(db.JSON, nullable=True)
+    result_url = db.Column(db.String(255), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    # Process running the job ("hostname:pid"), to detect jobs orphaned by a dead worker
+    worker = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    started_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    # Add check constraint at table level
+    __table_args__ = (
+        CheckConstraint("status IN ('queued', 'running', 'succeeded', 'failed')", name='check_job_status'),
+    )
+
+    def to_dict(self):
+        progress_percent = None
+        if self.progress_total:
+            progress_percent = round(self.progress_current * 100.0 / self.progress_total, 1)
+        elif self.status == 'succeeded':
+            progress_percent = 100.0
+
+        return {
+            "id": self.id,
+            "job_type": self.job_type,
+            "status": self.status,
+            "params": self.params,
+            "progress": {
+                "current": self.progress_current,
+                "total": self.progress_total,
+                "percent": progress_percent,
+            },
+            "result": self.result,
+            "result_url": self.result_url,
+            "error": self.error,
+            "created_by": self.created_by,
+            "created_at": fmt_isoformat(self.created_at),
+            "started_at": fmt_isoformat(self.started_at),
+            "finished_at": fmt_isoformat(self.finished_at),
+        }
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+from models import db
+from models.serialization import fmt_numeric
+
+
+class PayrollMonthlyRollup(db.Model):
+    """
+    Payroll totals per company and pay period.
+
+    Maintained incrementally from payslip changes (see utils/payroll_rollup.py),
+    so the dashboard reads a few rows instead of aggregating payslips.
+    """
+    __tablename__ = 'payroll_monthly_rollup'
+
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), primary_key=True)
+    pay_year = db.Column(db.Integer, primary_key=True)
+    pay_month = db.Column(db.Integer, primary_key=True)
+
+    headcount = db.Column(db.Integer, nullable=False, default=0)
+    gross_total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    net_total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    employer_cost = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+    # Contribution totals
+    cnss_employee = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    cnss_employer = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    amo_employee = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    amo_employer = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    cimr_employee = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    cimr_employer = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    income_tax = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    total_deductions = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+    updated_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_payroll_monthly_rollup_period', 'pay_year', 'pay_month'),
+    )
+
+    def to_dict(self):
+        return {
+            'company_id': self.company_id,
+            'pay_year': self.pay_year,
+            'pay_month': self.pay_month,
+            'headcount': self.headcount,
+            'gross_total': fmt_numeric(self.gross_total),
+            'net_total': fmt_numeric(self.net_total),
+            'employer_cost': fmt_numeric(self.employer_cost),
+            'cnss_employee': fmt_numeric(self.cnss_employee),
+            'cnss_employer': fmt_numeric(self.cnss_employer),
+            'amo_employee': fmt_numeric(self.amo_employee),
+            'amo_employer': fmt_numeric(self.amo_employer),
+            'cimr_employee': fmt_numeric(self.cimr_employee),
+            'cimr_employer': fmt_numeric(self.cimr_employer),
+            'income_tax': fmt_numeric(self.income_tax),
+            'total_deductions': fmt_numeric(self.total_deductions),
+        }
@@ -1,6 +1,7 @@
 from sqlalchemy import CheckConstraint
 from datetime import datetime, timezone
 from models import db
+from models.serialization import fmt_datetime, fmt_date, fmt_numeric, serialize
 
 class Payslips(db.Model):
     __tablename__ = 'payslips'
@@ -44,61 +45,64 @@ class Payslips(db.Model):
     total_deductions = db.Column(db.Numeric(10, 2), nullable=False, default=0)
     
     status = db.Column(db.String(20), nullable=False, default='pending')
-    generated_at = db.Column(db.DateTime(timezone=True), default=datetime.now(timezone.utc), nullable=False)
-    updated_at = db.Column(db.DateTime(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc), nullable=False)
+    generated_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
 
     # Add check constraint at table level
     __table_args__ = (
         CheckConstraint("status IN ('pending', 'paid')", name='check_status'),
+        # Access paths: an employee's history / "already paid this month?" checks,
+        # company payroll runs, the period-ordered listing (and its keyset cursor)
+        # and status filters
+        db.Index('ix_payslips_employee_period', 'employee_id', 'pay_year', 'pay_month'),
+        # One payslip per employee, company and month (payroll runs insert with ON CONFLICT DO NOTHING)
+        db.Index('ux_payslips_employee_company_period', 'employee_id', 'company_id', 'pay_year', 'pay_month', unique=True),
+        db.Index('ix_payslips_company_period', 'company_id', 'pay_year', 'pay_month', 'id'),
+        db.Index('ix_payslips_period', 'pay_year', 'pay_month', 'id'),
+        db.Index('ix_payslips_status', 'status'),
     )
 
-    def to_dict(self):
-        def fmt_datetime(dt):
-            return dt.strftime('%a, %d %b %Y') if getattr(dt, 'strftime', None) else str(dt) if dt else None
-        
-        def fmt_date(d):
-            return d.strftime('%Y-%m-%d') if getattr(d, 'strftime', None) else str(d) if d else None
-        
-        def fmt_numeric(n):
-            return float(n) if n is not None else None
-        
-        return {
-            'id': self.id,
-            'employee_id': self.employee_id,
-            # Pay period information
-            'pay_period_start': fmt_date(self.pay_period_start),
-            'pay_period_end': fmt_date(self.pay_period_end),
-            'pay_month': self.pay_month,
-            'pay_year': self.pay_year,
-            # Salary information
-            'base_salary': fmt_numeric(self.base_salary),
-            'gross_salary': fmt_numeric(self.gross_salary),
-            'net_salary': fmt_numeric(self.net_salary),
-            'total_cost': fmt_numeric(self.total_cost),
-            # Overtime
-            'overtime_hours': fmt_numeric(self.overtime_hours),
-            'overtime_rate': fmt_numeric(self.overtime_rate),
-            'overtime_amount': fmt_numeric(self.overtime_amount),
-            # Additional earnings
-            'bonus_amount': fmt_numeric(self.bonus_amount),
-            'commission_amount': fmt_numeric(self.commission_amount),
-            # Allowances
-            'transportation_allowance': fmt_numeric(self.transportation_allowance),
-            'housing_allowance': fmt_numeric(self.housing_allowance),
-            'other_allowances': fmt_numeric(self.other_allowances),
-            # Moroccan Labor Law Deductions
-            'cnss_employee': self.cnss_employee,
-            'cnss_employer': self.cnss_employer,
-            'amo_employee': self.amo_employee,
-            'amo_employer': self.amo_employer,
-            'cimr_employee': self.cimr_employee,
-            'cimr_employer': self.cimr_employer,
-            'income_tax': fmt_numeric(self.income_tax),
-            # Deductions
-            'other_deduction': self.other_deduction,
-            'total_deductions': fmt_numeric(self.total_deductions),
-            # Status and timestamps
-            'status': self.status,
-            'generated_at': fmt_datetime(self.generated_at),
-            'updated_at': fmt_datetime(self.updated_at),
-        }
\ No newline at end of file
+    # Serialized fields (key -> formatter), see models/serialization.serialize
+    SERIALIZED_FIELDS = {
+        'id': None,
+        'employee_id': None,
+        # Pay period information
+        'pay_period_start': fmt_date,
+        'pay_period_end': fmt_date,
+        'pay_month': None,
+        'pay_year': None,
+        # Salary information
+        'base_salary': fmt_numeric,
+        'gross_salary': fmt_numeric,
+        'net_salary': fmt_numeric,
+        'total_cost': fmt_numeric,
+        # Overtime
+        'overtime_hours': fmt_numeric,
+        'overtime_rate': fmt_numeric,
+        'overtime_amount': fmt_numeric,
+        # Additional earnings
+        'bonus_amount': fmt_numeric,
+        'commission_amount': fmt_numeric,
+        # Allowances
+        'transportation_allowance': fmt_numeric,
+        'housing_allowance': fmt_numeric,
+        'other_allowances': fmt_numeric,
+        # Moroccan Labor Law Deductions
+        'cnss_employee': None,
+        'cnss_employer': None,
+        'amo_employee': None,
+        'amo_employer': None,
+        'cimr_employee': None,
+        'cimr_employer': None,
+        'income_tax': fmt_numeric,
+        # Deductions
+        'other_deduction': None,
+        'total_deductions': fmt_numeric,
+        # Status and timestamps
+        'status': None,
+        'generated_at': fmt_datetime,
+        'updated_at': fmt_datetime,
+    }
+
+    def to_dict(self, fields=None):
+        return serialize(self, self.SERIALIZED_FIELDS, fields)
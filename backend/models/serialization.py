@@ -0,0 +1,65 @@
+"""
+Value formatters shared by the models' to_dict() methods.
+
+Defined once at module level (to_dict used to redefine them on every call);
+list endpoints call them for every column of every row.
+"""
+from datetime import date, datetime
+
+_DAY_NAMES = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def fmt_datetime(dt):
+    """'Sat, 17 Oct 2026' for dates and datetimes (same output as strftime('%a, %d %b %Y'))."""
+    if dt is None:
+        return None
+    if isinstance(dt, date):
+        return f'{_DAY_NAMES[dt.weekday()]}, {dt.day:02d} {_MONTH_NAMES[dt.month - 1]} {dt.year}'
+    return str(dt) if dt else None
+
+
+def fmt_date(d):
+    """'2026-10-17' for dates and datetimes."""
+    if d is None:
+        return None
+    if isinstance(d, datetime):
+        d = d.date()
+    if isinstance(d, date):
+        return d.isoformat()
+    return str(d) if d else None
+
+
+def fmt_numeric(n):
+    """Numeric/Decimal column value as a float."""
+    return float(n) if n is not None else None
+
+
+def fmt_isoformat(dt):
+    """ISO 8601 timestamp."""
+    if dt is None:
+        return None
+    return dt.isoformat() if hasattr(dt, 'isoformat') else str(dt)
+
+
+def serialize(obj, formatters, fields=None):
+    """
+    Build the dict of `obj` from a model's field table.
+
+    Args:
+        obj: Model instance
+        formatters: Mapping of key -> formatter applied to the attribute of the
+            same name (None keeps the value as is)
+        fields: Keys to include (default: all); only these attributes are read,
+            so columns deferred with load_only are never lazy-loaded
+
+    Returns:
+        dict: Serialized fields
+    """
+    if fields is not None:
+        formatters = {key: formatters[key] for key in formatters if key in fields}
+    data = {}
+    for key, formatter in formatters.items():
+        value = getattr(obj, key)
+        data[key] = formatter(value) if formatter is not None else value
+    return data
@@ -1,7 +1,7 @@
 from sqlalchemy import CheckConstraint
 from datetime import datetime, timezone
-import bcrypt
 from models import db
+from models.serialization import fmt_datetime
 
 
 class User(db.Model):
@@ -22,21 +22,19 @@ class User(db.Model):
     )
 
     def set_password(self, password):
-        """Hash and set password"""
-        salt = bcrypt.gensalt()
-        self.password = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """Hash and set password (raises PasswordHasherBusy when the bcrypt pool is full)"""
+        from utils.password_hashing import password_hasher
+        self.password = password_hasher.hash(password)
         return self.password
 
     def check_password(self, password):
-        """Check password against hash"""
+        """Check password against hash (raises PasswordHasherBusy when the bcrypt pool is full)"""
         if not self.password:
             return False
-        return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
+        from utils.password_hashing import password_hasher
+        return password_hasher.verify(password, self.password)
     
     def to_dict(self):
-        def fmt_datetime(dt):
-            return dt.strftime('%a, %d %b %Y') if getattr(dt, 'strftime', None) else str(dt) if dt else None
-        
         return {
             "id": self.id,
             "email": self.email,
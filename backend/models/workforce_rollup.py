@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+from models import db
+
+
+class WorkforceRollup(db.Model):
+    """
+    Employee and contract counters per bucket, for the dashboard.
+
+    Maintained incrementally from employee and contract changes (see
+    utils/workforce_rollup.py), so headcount figures read a few rows instead of
+    counting the employees and contracts tables:
+      - employees_created / contracts_created: rows created per month (bucket = first day)
+      - contracts_expiring: contracts and base salaries per expiration date
+        (bucket = expiration date, OPEN_ENDED for contracts without one)
+    """
+    __tablename__ = 'workforce_rollup'
+
+    metric = db.Column(db.String(30), primary_key=True)
+    bucket = db.Column(db.Date, primary_key=True)
+
+    count = db.Column(db.Integer, nullable=False, default=0)
+    salary_total = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+
+    updated_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def to_dict(self):
+        return {
+            'metric': self.metric,
+            'bucket': self.bucket.isoformat() if self.bucket else None,
+            'count': self.count,
+            'salary_total': float(self.salary_total or 0),
+        }
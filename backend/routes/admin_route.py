@@ -0,0 +1,12 @@
+from flask import Blueprint
+from controllers.admin_controller import get_pool_stats
+from utils.auth_decorator import admin_required
+
+# Create admin blueprint
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/pool', methods=['GET'])
+@admin_required
+def pool():
+    """Get database connection pool statistics"""
+    return get_pool_stats()
@@ -1,6 +1,7 @@
 from flask import Blueprint
 from controllers.company_controller import create_company, get_all_companies, get_company_by_id, update_company, delete_company
 from utils.auth_decorator import auth_required
+from utils.http_cache import conditional_get
 
 # Create company blueprint
 company_bp = Blueprint('company', __name__)
@@ -13,12 +14,14 @@ def create():
 
 @company_bp.route('/', methods=['GET'], strict_slashes=False)
 @auth_required
+@conditional_get('companies')
 def get_all():
     """Get all companies"""
     return get_all_companies()
 
 @company_bp.route('/<company_id>', methods=['GET'])
 @auth_required
+@conditional_get('companies')
 def get_by_id(company_id):
     """Get a company by id"""
     return get_company_by_id(company_id)
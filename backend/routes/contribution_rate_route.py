@@ -1,6 +1,7 @@
 from flask import Blueprint
 from controllers.contribution_rate_controller import create_contribution_rate, get_all_contribution_rates, get_contribution_rate_by_id, update_contribution_rate, delete_contribution_rate
 from utils.auth_decorator import auth_required, role_required
+from utils.http_cache import conditional_get
 
 # Create contribution rate blueprint
 contribution_rate_bp = Blueprint('contribution_rate', __name__)
@@ -15,12 +16,14 @@ def create():
 
 @contribution_rate_bp.route('/', methods=['GET'])
 @auth_required
+@conditional_get('contribution_rates')
 def get_all():
     """Get all contribution rates"""
     return get_all_contribution_rates()
 
 @contribution_rate_bp.route('/<contribution_rate_id>', methods=['GET'])
 @auth_required
+@conditional_get('contribution_rates')
 def get_by_id(contribution_rate_id):
     """Get a contribution rate by id"""
     return get_contribution_rate_by_id(contribution_rate_id)
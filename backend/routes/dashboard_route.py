@@ -1,12 +1,14 @@
 from flask import Blueprint
 from controllers.dashboard_controller import get_dashboard_stats
 from utils.auth_decorator import auth_required
+from utils.http_cache import conditional_get
 
 # Create dashboard blueprint
 dashboard_bp = Blueprint('dashboard', __name__)
 
 @dashboard_bp.route('/stats', methods=['GET'])
 @auth_required
+@conditional_get('employees', 'contracts', 'payslips')
 def get_stats():
     """Get dashboard statistics"""
     return get_dashboard_stats()
@@ -1,6 +1,7 @@
 from flask import Blueprint
-from controllers.employee_controller import create_employee, get_all_employees, get_employee_by_id, update_employee, delete_employee
+from controllers.employee_controller import create_employee, import_employees, get_all_employees, get_employee_by_id, update_employee, delete_employee
 from utils.auth_decorator import auth_required, role_required
+from utils.http_cache import conditional_get
 
 # Create employee blueprint
 employee_bp = Blueprint('employee', __name__)
@@ -13,14 +14,23 @@ def create():
     """Create a new employee"""
     return create_employee()
 
+@employee_bp.route('/import', methods=['POST'])
+@auth_required
+@role_required('admin')
+def bulk_import():
+    """Import employees and contracts from a CSV file"""
+    return import_employees()
+
 @employee_bp.route('/', methods=['GET'], strict_slashes=False)
 @auth_required
+@conditional_get('employees', 'contracts')
 def get_all():
     """Get all employees"""
     return get_all_employees()
 
 @employee_bp.route('/<employee_id>', methods=['GET'])
 @auth_required
+@conditional_get('employees')
 def get_by_id(employee_id):
     """Get an employee by id"""
     return get_employee_by_id(employee_id)
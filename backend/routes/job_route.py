@@ -0,0 +1,20 @@
+from flask import Blueprint
+from controllers.job_controller import get_all_jobs, get_job_by_id
+from utils.auth_decorator import auth_required, role_required
+
+# Create jobs blueprint
+job_bp = Blueprint('job', __name__)
+
+@job_bp.route('/', methods=['GET'], strict_slashes=False)
+@auth_required
+@role_required('admin')
+def get_all():
+    """Get all background jobs"""
+    return get_all_jobs()
+
+@job_bp.route('/<job_id>', methods=['GET'])
+@auth_required
+@role_required('admin')
+def get_by_id(job_id):
+    """Get a background job by id"""
+    return get_job_by_id(job_id)
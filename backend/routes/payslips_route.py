@@ -1,5 +1,5 @@
 from flask import Blueprint
-from controllers.payslips_controller import create_payslip, get_all_payslips, get_payslip_by_id, update_payslip, delete_payslip
+from controllers.payslips_controller import create_payslip, run_payroll, get_all_payslips, export_payslips, get_payslip_by_id, update_payslip, delete_payslip
 from utils.auth_decorator import auth_required, role_required
 
 # Create payslips blueprint
@@ -12,12 +12,25 @@ def create():
     """Create a new payslip"""
     return create_payslip()
 
+@payslips_bp.route('/run', methods=['POST'])
+@auth_required
+@role_required('admin')
+def run():
+    """Generate all payslips of a company for a pay month"""
+    return run_payroll()
+
 @payslips_bp.route('/', methods=['GET'], strict_slashes=False)
 @auth_required
 def get_all():
     """Get all payslips"""
     return get_all_payslips()
 
+@payslips_bp.route('/export', methods=['GET'])
+@auth_required
+def export():
+    """Stream payslips as CSV or NDJSON"""
+    return export_payslips()
+
 @payslips_bp.route('/<payslip_id>', methods=['GET'])
 @auth_required
 def get_by_id(payslip_id):
@@ -1,5 +1,5 @@
 from flask import Blueprint
-from controllers.simulation_controller import simulate_pay
+from controllers.simulation_controller import simulate_pay, simulate_pay_batch
 from utils.auth_decorator import auth_required
 
 
@@ -12,3 +12,8 @@ def preview():
     return simulate_pay()
 
 
+@simulation_bp.route('/batch', methods=['POST'])
+@auth_required
+def batch():
+    return simulate_pay_batch()
+
@@ -1,8 +1,15 @@
+import argparse
+import csv
+import io
+import multiprocessing
 import os
 import random
+import time
 from datetime import date, datetime, timedelta, timezone
 
+import numpy as np
 from faker import Faker
+from sqlalchemy import create_engine, func, insert, text
 
 from main import create_app
 from models import db
@@ -13,6 +20,11 @@ from models.contract import Contract
 from models.payslips import Payslips
 from models.contribution_rate import ContributionRate
 from models.employer import Employer
+from utils.http_cache import bump_table_versions
+from utils.payroll_rollup import rebuild_payroll_rollup
+from utils.workforce_rollup import rebuild_workforce_rollup
+from utils.simulation import build_contribution_rates
+from utils.vectorized_simulation import compute_simulation_arrays, round_half_even
 
 
 def create_users(fake: Faker, count: int = 10):
@@ -209,9 +221,10 @@ def create_payslips(fake: Faker, employees: list, companies: list, contracts: li
         
         # Create payslips for the last 12 months
         for month_offset in range(12):
-            pay_date = date.today() - timedelta(days=30 * month_offset)
-            pay_month = pay_date.month
-            pay_year = pay_date.year
+            # Calendar months (one payslip per employee and month)
+            months_ago = date.today().year * 12 + date.today().month - 1 - month_offset
+            pay_year, pay_month = divmod(months_ago, 12)
+            pay_month += 1
             
             # Random values for allowances and overtime
             overtime_hours = random.uniform(0, 20)
@@ -296,8 +309,253 @@ def create_payslips(fake: Faker, employees: list, companies: list, contracts: li
     return payslips
 
 
+# ---------------------------------------------------------------- scale mode
+#
+# Generates large datasets for load testing: employees get explicit ids split
+# into ranges, and worker processes generate each range (employees, one
+# contract each, one payslip per employee and month) with NumPy and write it
+# with COPY on PostgreSQL or multi-row INSERTs elsewhere.
+
+SCALE_FIRST_NAMES = ['Youssef', 'Salma', 'Omar', 'Imane', 'Mehdi', 'Sara', 'Hamza', 'Khadija', 'Anas', 'Nadia']
+SCALE_LAST_NAMES = ['Alaoui', 'Bennani', 'Idrissi', 'Tazi', 'El Amrani', 'Berrada', 'Chraibi', 'Fassi', 'Lahlou', 'Naciri']
+SCALE_CITIES = ['Casablanca', 'Rabat', 'Marrakech', 'Fes', 'Tangier', 'Agadir']
+SCALE_POSITIONS = ['Software Engineer', 'Data Analyst', 'Accountant', 'Sales Representative', 'HR Manager']
+SCALE_DEPARTMENTS = ['Engineering', 'Finance', 'Sales', 'HR', 'Operations']
+
+SCALE_EMPLOYEE_COLUMNS = [
+    'id', 'first_name', 'last_name', 'email', 'phone', 'address', 'city', 'zip', 'country', 'cin',
+    'cnss_number', 'amo_number', 'cimr_number', 'bank_account', 'status', 'created_at', 'updated_at',
+]
+SCALE_CONTRACT_COLUMNS = [
+    'employee_id', 'company_id', 'contract_type', 'hiring_date', 'position', 'department', 'base_salary',
+    'payments_status', 'created_at', 'updated_at',
+]
+SCALE_PAYSLIP_COLUMNS = [
+    'employee_id', 'company_id', 'pay_period_start', 'pay_period_end', 'pay_month', 'pay_year', 'base_salary',
+    'gross_salary', 'net_salary', 'total_cost', 'overtime_hours', 'overtime_rate', 'overtime_amount',
+    'bonus_amount', 'commission_amount', 'transportation_allowance', 'housing_allowance', 'other_allowances',
+    'cnss_employee', 'cnss_employer', 'amo_employee', 'amo_employer', 'cimr_employee', 'cimr_employer',
+    'income_tax', 'other_deduction', 'total_deductions', 'status', 'generated_at', 'updated_at',
+]
+
+_worker_engine = None
+
+
+def _init_worker(database_url):
+    global _worker_engine
+    _worker_engine = create_engine(database_url)
+
+
+def _scale_periods(months):
+    """(year, month) of the last `months` pay periods, oldest first, ending this month."""
+    today = date.today()
+    index = today.year * 12 + today.month - 1
+    return [divmod(i, 12) for i in range(index - months + 1, index + 1)]
+
+
+def _write_rows(connection, table, columns, rows, batch_size=1000):
+    """COPY rows into `table` on PostgreSQL (psycopg2); multi-row INSERTs elsewhere."""
+    if connection.dialect.name == 'postgresql':
+        cursor = connection.connection.cursor()
+        if hasattr(cursor, 'copy_expert'):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            return len(rows)
+    for start in range(0, len(rows), batch_size):
+        connection.execute(insert(table), [dict(zip(columns, row)) for row in rows[start:start + batch_size]])
+    return len(rows)
+
+
+def _seed_employee_range(args):
+    """Generate and write employees [first_id, last_id) with their contract and payslips."""
+    first_id, last_id, company_ids, months, seed = args
+    rng = np.random.default_rng([seed, first_id])
+    ids = np.arange(first_id, last_id)
+    count = len(ids)
+    now = datetime.now(timezone.utc)
+    periods = _scale_periods(months)
+    rates = build_contribution_rates()
+
+    first_names = rng.integers(len(SCALE_FIRST_NAMES), size=count)
+    last_names = rng.integers(len(SCALE_LAST_NAMES), size=count)
+    cities = rng.integers(len(SCALE_CITIES), size=count)
+    statuses = rng.choice(['active', 'active', 'active', 'on_leave', 'fired'], size=count)
+    has_cimr = rng.random(count) < 0.5
+    employees = [
+        (
+            employee_id, SCALE_FIRST_NAMES[first_names[i]], SCALE_LAST_NAMES[last_names[i]],
+            f'employee{employee_id}@seed.smartpay.ma', f'06{employee_id % 100000000:08d}', f'{employee_id} Avenue Hassan II',
+            SCALE_CITIES[cities[i]], f'{10000 + employee_id % 90000}', 'Morocco', f'S{employee_id:010d}',
+            f'SCN{employee_id:010d}', f'SAM{employee_id:010d}', f'SCI{employee_id:010d}' if has_cimr[i] else None,
+            f'MA64{employee_id:020d}', statuses[i], now, now,
+        )
+        for i, employee_id in enumerate(ids.tolist())
+    ]
+
+    # One CDI contract per employee, hired before the first seeded period
+    company_index = ids % len(company_ids)
+    base_salary = np.round(rng.uniform(4000, 40000, size=count), 2)
+    first_year, first_month = periods[0]
+    first_period = date(first_year, first_month + 1, 1)
+    hiring_days = rng.integers(30, 3650, size=count)
+    positions = rng.integers(len(SCALE_POSITIONS), size=count)
+    departments = rng.integers(len(SCALE_DEPARTMENTS), size=count)
+    contracts = [
+        (
+            employee_id, company_ids[company_index[i]], 'CDI', first_period - timedelta(days=int(hiring_days[i])),
+            SCALE_POSITIONS[positions[i]], SCALE_DEPARTMENTS[departments[i]], f'{base_salary[i]:.2f}',
+            'paid', now, now,
+        )
+        for i, employee_id in enumerate(ids.tolist())
+    ]
+
+    payslips = []
+    for period_index, (year, month_index) in enumerate(periods):
+        month = month_index + 1
+        overtime_hours = np.where(rng.random(count) < 0.3, np.round(rng.uniform(0, 20, size=count), 2), 0.0)
+        bonuses = np.where(rng.random(count) < 0.2, np.round(rng.uniform(100, 3000, size=count), 2), 0.0)
+        columns = compute_simulation_arrays(
+            base_salary, rates, overtime_hours=overtime_hours, overtime_rate=1.5, bonuses=bonuses, tax_year=year,
+        )
+        total_cost = round_half_even(columns['gross_with_overtime'] + columns['employer_total'])
+        values = {name: array.tolist() for name, array in columns.items()}
+        start, end = date(year, month, 1), date(year, month, 28)
+        status = 'pending' if period_index == len(periods) - 1 else 'paid'
+        for i, employee_id in enumerate(ids.tolist()):
+            payslips.append((
+                employee_id, company_ids[company_index[i]], start, end, month, year, f'{base_salary[i]:.2f}',
+                values['gross_with_overtime'][i], values['net_salary'][i], float(total_cost[i]),
+                float(overtime_hours[i]), 1.5, values['overtime_amount'][i], float(bonuses[i]), 0, 0, 0, 0,
+                f"{values['cnss_employee'][i]:.2f}", f"{values['cnss_employer'][i]:.2f}",
+                f"{values['amo_employee'][i]:.2f}", f"{values['amo_employer'][i]:.2f}",
+                f"{values['cimr_employee'][i]:.2f}", f"{values['cimr_employer'][i]:.2f}",
+                values['igr'][i], '{}', values['employee_total'][i], status, now, now,
+            ))
+
+    with _worker_engine.begin() as connection:
+        written = {
+            'employees': _write_rows(connection, Employee.__table__, SCALE_EMPLOYEE_COLUMNS, employees),
+            'contracts': _write_rows(connection, Contract.__table__, SCALE_CONTRACT_COLUMNS, contracts),
+            'payslips': _write_rows(connection, Payslips.__table__, SCALE_PAYSLIP_COLUMNS, payslips),
+        }
+    return written
+
+
+def _create_scale_companies(count):
+    """Insert `count` companies in one statement; returns their ids."""
+    first_id = (db.session.query(func.max(Company.id)).scalar() or 0) + 1
+    now = datetime.now(timezone.utc)
+    db.session.execute(insert(Company), [
+        {
+            'id': company_id, 'company_name': f'Seed Company {company_id}', 'fiscal_id': f'SEED-IF-{company_id}',
+            'ice': f'SEED-ICE-{company_id}', 'cnss_number': f'SEED-CNSS-{company_id}',
+            'address': f'{company_id} Boulevard Zerktouni, Casablanca', 'phone': '0522000000',
+            'email': f'company{company_id}@seed.smartpay.ma', 'created_at': now, 'updated_at': now,
+        }
+        for company_id in range(first_id, first_id + count)
+    ])
+    return list(range(first_id, first_id + count))
+
+
+def _sync_sequences(tables):
+    """Move PostgreSQL id sequences past rows inserted with explicit ids."""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for table in tables:
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+        ))
+
+
+def seed_scale(app, employees, months, companies=50, workers=None, chunk_size=2000, seed=0):
+    """Load `employees` employees with `months` payslips each, in parallel chunks."""
+    fake = Faker()
+    with app.app_context():
+        db.create_all()
+        create_users(fake, count=1)
+        create_contribution_rates(fake)
+        company_ids = _create_scale_companies(companies)
+        _sync_sequences(['companies'])
+        first_id = (db.session.query(func.max(Employee.id)).scalar() or 0) + 1
+        db.session.commit()
+
+        database_url = app.config['SQLALCHEMY_DATABASE_URI']
+        if db.engine.dialect.name == 'sqlite':
+            # SQLite allows a single writer
+            workers = 1
+        workers = workers or os.cpu_count() or 1
+        # Forked workers open their own connections
+        db.engine.dispose()
+
+    chunks = [
+        (start, min(start + chunk_size, first_id + employees), company_ids, months, seed)
+        for start in range(first_id, first_id + employees, chunk_size)
+    ]
+    print(f"\n=== Scale seed: {employees} employees x {months} months "
+          f"({employees * months} payslips) with {workers} worker(s) ===\n")
+
+    totals = {'employees': 0, 'contracts': 0, 'payslips': 0}
+    started = time.perf_counter()
+    if workers == 1:
+        _init_worker(database_url)
+        results = map(_seed_employee_range, chunks)
+        pool = None
+    else:
+        pool = multiprocessing.get_context('fork').Pool(workers, initializer=_init_worker, initargs=(database_url,))
+        results = pool.imap_unordered(_seed_employee_range, chunks)
+    try:
+        for written in results:
+            for table, count in written.items():
+                totals[table] += count
+            elapsed = time.perf_counter() - started
+            rows = sum(totals.values())
+            print(f"  {totals['employees']:>10,} employees {totals['payslips']:>12,} payslips "
+                  f"{rows / elapsed:>12,.0f} rows/s")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    load_seconds = time.perf_counter() - started
+
+    with app.app_context():
+        _sync_sequences(['employees'])
+        print("Rebuilding the payroll rollup...")
+        rebuild_payroll_rollup()
+        print("Rebuilding the workforce rollup...")
+        rebuild_workforce_rollup()
+        # COPY and multi-row inserts bypass the session hooks that version the tables
+        bump_table_versions(db.session, 'companies', 'employees', 'contracts', 'payslips')
+        db.session.commit()
+        if db.engine.dialect.name == 'postgresql':
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                connection.execute(text('ANALYZE companies, employees, contracts, payslips, payroll_monthly_rollup, workforce_rollup'))
+
+    rows = sum(totals.values())
+    print("\n=== Scale Seed Summary ===")
+    for table, count in totals.items():
+        print(f"✓ {table.capitalize()}: {count:,}")
+    print(f"✓ Loaded {rows:,} rows in {load_seconds:,.1f}s ({rows / load_seconds:,.0f} rows/s)")
+    print(f"✓ Total time with rollup and ANALYZE: {time.perf_counter() - started:,.1f}s\n")
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the SmartPay database")
+    parser.add_argument('--employees', type=int, help='Scale mode: number of employees to generate')
+    parser.add_argument('--months', type=int, default=12, help='Scale mode: payslip months per employee')
+    parser.add_argument('--companies', type=int, default=50, help='Scale mode: companies to create')
+    parser.add_argument('--workers', type=int, help='Scale mode: worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='Scale mode: employees per worker task')
+    parser.add_argument('--seed', type=int, default=0, help='Scale mode: random seed')
+    args = parser.parse_args()
+
     app = create_app()
+    if args.employees:
+        seed_scale(app, args.employees, args.months, companies=args.companies, workers=args.workers,
+                   chunk_size=args.chunk_size, seed=args.seed)
+        return
+
     fake = Faker()
 
     with app.app_context():
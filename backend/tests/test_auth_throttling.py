@@ -0,0 +1,64 @@
+import threading
+import unittest
+
+from utils.password_hashing import PasswordHasher, PasswordHasherBusy
+from utils.rate_limit import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketLimiterTests(unittest.TestCase):
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(burst=3, per_minute=6, clock=clock)
+
+        self.assertEqual([limiter.consume("1.2.3.4") for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(limiter.consume("1.2.3.4"), 10.0)
+        # Other keys have their own bucket
+        self.assertEqual(limiter.consume("5.6.7.8"), 0)
+
+        clock.now = 10.0
+        self.assertEqual(limiter.consume("1.2.3.4"), 0)
+        self.assertGreater(limiter.consume("1.2.3.4"), 0)
+
+    def test_zero_burst_disables_limit(self):
+        limiter = TokenBucketLimiter(burst=0, per_minute=0)
+        self.assertEqual(limiter.consume("x"), 0)
+
+
+class PasswordHasherTests(unittest.TestCase):
+    def test_hash_and_verify(self):
+        hasher = PasswordHasher(workers=1, queue_size=1)
+        hashed = hasher.hash("Secret@123")
+        self.assertTrue(hasher.verify("Secret@123", hashed))
+        self.assertFalse(hasher.verify("wrong", hashed))
+
+    def test_fails_fast_when_saturated(self):
+        hasher = PasswordHasher(workers=1, queue_size=0)
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+
+        worker = threading.Thread(target=hasher._run, args=(blocking,))
+        worker.start()
+        started.wait(5)
+        try:
+            with self.assertRaises(PasswordHasherBusy):
+                hasher.hash("Secret@123")
+        finally:
+            release.set()
+            worker.join()
+        self.assertTrue(hasher.verify("Secret@123", hasher.hash("Secret@123")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import unittest
+import uuid
+from datetime import date
+
+from main import create_app
+from models import db
+from models.contract import Contract
+
+
+class EmployeeSparseFieldsTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app("testing")
+        cls.client = cls.app.test_client()
+
+        with cls.app.app_context():
+            db.create_all()
+
+        email = f"fields-{uuid.uuid4().hex[:8]}@example.com"
+        password = "Test@12345"
+        cls.client.post(
+            "/api/auth/register",
+            data=json.dumps({"email": email, "password": password, "role": "admin"}),
+            content_type="application/json",
+        )
+        r = cls.client.post(
+            "/api/auth/login",
+            data=json.dumps({"email": email, "password": password}),
+            content_type="application/json",
+        )
+        cls.headers = {"Authorization": f"Bearer {r.get_json()['token']}"}
+
+        tag = uuid.uuid4().hex[:8]
+        r = cls.client.post("/api/employees/", headers=cls.headers, json={
+            "first_name": "Sparse", "last_name": "Fields", "email": f"{tag}@example.com", "phone": "0600000000",
+            "address": "1 rue", "city": "Rabat", "zip": "10000", "country": "MA", "cin": f"S{tag}",
+            "cnss_number": f"SC{tag}", "amo_number": f"SA{tag}", "bank_account": f"B{tag}", "status": "active",
+        })
+        cls.employee_id = r.get_json()["employee"]["id"]
+        with cls.app.app_context():
+            db.session.add(Contract(
+                employee_id=cls.employee_id, contract_type="CDI", hiring_date=date(2024, 1, 1),
+                position="Developer", department="IT", base_salary=9000,
+            ))
+            db.session.commit()
+
+    def _employee(self, fields):
+        r = self.client.get("/api/employees/", headers=self.headers, query_string={"fields": fields, "limit": 100})
+        self.assertEqual(r.status_code, 200, r.get_json())
+        return next(e for e in r.get_json()["employees"] if e["id"] == self.employee_id)
+
+    def test_employee_fields_only(self):
+        employee = self._employee("first_name")
+        self.assertEqual(employee, {"id": self.employee_id, "first_name": "Sparse"})
+
+    def test_employee_and_contract_fields(self):
+        employee = self._employee("first_name,position,base_salary")
+        self.assertEqual(employee, {
+            "id": self.employee_id, "first_name": "Sparse", "position": "Developer", "base_salary": 9000.0,
+        })
+
+    def test_contract_filter_without_contract_fields(self):
+        r = self.client.get("/api/employees/", headers=self.headers, query_string={
+            "fields": "first_name", "paiments_status": "pending", "limit": 100,
+        })
+        self.assertEqual(r.status_code, 200)
+        self.assertIn(self.employee_id, [e["id"] for e in r.get_json()["employees"]])
+
+    def test_unknown_field_is_rejected(self):
+        r = self.client.get("/api/employees/", headers=self.headers, query_string={"fields": "salary"})
+        self.assertEqual(r.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
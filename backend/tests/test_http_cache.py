@@ -0,0 +1,58 @@
+import json
+import unittest
+import uuid
+
+from main import create_app
+from models import db
+
+
+class ConditionalGetTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app("testing")
+        cls.client = cls.app.test_client()
+
+        with cls.app.app_context():
+            db.create_all()
+
+        email = f"etag-{uuid.uuid4().hex[:8]}@example.com"
+        password = "Test@12345"
+        cls.client.post(
+            "/api/auth/register",
+            data=json.dumps({"email": email, "password": password, "role": "admin"}),
+            content_type="application/json",
+        )
+        r = cls.client.post(
+            "/api/auth/login",
+            data=json.dumps({"email": email, "password": password}),
+            content_type="application/json",
+        )
+        cls.headers = {"Authorization": f"Bearer {r.get_json()['token']}"}
+
+    def _create_company(self):
+        tag = uuid.uuid4().hex[:8]
+        r = self.client.post("/api/companies/", headers=self.headers, json={
+            "company_name": f"Etag {tag}", "fiscal_id": f"F{tag}", "ice": f"I{tag}",
+            "cnss_number": f"C{tag}", "address": "1 rue", "phone": "0600000000", "email": f"{tag}@example.com",
+        })
+        self.assertEqual(r.status_code, 201)
+
+    def test_unchanged_listing_returns_304_until_a_write(self):
+        self._create_company()
+        r = self.client.get("/api/companies/", headers=self.headers)
+        self.assertEqual(r.status_code, 200)
+        etag = r.headers["ETag"]
+        self.assertIn("no-cache", r.headers["Cache-Control"])
+
+        r = self.client.get("/api/companies/", headers={**self.headers, "If-None-Match": etag})
+        self.assertEqual(r.status_code, 304)
+        self.assertEqual(r.data, b"")
+
+        self._create_company()
+        r = self.client.get("/api/companies/", headers={**self.headers, "If-None-Match": etag})
+        self.assertEqual(r.status_code, 200)
+        self.assertNotEqual(r.headers["ETag"], etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
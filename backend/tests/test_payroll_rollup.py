@@ -0,0 +1,145 @@
+import json
+import unittest
+import uuid
+from datetime import date
+
+from main import create_app
+from models import db
+from models.contract import Contract
+from models.payroll_rollup import PayrollMonthlyRollup
+from models.payslips import Payslips
+from utils.payroll_rollup import rebuild_payroll_rollup
+
+
+class PayrollRollupTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app("testing")
+        cls.client = cls.app.test_client()
+
+        with cls.app.app_context():
+            db.create_all()
+
+        email = f"rollup-{uuid.uuid4().hex[:8]}@example.com"
+        password = "Test@12345"
+        cls.client.post(
+            "/api/auth/register",
+            data=json.dumps({"email": email, "password": password, "role": "admin"}),
+            content_type="application/json",
+        )
+        r = cls.client.post(
+            "/api/auth/login",
+            data=json.dumps({"email": email, "password": password}),
+            content_type="application/json",
+        )
+        cls.headers = {"Authorization": f"Bearer {r.get_json()['token']}"}
+
+    def _create_company_with_employees(self, salaries):
+        tag = uuid.uuid4().hex[:8]
+        r = self.client.post("/api/companies/", headers=self.headers, json={
+            "company_name": f"Rollup {tag}", "fiscal_id": f"F{tag}", "ice": f"I{tag}",
+            "cnss_number": f"C{tag}", "address": "1 rue", "phone": "0600000000", "email": f"{tag}@example.com",
+        })
+        company_id = r.get_json()["company"]["id"]
+        employee_ids = []
+        for i, salary in enumerate(salaries):
+            r = self.client.post("/api/employees/", headers=self.headers, json={
+                "first_name": "Rollup", "last_name": f"E{i}", "email": f"{tag}-{i}@example.com",
+                "phone": "0600000000", "address": "1 rue", "city": "Rabat", "zip": "10000", "country": "MA",
+                "cin": f"R{i}{tag}", "cnss_number": f"RC{i}{tag}", "amo_number": f"RA{i}{tag}",
+                "bank_account": f"RB{i}{tag}", "status": "active",
+            })
+            employee_ids.append(r.get_json()["employee"]["id"])
+            with self.app.app_context():
+                db.session.add(Contract(
+                    employee_id=employee_ids[-1], company_id=company_id, contract_type="CDI",
+                    hiring_date=date(2024, 1, 1), position="Dev", department="IT", base_salary=salary,
+                ))
+                db.session.commit()
+        return company_id, employee_ids
+
+    def _payroll(self, company_id):
+        r = self.client.get("/api/dashboard/stats", headers=self.headers, query_string={"company_id": company_id})
+        self.assertEqual(r.status_code, 200)
+        return r.get_json()["stats"]["payroll"]
+
+    def _gross_total(self, company_id, year, month):
+        with self.app.app_context():
+            payslips = Payslips.query.filter_by(company_id=company_id, pay_year=year, pay_month=month).all()
+            return float(sum(payslip.gross_salary for payslip in payslips))
+
+    def _assert_matches_rebuild(self):
+        with self.app.app_context():
+            def snapshot():
+                return {
+                    (row.company_id, row.pay_year, row.pay_month): (row.headcount, float(row.gross_total))
+                    for row in PayrollMonthlyRollup.query.all()
+                    if row.headcount
+                }
+            incremental = snapshot()
+            rebuild_payroll_rollup()
+            db.session.flush()
+            self.assertEqual(incremental, snapshot())
+            db.session.rollback()
+
+    def test_dashboard_follows_payslip_changes(self):
+        company_id, (first, second) = self._create_company_with_employees([9000, 12000])
+
+        # Payroll run (multi-row insert with explicit deltas)
+        r = self.client.post("/api/payslips/run", headers=self.headers, json={
+            "company_id": company_id, "pay_month": 3, "pay_year": 2025,
+        })
+        self.assertIn(r.status_code, (200, 201), r.get_json())
+        payroll = self._payroll(company_id)
+        self.assertEqual((payroll["current"]["year"], payroll["current"]["month"]), (2025, 3))
+        self.assertEqual(payroll["current"]["headcount"], 2)
+        self.assertAlmostEqual(payroll["current"]["gross_total"], self._gross_total(company_id, 2025, 3))
+        self._assert_matches_rebuild()
+
+        # ORM insert
+        with self.app.app_context():
+            march = Payslips.query.filter_by(employee_id=first, pay_year=2025, pay_month=3).one()
+            values = {column.key: getattr(march, column.key) for column in Payslips.__table__.columns}
+            values.update(id=None, pay_month=4, pay_period_start=date(2025, 4, 1), pay_period_end=date(2025, 4, 30))
+            april = Payslips(**values)
+            db.session.add(april)
+            db.session.commit()
+            april_id = april.id
+        payroll = self._payroll(company_id)
+        self.assertEqual((payroll["current"]["month"], payroll["current"]["headcount"]), (4, 1))
+        self.assertEqual((payroll["previous"]["month"], payroll["previous"]["headcount"]), (3, 2))
+        self._assert_matches_rebuild()
+
+        # ORM update
+        with self.app.app_context():
+            april = db.session.get(Payslips, april_id)
+            april.gross_salary = april.gross_salary + 1000
+            db.session.commit()
+        payroll = self._payroll(company_id)
+        self.assertAlmostEqual(payroll["current"]["gross_total"], self._gross_total(company_id, 2025, 4))
+        self._assert_matches_rebuild()
+
+        # ORM delete
+        with self.app.app_context():
+            db.session.delete(db.session.get(Payslips, april_id))
+            db.session.commit()
+        payroll = self._payroll(company_id)
+        self.assertEqual((payroll["current"]["month"], payroll["current"]["headcount"]), (3, 2))
+        self._assert_matches_rebuild()
+
+        # Bulk delete of an employee's payslips
+        r = self.client.delete(f"/api/employees/{first}", headers=self.headers)
+        self.assertEqual(r.status_code, 200)
+        payroll = self._payroll(company_id)
+        self.assertEqual(payroll["current"]["headcount"], 1)
+        self.assertAlmostEqual(payroll["current"]["gross_total"], self._gross_total(company_id, 2025, 3))
+        self._assert_matches_rebuild()
+
+        r = self.client.delete(f"/api/employees/{second}", headers=self.headers)
+        self.assertEqual(r.status_code, 200)
+        self.assertIsNone(self._payroll(company_id)["current"])
+        self._assert_matches_rebuild()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import unittest
+import uuid
+from datetime import date
+
+from main import create_app
+from models import db
+from models.contract import Contract
+
+
+class PayslipExportTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app("testing")
+        cls.client = cls.app.test_client()
+
+        with cls.app.app_context():
+            db.create_all()
+
+        email = f"export-{uuid.uuid4().hex[:8]}@example.com"
+        password = "Test@12345"
+        cls.client.post(
+            "/api/auth/register",
+            data=json.dumps({"email": email, "password": password, "role": "admin"}),
+            content_type="application/json",
+        )
+        r = cls.client.post(
+            "/api/auth/login",
+            data=json.dumps({"email": email, "password": password}),
+            content_type="application/json",
+        )
+        cls.headers = {"Authorization": f"Bearer {r.get_json()['token']}"}
+
+        tag = uuid.uuid4().hex[:8]
+        r = cls.client.post("/api/companies/", headers=cls.headers, json={
+            "company_name": f"Export {tag}", "fiscal_id": f"F{tag}", "ice": f"I{tag}",
+            "cnss_number": f"C{tag}", "address": "1 rue", "phone": "0600000000", "email": f"{tag}@example.com",
+        })
+        cls.company_id = r.get_json()["company"]["id"]
+        for i in range(2):
+            r = cls.client.post("/api/employees/", headers=cls.headers, json={
+                "first_name": "Export", "last_name": f"E{i}", "email": f"{tag}-{i}@example.com",
+                "phone": "0600000000", "address": "1 rue", "city": "Rabat", "zip": "10000", "country": "MA",
+                "cin": f"X{i}{tag}", "cnss_number": f"XC{i}{tag}", "amo_number": f"XA{i}{tag}",
+                "bank_account": f"XB{i}{tag}", "status": "active",
+            })
+            with cls.app.app_context():
+                db.session.add(Contract(
+                    employee_id=r.get_json()["employee"]["id"], company_id=cls.company_id, contract_type="CDI",
+                    hiring_date=date(2024, 1, 1), position="Dev", department="IT", base_salary=9000 + i * 1000,
+                ))
+                db.session.commit()
+        r = cls.client.post("/api/payslips/run", headers=cls.headers, json={
+            "company_id": cls.company_id, "pay_month": 3, "pay_year": 2025,
+        })
+        assert r.status_code in (200, 201), r.get_json()
+
+    def _export(self, **params):
+        return self.client.get("/api/payslips/export", headers=self.headers, query_string={
+            "company_id": self.company_id, "year": 2025, "month": 3, **params,
+        })
+
+    def test_csv_export(self):
+        r = self._export(format="csv")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.mimetype, "text/csv")
+        self.assertIn("filename=payslips-2025-03.csv", r.headers["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(r.get_data(as_text=True))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row["company_id"] for row in rows}, {str(self.company_id)})
+
+    def test_ndjson_export(self):
+        r = self._export(format="ndjson")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.mimetype, "application/x-ndjson")
+        rows = [json.loads(line) for line in r.get_data(as_text=True).splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(all(row["pay_month"] == 3 and row["pay_year"] == 2025 for row in rows))
+
+    def test_invalid_filters_are_rejected_before_streaming(self):
+        for params in ({"month": "abc"}, {"year": "abc"}, {"start_date": "2025-13-01"}):
+            r = self._export(**params)
+            self.assertEqual(r.status_code, 400)
+            self.assertEqual(r.get_json()["error"], "Invalid filters")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import unittest
+import uuid
+from datetime import date
+
+from main import create_app
+from models import db
+from models.contract import Contract
+from models.employee import Employee
+from utils.query_profiler import QueryRecord, analyze_queries, max_queries, statement_shape
+
+
+class QueryAnalysisTests(unittest.TestCase):
+    def test_shape_ignores_in_list_length(self):
+        self.assertEqual(
+            statement_shape("SELECT * FROM employees WHERE id IN (?, ?, ?)"),
+            statement_shape("SELECT *\n  FROM employees WHERE id IN (?)"),
+        )
+        self.assertEqual(
+            statement_shape("SELECT * FROM employees WHERE id IN (%(id_1_1)s, %(id_1_2)s)"),
+            "SELECT * FROM employees WHERE id IN (?)",
+        )
+
+    def test_flags_repeated_statements_and_slow_queries(self):
+        records = [QueryRecord("SELECT * FROM contracts WHERE employee_id = ?", 0.001, "controllers/x.py:10")] * 6
+        records.append(QueryRecord("SELECT count(*) FROM payslips", 0.25, "controllers/y.py:20"))
+
+        findings = analyze_queries(records, n_plus_one=5, slow_ms=100)
+
+        self.assertEqual(len(findings["n_plus_one"]), 1)
+        self.assertEqual(findings["n_plus_one"][0]["count"], 6)
+        self.assertEqual(findings["n_plus_one"][0]["call_sites"], ["controllers/x.py:10"])
+        self.assertEqual([item["call_site"] for item in findings["slow"]], ["controllers/y.py:20"])
+
+
+class EndpointQueryCountTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Use real DB from env or default config
+        cls.app = create_app("testing")
+        cls.client = cls.app.test_client()
+
+        with cls.app.app_context():
+            db.create_all()
+
+        email = f"profiler-{uuid.uuid4().hex[:8]}@example.com"
+        password = "Test@12345"
+        cls.client.post(
+            "/api/auth/register",
+            data=json.dumps({"email": email, "password": password, "role": "admin"}),
+            content_type="application/json",
+        )
+        r = cls.client.post(
+            "/api/auth/login",
+            data=json.dumps({"email": email, "password": password}),
+            content_type="application/json",
+        )
+        cls.cookie = r.headers.get("Set-Cookie")
+
+    def _add_employees(self, count):
+        with self.app.app_context():
+            for _ in range(count):
+                tag = uuid.uuid4().hex[:10]
+                employee = Employee(
+                    first_name="Query", last_name=tag, email=f"{tag}@example.com", phone="0600000000",
+                    address="1 rue", city="Rabat", zip="10000", country="MA", cin=f"C{tag}",
+                    cnss_number=f"N{tag}", amo_number=f"A{tag}", bank_account=f"B{tag}",
+                )
+                db.session.add(employee)
+                db.session.flush()
+                db.session.add(Contract(
+                    employee_id=employee.id, hiring_date=date(2024, 1, 1), position="Dev",
+                    department="IT", base_salary=10000,
+                ))
+            db.session.commit()
+
+    def test_employee_listing_query_count_does_not_grow_with_rows(self):
+        self._add_employees(3)
+        # Warm the user cache and its periodic version check
+        self.client.get("/api/auth/me", headers={"Cookie": self.cookie})
+        # Version check for the ETag, count, page, latest contracts
+        with max_queries(4):
+            r = self.client.get("/api/employees/?limit=50", headers={"Cookie": self.cookie})
+        self.assertEqual(r.status_code, 200)
+        self.assertIn("X-Query-Count", r.headers)
+
+        self._add_employees(10)
+        with max_queries(4):
+            r = self.client.get("/api/employees/?limit=50", headers={"Cookie": self.cookie})
+        self.assertEqual(r.status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import random
+import unittest
+
+from utils.simulation import build_contribution_rates, build_simulation_input, compute_simulation
+from utils.tax import IGR_BRACKETS_BY_YEAR, calculate_igr, igr_table_year
+from utils.vectorized_simulation import calculate_igr_array, compute_simulation_vectorized
+
+
+def reference_igr(annual_income, brackets):
+    """Bracket-by-bracket walk, as the tax law describes it."""
+    if annual_income <= 0:
+        return 0.0, 0.0
+    total_tax = 0.0
+    previous_limit = 0.0
+    for limit, rate in brackets:
+        if annual_income > previous_limit:
+            total_tax += (min(annual_income, limit) - previous_limit) * rate
+            previous_limit = limit
+        else:
+            break
+    return round(total_tax, 2), round(total_tax / annual_income, 4)
+
+
+class IgrTests(unittest.TestCase):
+    def test_scale_selected_by_fiscal_year(self):
+        self.assertEqual(igr_table_year(2005), 2010)
+        self.assertEqual(igr_table_year(2024), 2010)
+        self.assertEqual(igr_table_year(2025), 2025)
+        self.assertEqual(igr_table_year(2031), 2025)
+        # 45,000 MAD: taxable under the 2024 scale, exempt under the 2025 one
+        self.assertEqual(calculate_igr(45000, 2024), (1500.0, 0.0333))
+        self.assertEqual(calculate_igr(45000, 2025), (500.0, 0.0111))
+
+    def test_matches_reference_for_every_scale(self):
+        rng = random.Random(11)
+        incomes = [-5.0, 0.0, 1.0, 30000.0, 30000.01, 40000.0, 60000.0, 80000.0, 100000.0, 180000.0, 2_500_000.0]
+        incomes += [rng.uniform(0, 400_000) for _ in range(3000)]
+        for year, brackets in IGR_BRACKETS_BY_YEAR.items():
+            expected = [reference_igr(income, brackets) for income in incomes]
+            self.assertEqual([calculate_igr(income, year) for income in incomes], expected)
+            taxes, rates = calculate_igr_array(incomes, year)
+            self.assertEqual(list(zip(taxes.tolist(), rates.tolist())), expected)
+
+    def test_vectorized_simulation_with_mixed_years(self):
+        rng = random.Random(3)
+        sim_inputs = [
+            build_simulation_input({
+                "gross_salary": round(rng.uniform(2500, 30000), 2),
+                "tax_year": rng.choice([2023, 2024, 2025, None]),
+            })
+            for _ in range(500)
+        ]
+        rates = build_contribution_rates()
+        expected = [compute_simulation(sim_input, rates) for sim_input in sim_inputs]
+        self.assertEqual(compute_simulation_vectorized(sim_inputs, rates), expected)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,46 @@
+import random
+import unittest
+
+from utils.simulation import build_contribution_rates, build_simulation_input, compute_simulation
+from utils.tax import calculate_igr
+from utils.vectorized_simulation import calculate_igr_array, compute_simulation_vectorized, round_half_even
+
+
+class VectorizedSimulationTests(unittest.TestCase):
+    def test_round_half_even_matches_python_round(self):
+        rng = random.Random(42)
+        values = [rng.randint(0, 10_000_000) / 1000 for _ in range(20000)]
+        # Values whose decimal form sits exactly on a half-centime
+        values += [n + 0.005 for n in range(0, 5000)] + [2.675, 1.005, 0.125, 0.375, -0.005]
+        self.assertEqual(round_half_even(values).tolist(), [round(v, 2) for v in values])
+
+    def test_igr_matches_scalar(self):
+        incomes = [-10.0, 0.0, 1.0, 40000.0, 40000.01, 60000.0, 99999.99, 100000.0, 180000.0, 180000.5, 1_234_567.89]
+        rng = random.Random(7)
+        incomes += [rng.uniform(0, 500_000) for _ in range(5000)]
+        taxes, effective_rates = calculate_igr_array(incomes)
+        expected = [calculate_igr(income) for income in incomes]
+        self.assertEqual(taxes.tolist(), [tax for tax, _ in expected])
+        self.assertEqual(effective_rates.tolist(), [rate for _, rate in expected])
+
+    def test_simulation_matches_scalar(self):
+        rng = random.Random(2025)
+        sim_inputs = [
+            build_simulation_input({
+                "employee_id": i,
+                "gross_salary": round(rng.uniform(2500, 60000), 2),
+                "overtime_hours": rng.choice([0, 0, 2.5, 10, rng.uniform(0, 30)]),
+                "overtime_rate": rng.choice([1.25, 1.5, 2.0]),
+                "bonuses": rng.choice([0, 0, 500, round(rng.uniform(0, 5000), 2)]),
+                "allowances": rng.choice([0, 300, round(rng.uniform(0, 2000), 2)]),
+                "deductions": rng.choice([0, 0, 150.5]),
+            })
+            for i in range(5000)
+        ]
+        for rates in (build_contribution_rates(), build_contribution_rates({"cimr_employee": 3, "professional_tax": 1.5})):
+            expected = [compute_simulation(sim_input, rates) for sim_input in sim_inputs]
+            self.assertEqual(compute_simulation_vectorized(sim_inputs, rates), expected)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
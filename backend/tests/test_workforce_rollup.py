@@ -0,0 +1,69 @@
+import unittest
+import uuid
+from datetime import date, timedelta
+
+from main import create_app
+from models import db
+from models.contract import Contract
+from models.employee import Employee
+from models.workforce_rollup import WorkforceRollup
+from utils.workforce_rollup import rebuild_workforce_rollup
+
+
+class WorkforceRollupTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app("testing")
+        with cls.app.app_context():
+            db.create_all()
+
+    def _snapshot(self):
+        return {
+            (row.metric, row.bucket): (row.count, float(row.salary_total))
+            for row in WorkforceRollup.query.all()
+            if row.count
+        }
+
+    def _assert_matches_rebuild(self):
+        incremental = self._snapshot()
+        rebuild_workforce_rollup()
+        db.session.flush()
+        self.assertEqual(incremental, self._snapshot())
+        db.session.rollback()
+
+    def test_orm_changes_keep_the_rollup_in_sync(self):
+        with self.app.app_context():
+            rebuild_workforce_rollup()
+            db.session.commit()
+
+            tag = uuid.uuid4().hex[:8]
+            employee = Employee(
+                first_name="Roll", last_name="Up", email=f"{tag}@example.com", phone="0600000000",
+                address="1 rue", city="Rabat", zip="10000", country="MA", cin=f"R{tag}",
+                cnss_number=f"RC{tag}", amo_number=f"RA{tag}", bank_account=f"B{tag}",
+            )
+            db.session.add(employee)
+            db.session.flush()
+            contract = Contract(
+                employee_id=employee.id, contract_type="CDD", hiring_date=date.today(),
+                expiration_date=date.today() + timedelta(days=30), position="Dev", department="IT",
+                base_salary=9000,
+            )
+            db.session.add(contract)
+            db.session.commit()
+            self._assert_matches_rebuild()
+
+            contract = db.session.get(Contract, contract.id)
+            contract.expiration_date = None
+            contract.base_salary = 9500
+            db.session.commit()
+            self._assert_matches_rebuild()
+
+            db.session.delete(db.session.get(Contract, contract.id))
+            db.session.delete(db.session.get(Employee, employee.id))
+            db.session.commit()
+            self._assert_matches_rebuild()
+
+
+if __name__ == "__main__":
+    unittest.main()
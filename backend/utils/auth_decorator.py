@@ -1,12 +1,60 @@
 """
 Simple authentication decorator for Flask routes.
 Checks JWT tokens from cookies or Authorization header.
+
+The token is decoded and verified at most once per request: the outcome is
+stored on `g`, so stacking @auth_required and @role_required costs a single
+verification (and, thanks to the user cache, usually no query at all).
 """
 from functools import wraps
 from flask import request, jsonify, g
 from utils.jwt_utils import verify_token
 
 
+def _get_request_token():
+    """
+    Find the JWT token in:
+    1. HTTP-only cookie named 'auth_token'
+    2. Authorization header (Bearer token)
+    """
+    token = request.cookies.get('auth_token')
+    if not token:
+        auth_header = request.headers.get('Authorization')
+        if auth_header and auth_header.startswith('Bearer '):
+            token = auth_header.split(' ')[1]
+    return token
+
+
+def authenticate_request():
+    """
+    Authenticate the current request once and remember the outcome on `g`.
+
+    Returns:
+        tuple: (user, error_response) - exactly one of them is None
+    """
+    if 'auth_error' not in g:
+        token = _get_request_token()
+        user = verify_token(token) if token else None
+        g.current_user = user
+        if not token:
+            g.auth_error = 'No token provided'
+        elif not user:
+            g.auth_error = 'Token is invalid or expired'
+        else:
+            g.auth_error = None
+
+    if g.auth_error == 'No token provided':
+        return None, (jsonify({
+            'error': 'Authentication required',
+            'message': g.auth_error
+        }), 401)
+    if g.auth_error:
+        return None, (jsonify({
+            'error': 'Invalid token',
+            'message': g.auth_error
+        }), 401)
+    return g.current_user, None
+
 
 def auth_required(f):
     """
@@ -14,41 +62,18 @@ def auth_required(f):
     Checks for JWT token in:
     1. HTTP-only cookie named 'auth_token'
     2. Authorization header (Bearer token)
-    
+
     If valid token found, stores user in g.current_user
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Try to get token from cookie first
-        token = request.cookies.get('auth_token')
-        
-        # If no cookie, try Authorization header
-        if not token:
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-        
-        # If no token found
-        if not token:
-            return jsonify({
-                'error': 'Authentication required',
-                'message': 'No token provided'
-            }), 401
-        
-        # Verify the token
-        user = verify_token(token)
-        if not user:
-            return jsonify({
-                'error': 'Invalid token',
-                'message': 'Token is invalid or expired'
-            }), 401
-        
-        # Store user in Flask's g object for use in the route
-        g.current_user = user
-        
+        user, error_response = authenticate_request()
+        if error_response:
+            return error_response
+
         # Call the original function
         return f(*args, **kwargs)
-    
+
     return decorated_function
 
 def role_required(required_role):
@@ -59,40 +84,17 @@ def role_required(required_role):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # Try to get token from cookie first
-            token = request.cookies.get('auth_token')
-            
-            # If no cookie, try Authorization header
-            if not token:
-                auth_header = request.headers.get('Authorization')
-                if auth_header and auth_header.startswith('Bearer '):
-                    token = auth_header.split(' ')[1]
-            
-            # If no token found
-            if not token:
-                return jsonify({
-                    'error': 'Authentication required',
-                    'message': 'No token provided'
-                }), 401
-            
-            # Verify the token
-            user = verify_token(token)
-            if not user:
-                return jsonify({
-                    'error': 'Invalid token',
-                    'message': 'Token is invalid or expired'
-                }), 401
-            
+            user, error_response = authenticate_request()
+            if error_response:
+                return error_response
+
             # Check if user has the required role
             if getattr(user, 'role', None) != required_role:
                 return jsonify({
                     'error': 'Access denied',
                     'message': 'Role required'
                 }), 403
-            
-            # Store user in Flask's g object for use in the route
-            g.current_user = user
-            
+
             # Call the original function
             return f(*args, **kwargs)
         return decorated_function
@@ -109,50 +111,27 @@ def get_current_user():
 
 def admin_required(f):
     """
-    Simple decorator that requires authentication.
+    Simple decorator that requires an authenticated admin.
     Checks for JWT token in:
     1. HTTP-only cookie named 'auth_token'
     2. Authorization header (Bearer token)
-    
+
     If valid token found, stores user in g.current_user
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Try to get token from cookie first
-        token = request.cookies.get('auth_token')
-        
-        # If no cookie, try Authorization header
-        if not token:
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-        
-        # If no token found
-        if not token:
-            return jsonify({
-                'error': 'Authentication required',
-                'message': 'No token provided'
-            }), 401
-        
-        # Verify the token
-        user = verify_token(token)
-        if not user:
-            return jsonify({
-                'error': 'Invalid token',
-                'message': 'Token is invalid or expired'
-            }), 401
-        
+        user, error_response = authenticate_request()
+        if error_response:
+            return error_response
+
         # Check if user is admin
         if user.role != 'admin':
             return jsonify({
                 'error': 'Access denied',
                 'message': 'Admin role required'
             }), 403
-        
-        # Store user in Flask's g object for use in the route
-        g.current_user = user
-        
+
         # Call the original function
         return f(*args, **kwargs)
-    
-    return decorated_function
\ No newline at end of file
+
+    return decorated_function
@@ -0,0 +1,160 @@
+"""
+In-memory snapshot of the configured contribution rates.
+
+The contribution_rates table is loaded once per process and kept in memory,
+so simulations and payroll runs resolve rates without touching the database.
+Once a transaction that wrote to the table commits, the 'contribution_rates'
+counter in cache_versions is bumped in a short transaction of its own (like
+the table versions of utils/http_cache.py, so the writer never holds the
+counter row locked) and this process reloads on its next lookup. Other workers
+compare the counter with the version of their snapshot at most once every
+CONTRIBUTION_RATES_CHECK_INTERVAL seconds and reload when it changed. Checks
+and reloads run on a connection of their own, outside the snapshot lock, so a
+failure can't leave the caller's session in an aborted transaction and a slow
+query doesn't hold up the threads reading the current snapshot.
+"""
+import re
+import threading
+import time
+from bisect import bisect_right
+from datetime import date, datetime
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+from config import Config
+from models import db
+from models.contribution_rate import ContributionRate
+from utils.versioning import bump_version, get_version
+
+RATES_VERSION_KEY = 'contribution_rates'
+
+
+def rate_key(name):
+    """Map a configured rate name to its simulation key ('CNSS Employee' -> 'cnss_employee')."""
+    return re.sub(r'[^a-z0-9]+', '_', (name or '').lower()).strip('_')
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        return datetime.fromisoformat(value).date()
+    return None
+
+
+class RateSnapshot:
+    """Effective-dated rates of one version of the contribution_rates table."""
+
+    def __init__(self, version, rates):
+        self.version = version
+        # key -> (sorted effective dates, rates); undated rows apply from the beginning
+        self._timelines = {}
+        for key, entries in rates.items():
+            entries.sort(key=lambda entry: entry[0])
+            self._timelines[key] = ([d for d, _ in entries], [r for _, r in entries])
+
+    @classmethod
+    def load(cls, version, connection):
+        rates = {}
+        rows = connection.execute(
+            select(ContributionRate.name, ContributionRate.rate, ContributionRate.effective_date)
+        )
+        for name, rate, effective_date in rows:
+            effective = _as_date(effective_date) or date.min
+            rates.setdefault(rate_key(name), []).append((effective, float(rate)))
+        return cls(version, rates)
+
+    def rates_as_of(self, as_of=None):
+        """Rates in force on `as_of` (default: today), keyed like build_contribution_rates."""
+        as_of = _as_date(as_of) or date.today()
+        resolved = {}
+        for key, (dates, values) in self._timelines.items():
+            index = bisect_right(dates, as_of) - 1
+            if index >= 0:
+                resolved[key] = values[index]
+        return resolved
+
+
+_snapshot = None
+_checked_at = 0.0
+# Set after a local commit: reload even if the version read predates the bump
+_stale = False
+_lock = threading.Lock()
+
+
+def get_configured_rates(as_of=None):
+    """
+    Return the configured rates in force on `as_of` from the in-memory snapshot.
+
+    Needs an app context; reloads the snapshot when the database version moved.
+    """
+    global _snapshot, _checked_at, _stale
+    interval = Config.CONTRIBUTION_RATES_CHECK_INTERVAL
+    with _lock:
+        now = time.monotonic()
+        snapshot, stale = _snapshot, _stale
+        check = snapshot is None or stale or now - _checked_at >= interval
+        if check:
+            # Claim the check: other threads keep serving the current snapshot meanwhile
+            _checked_at, _stale = now, False
+    if not check:
+        return snapshot.rates_as_of(as_of)
+
+    try:
+        with db.engine.connect() as connection:
+            # Read the version first: a write racing with the load only causes another reload
+            version = get_version(RATES_VERSION_KEY, connection)
+            if snapshot is None or stale or version != snapshot.version:
+                snapshot = RateSnapshot.load(version, connection)
+    except Exception as e:
+        # Keep serving the last snapshot (or the defaults) if the table is unavailable
+        print(f"Contribution rates reload failed: {e}")
+        with _lock:
+            _checked_at = 0.0
+            _stale = _stale or stale
+        return snapshot.rates_as_of(as_of) if snapshot is not None else {}
+
+    with _lock:
+        # Don't replace a newer snapshot loaded by a faster thread; a commit made
+        # during the load left _stale set, so the next lookup reloads again
+        if _snapshot is None or snapshot.version >= _snapshot.version:
+            _snapshot = snapshot
+        snapshot = _snapshot
+    return snapshot.rates_as_of(as_of)
+
+
+def invalidate_rates():
+    """Force the next lookup in this process to reload the rates."""
+    global _stale
+    with _lock:
+        _stale = True
+
+
+@event.listens_for(ContributionRate, 'after_insert')
+@event.listens_for(ContributionRate, 'after_update')
+@event.listens_for(ContributionRate, 'after_delete')
+def _note_change(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info['contribution_rates_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_after_commit(session):
+    if not session.info.pop('contribution_rates_changed', False):
+        return
+    invalidate_rates()
+    try:
+        with session.get_bind().begin() as connection:
+            bump_version(RATES_VERSION_KEY, connection)
+    except Exception as e:
+        # The write is committed; other workers only pick it up after the next bump
+        print(f"Contribution rates version bump failed: {e}")
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _forget_rolled_back(session, transaction):
+    # after_commit already took the flag of a committed transaction
+    if transaction.parent is None:
+        session.info.pop('contribution_rates_changed', None)
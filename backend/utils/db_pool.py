@@ -0,0 +1,130 @@
+"""
+Database connection pool settings and statistics.
+
+engine_options() turns the DB_* settings of config.py into
+SQLALCHEMY_ENGINE_OPTIONS: a bounded QueuePool with pre-ping (connections
+dropped by a Postgres restart are replaced instead of failing the request),
+recycling and a server-side statement timeout. In PgBouncer mode the app
+keeps no pool of its own (PgBouncer does the pooling) and sends no startup
+options, which PgBouncer rejects.
+
+The QueuePool records how often checkouts had to wait for a free connection
+or timed out; pool_stats() reports these with the pool's live counters for
+the current worker process.
+"""
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool counting checkouts, waits for a free connection, timeouts and reconnects."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.metrics = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'timeouts': 0,
+            'connects': 0,
+            'invalidations': 0,
+        }
+        # recreate() (engine.dispose()) copies the listeners and shares the counters
+        if '_dispatch' not in kwargs:
+            event.listen(self, 'checkout', lambda *args: self._count('checkouts'))
+            event.listen(self, 'connect', lambda *args: self._count('connects'))
+            event.listen(self, 'invalidate', lambda *args: self._count('invalidations'))
+
+    def recreate(self):
+        pool = super().recreate()
+        pool._metrics_lock, pool.metrics = self._metrics_lock, self.metrics
+        return pool
+
+    def _count(self, name, amount=1):
+        with self._metrics_lock:
+            self.metrics[name] += amount
+
+    def _do_get(self):
+        # Same test as QueuePool: no idle connection and no overflow left, so this checkout blocks
+        saturated = (
+            self._max_overflow > -1 and self._overflow >= self._max_overflow and self.checkedin() == 0
+        )
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self._count('timeouts')
+            raise
+        finally:
+            if saturated:
+                with self._metrics_lock:
+                    self.metrics['waits'] += 1
+                    self.metrics['wait_seconds'] += time.perf_counter() - start
+
+
+def engine_options(config):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings.
+
+    Args:
+        config: Mapping with the settings (app.config)
+
+    Returns:
+        dict: Keyword arguments for create_engine
+    """
+    uri = config.get('SQLALCHEMY_DATABASE_URI') or ''
+    is_postgres = uri.startswith('postgres')
+    options = {'pool_pre_ping': config.get('DB_POOL_PRE_PING', True)}
+
+    if config.get('DB_PGBOUNCER', False):
+        options['poolclass'] = NullPool
+        if uri.startswith('postgresql+psycopg:'):
+            # psycopg 3 prepares repeated statements, which transaction pooling breaks
+            options['connect_args'] = {'prepare_threshold': None}
+        return options
+
+    if uri.startswith('sqlite'):
+        # SQLite keeps SQLAlchemy's default pool for its driver
+        return options
+
+    options.update({
+        'poolclass': MeteredQueuePool,
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+    })
+    statement_timeout = config.get('DB_STATEMENT_TIMEOUT_MS', 0)
+    if is_postgres and statement_timeout:
+        options['connect_args'] = {'options': f'-c statement_timeout={int(statement_timeout)}'}
+    return options
+
+
+def pool_stats(engine):
+    """
+    Live statistics of the engine's connection pool in this worker process.
+
+    Returns:
+        dict: Pool class, occupancy (QueuePool) and the MeteredQueuePool counters
+    """
+    pool = engine.pool
+    stats = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            # Negative while fewer than pool_size connections are open
+            'overflow': max(pool.overflow(), 0),
+            'timeout': pool.timeout(),
+        })
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        with pool._metrics_lock:
+            stats.update(metrics)
+        stats['wait_seconds'] = round(stats['wait_seconds'], 6)
+    return stats
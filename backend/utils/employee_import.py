@@ -0,0 +1,220 @@
+"""
+Bulk import of employees (and optionally their contracts) from CSV.
+
+All rows are parsed and validated before anything is written: required
+fields, formats, column lengths, duplicates inside the file and conflicts with
+existing employees (one set-based query per unique column, see
+utils/validation.py). Valid rows are
+then inserted with multi-row INSERT statements; invalid rows are reported
+with their CSV line number.
+"""
+import csv
+import io
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import insert
+from models import db
+from models.company import Company
+from models.contract import Contract
+from models.employee import Employee
+from utils.validation import EMPLOYEE_UNIQUE_FIELDS, find_existing_values
+from utils.workforce_rollup import add_contract_delta, add_employee_delta, apply_workforce_deltas
+
+EMPLOYEE_REQUIRED_FIELDS = [
+    'first_name', 'last_name', 'email', 'phone', 'address', 'city', 'zip', 'country',
+    'cin', 'cnss_number', 'amo_number', 'bank_account',
+]
+EMPLOYEE_OPTIONAL_FIELDS = ['cimr_number', 'status']
+
+CONTRACT_REQUIRED_FIELDS = ['hiring_date', 'position', 'department', 'base_salary']
+CONTRACT_OPTIONAL_FIELDS = ['contract_type', 'expiration_date', 'payments_status', 'company_id']
+EMPLOYEE_STATUSES = ('active', 'on_leave', 'fired')
+CONTRACT_TYPES = ('CDI', 'CDD', 'Intern', 'Freelance')
+PAYMENT_STATUSES = ('pending', 'paid')
+
+class CsvImportError(ValueError):
+    """Raised when the upload itself cannot be imported (not a per-row problem)."""
+
+
+def read_csv_rows(text):
+    """Parse CSV text into (line_number, row dict) pairs with normalized headers and values."""
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise CsvImportError('The CSV file is empty')
+    reader.fieldnames = [(name or '').strip().lower() for name in reader.fieldnames]
+    missing = [field for field in EMPLOYEE_REQUIRED_FIELDS if field not in reader.fieldnames]
+    if missing:
+        raise CsvImportError(f"Missing required columns: {', '.join(missing)}")
+
+    rows = []
+    for row in reader:
+        values = {key: (value or '').strip() for key, value in row.items() if key}
+        if any(values.values()):
+            # Header is line 1
+            rows.append((reader.line_num, values))
+    return rows
+
+
+def _max_length(model, field):
+    return getattr(model.__table__.c[field].type, 'length', None)
+
+
+def _parse_date(value, field, errors):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        errors.append(f'{field} must be a date (YYYY-MM-DD)')
+        return None
+
+
+def _validate_row(values, default_company_id):
+    """Validate one CSV row and build its employee and contract values."""
+    errors = []
+
+    employee = {}
+    for field in EMPLOYEE_REQUIRED_FIELDS + EMPLOYEE_OPTIONAL_FIELDS:
+        value = values.get(field) or None
+        if value is None and field in EMPLOYEE_REQUIRED_FIELDS:
+            errors.append(f'{field} is required')
+        length = _max_length(Employee, field)
+        if value and length and len(value) > length:
+            errors.append(f'{field} is longer than {length} characters')
+        employee[field] = value
+    employee['status'] = employee['status'] or 'active'
+    if employee['status'] not in EMPLOYEE_STATUSES:
+        errors.append(f"status must be one of {', '.join(EMPLOYEE_STATUSES)}")
+
+    contract = None
+    contract_fields = CONTRACT_REQUIRED_FIELDS + CONTRACT_OPTIONAL_FIELDS
+    if any(values.get(field) for field in contract_fields if field != 'company_id'):
+        contract = {}
+        for field in CONTRACT_REQUIRED_FIELDS:
+            if not values.get(field):
+                errors.append(f'{field} is required for the contract')
+        for field in ('position', 'department'):
+            length = _max_length(Contract, field)
+            if values.get(field) and length and len(values[field]) > length:
+                errors.append(f'{field} is longer than {length} characters')
+        contract['position'] = values.get('position')
+        contract['department'] = values.get('department')
+
+        contract['hiring_date'] = _parse_date(values['hiring_date'], 'hiring_date', errors) if values.get('hiring_date') else None
+        contract['expiration_date'] = (
+            _parse_date(values['expiration_date'], 'expiration_date', errors) if values.get('expiration_date') else None
+        )
+
+        contract['base_salary'] = None
+        if values.get('base_salary'):
+            try:
+                contract['base_salary'] = Decimal(values['base_salary'])
+                if contract['base_salary'] <= 0:
+                    errors.append('base_salary must be positive')
+            except InvalidOperation:
+                errors.append('base_salary must be a number')
+
+        contract['contract_type'] = values.get('contract_type') or 'CDI'
+        if contract['contract_type'] not in CONTRACT_TYPES:
+            errors.append(f"contract_type must be one of {', '.join(CONTRACT_TYPES)}")
+        contract['payments_status'] = values.get('payments_status') or 'pending'
+        if contract['payments_status'] not in PAYMENT_STATUSES:
+            errors.append(f"payments_status must be one of {', '.join(PAYMENT_STATUSES)}")
+
+        company_id = values.get('company_id') or default_company_id
+        try:
+            contract['company_id'] = int(company_id) if company_id else None
+        except ValueError:
+            errors.append('company_id must be a number')
+
+    return employee, contract, errors
+
+
+def validate_import(rows, default_company_id=None):
+    """
+    Validate parsed CSV rows.
+
+    Returns:
+        tuple: (valid, errors) - valid is a list of (line, employee, contract);
+        errors is a list of {'row': line, 'errors': [...]}
+    """
+    candidates = []
+    row_errors = {}
+    for line, values in rows:
+        employee, contract, errors = _validate_row(values, default_company_id)
+        candidates.append((line, employee, contract))
+        if errors:
+            row_errors[line] = errors
+
+    # Duplicates inside the file: the first occurrence wins
+    for field in EMPLOYEE_UNIQUE_FIELDS:
+        seen = {}
+        for line, employee, _ in candidates:
+            value = employee.get(field)
+            if not value:
+                continue
+            if value in seen:
+                row_errors.setdefault(line, []).append(f'{field} {value!r} is duplicated on row {seen[value]}')
+            else:
+                seen[value] = line
+
+    # Conflicts with existing employees: one query per unique column
+    for field in EMPLOYEE_UNIQUE_FIELDS:
+        values = {employee[field] for _, employee, _ in candidates if employee.get(field)}
+        if not values:
+            continue
+        existing = find_existing_values(getattr(Employee, field), values)
+        for line, employee, _ in candidates:
+            if employee.get(field) in existing:
+                row_errors.setdefault(line, []).append(f'Employee with this {field} already exists')
+
+    company_ids = {contract['company_id'] for _, _, contract in candidates if contract and contract.get('company_id')}
+    if company_ids:
+        known = find_existing_values(Company.id, company_ids)
+        for line, _, contract in candidates:
+            if contract and contract.get('company_id') and contract['company_id'] not in known:
+                row_errors.setdefault(line, []).append('Invalid company_id: company not found')
+
+    valid = [candidate for candidate in candidates if candidate[0] not in row_errors]
+    errors = [{'row': line, 'errors': messages} for line, messages in sorted(row_errors.items())]
+    return valid, errors
+
+
+def insert_import(valid, batch_size=1000):
+    """
+    Insert validated employees and their contracts with multi-row INSERTs.
+    The caller owns the transaction (commit or rollback).
+
+    Returns:
+        dict: Number of employees and contracts created
+    """
+    now = datetime.now(timezone.utc)
+    batch_size = max(1, batch_size)
+    created = {'employees': 0, 'contracts': 0}
+    # Multi-row INSERTs skip the mapper events that maintain the workforce rollup
+    deltas = defaultdict(dict)
+
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start:start + batch_size]
+        employee_rows = [{**employee, 'created_at': now, 'updated_at': now} for _, employee, _ in batch]
+        # RETURNING with parameter order gives each new id back to its row
+        employee_ids = db.session.execute(
+            insert(Employee).returning(Employee.id, sort_by_parameter_order=True), employee_rows
+        ).scalars().all()
+
+        contract_rows = [
+            {**contract, 'employee_id': employee_id, 'created_at': now, 'updated_at': now}
+            for (_, _, contract), employee_id in zip(batch, employee_ids)
+            if contract
+        ]
+        if contract_rows:
+            db.session.execute(insert(Contract), contract_rows)
+
+        for row in employee_rows:
+            add_employee_delta(deltas, row)
+        for row in contract_rows:
+            add_contract_delta(deltas, row)
+        created['employees'] += len(employee_rows)
+        created['contracts'] += len(contract_rows)
+
+    apply_workforce_deltas(db.session.connection(), deltas)
+    return created
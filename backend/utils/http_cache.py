@@ -0,0 +1,159 @@
+"""
+Conditional GET (ETag / Last-Modified) for read-heavy endpoints.
+
+Writes to versioned tables are noted on the session: ORM flushes through an
+after_flush hook, ORM bulk statements (session.execute(insert(Employee)),
+query.delete(), ...) through do_orm_execute. Once the transaction commits,
+the counters of those tables in cache_versions are bumped in a short
+transaction of their own, in a fixed table order. Bumping inside the writer's
+transaction would hold the counter row locked until its commit (a payroll run
+would block every other payslip write) and could deadlock. Core statements on
+plain tables skip both hooks and must call bump_table_versions() themselves.
+
+@conditional_get('employees', 'contracts') then reads the counters of the
+tables a view depends on (one query) and derives a weak ETag from them, the
+request URL, the user and the current date (dashboard figures such as
+"this month" move with the day). A matching If-None-Match / If-Modified-Since
+is answered with 304 before the view runs, so nothing is queried or
+serialized. The versions are read before the data, so a response is never
+labelled with a newer version than it reflects: a write racing with the view
+(or committed just before its bump) only makes the next ETag differ.
+"""
+import hashlib
+from datetime import date, datetime, time, timezone
+from functools import wraps
+from flask import current_app, g, request
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from models import db
+from models.cache_version import CacheVersion
+from utils.versioning import bump_version
+
+# contribution_rates keeps its own mapper events (utils/contribution_rates.py)
+VERSIONED_TABLES = frozenset({'companies', 'employers', 'employees', 'contracts', 'payslips'})
+
+
+def bump_table_versions(connection, *tables):
+    """Bump the counters of the given tables on `connection`, in a fixed order."""
+    for table in sorted(set(tables) & VERSIONED_TABLES):
+        bump_version(table, connection)
+
+
+def _note_changes(session, tables):
+    tables = set(tables) & VERSIONED_TABLES
+    if tables:
+        session.info.setdefault('changed_tables', set()).update(tables)
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_flush(session, flush_context):
+    # The session still lists the flushed objects at this point
+    changed = [*session.new, *session.deleted, *(obj for obj in session.dirty if session.is_modified(obj))]
+    _note_changes(session, {obj.__table__.name for obj in changed if hasattr(obj, '__table__')})
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _note_bulk_statement(orm_execute_state):
+    if orm_execute_state.is_select or orm_execute_state.bind_mapper is None:
+        return
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _note_changes(orm_execute_state.session, {orm_execute_state.bind_mapper.persist_selectable.name})
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_after_commit(session):
+    tables = session.info.pop('changed_tables', None)
+    if not tables:
+        return
+    try:
+        with session.get_bind().begin() as connection:
+            bump_table_versions(connection, *tables)
+    except Exception as e:
+        # The write is committed; clients only keep their copy until the next bump
+        print(f"Cache version bump failed for {sorted(tables)}: {e}")
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _forget_rolled_back(session, transaction):
+    # after_commit already took the tables of a committed transaction
+    if transaction.parent is None:
+        session.info.pop('changed_tables', None)
+
+
+def table_versions(tables):
+    """
+    Current versions of the given tables.
+
+    Returns:
+        tuple: ({table: version}, latest updated_at or None)
+    """
+    rows = db.session.execute(
+        select(CacheVersion.name, CacheVersion.version, CacheVersion.updated_at)
+        .where(CacheVersion.name.in_(tables))
+    ).all()
+    versions = {table: 0 for table in tables}
+    last_modified = None
+    for name, version, updated_at in rows:
+        versions[name] = version
+        if updated_at is not None:
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            last_modified = max(last_modified or updated_at, updated_at)
+    return versions, last_modified
+
+
+def _cache_control():
+    max_age = current_app.config.get('HTTP_CACHE_MAX_AGE', 0)
+    if max_age > 0:
+        return f'private, max-age={max_age}, must-revalidate'
+    # Stored by the browser, but revalidated on every use
+    return 'private, no-cache'
+
+
+def conditional_get(*tables):
+    """
+    Decorator answering GET requests with 304 when the tables did not change.
+    Place it under @auth_required (responses are per user).
+
+    Usage: @conditional_get('employees', 'contracts')
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method != 'GET' or not current_app.config.get('HTTP_CACHE_ENABLED', True):
+                return f(*args, **kwargs)
+
+            versions, last_modified = table_versions(tables)
+            today = date.today()
+            user = g.get('current_user')
+            fingerprint = '|'.join([
+                request.full_path,
+                str(getattr(user, 'id', '')),
+                getattr(user, 'role', '') or '',
+                today.isoformat(),
+                *(f'{table}:{versions[table]}' for table in sorted(versions)),
+            ])
+            etag = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+            if last_modified is not None:
+                # The date is part of the ETag: a new day also counts as a modification
+                midnight = datetime.combine(today, time.min, tzinfo=timezone.utc)
+                last_modified = max(last_modified, midnight).replace(microsecond=0)
+
+            not_modified = request.if_none_match.contains_weak(etag) if request.if_none_match else (
+                last_modified is not None and request.if_modified_since is not None
+                and last_modified <= request.if_modified_since
+            )
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = _cache_control()
+            return response
+        return decorated_function
+    return decorator
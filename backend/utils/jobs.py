@@ -0,0 +1,176 @@
+"""
+In-process background jobs for long payroll operations.
+
+Jobs are persisted in the `jobs` table and executed on a small thread pool
+owned by each web worker, so the request that submits a job returns at once
+and any worker can report its status. Handlers are plain functions registered
+with @register_job(job_type); they receive the job params and a progress
+callback, and return (result, result_url).
+
+A job only lives in the pool of the worker that submitted it (recorded as
+`worker`, "hostname:pid"). When that process dies the job can never finish,
+so every worker marks such orphans as failed when it starts.
+"""
+import os
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import or_, update
+from models import db
+from models.job import Job
+
+JOB_HANDLERS = {}
+
+HOSTNAME = socket.gethostname()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def register_job(job_type):
+    """
+    Decorator registering a job handler.
+    Usage: @register_job('payroll_run')
+    """
+    def decorator(f):
+        JOB_HANDLERS[job_type] = f
+        return f
+    return decorator
+
+
+def _get_executor(app):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get('JOB_WORKERS', 2),
+                thread_name_prefix='smartpay-job',
+            )
+    return _executor
+
+
+def submit_job(job_type, params=None, user_id=None):
+    """
+    Persist a new job and schedule it on the background pool.
+
+    Returns:
+        Job: The queued job (already committed, so any worker can read it)
+    """
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f'Unknown job type: {job_type}')
+
+    job = Job(
+        id=uuid.uuid4().hex,
+        job_type=job_type,
+        status='queued',
+        params=params or {},
+        created_by=user_id,
+        worker=f'{HOSTNAME}:{os.getpid()}',
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    _get_executor(app).submit(_run_job, app, job.id)
+    return job
+
+
+def _update_job(job_id, **values):
+    # Job bookkeeping uses its own short transaction, so progress stays visible
+    # while the handler's own work is still uncommitted
+    with db.engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == job_id).values(**values))
+
+
+def _run_job(app, job_id):
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        if job is None:
+            return
+        job_type = job.job_type
+        handler = JOB_HANDLERS[job_type]
+        params = dict(job.params or {})
+        db.session.rollback()
+
+        _update_job(job_id, status='running', started_at=datetime.now(timezone.utc))
+
+        last_progress = {'progress_current': 0, 'progress_total': None}
+
+        def progress(current, total=None):
+            last_progress.update(progress_current=current, progress_total=total)
+            try:
+                _update_job(job_id, progress_current=current, progress_total=total)
+            except Exception as e:
+                # Progress is best effort; never fail the job because of it
+                print(f"Job {job_id} progress update failed: {e}")
+
+        try:
+            result, result_url = handler(params, progress)
+            _update_job(
+                job_id,
+                status='succeeded',
+                **last_progress,
+                result=result,
+                result_url=result_url,
+                finished_at=datetime.now(timezone.utc),
+            )
+        except Exception as e:
+            db.session.rollback()
+            print(f"Job {job_id} ({job_type}) failed: {traceback.format_exc()}")
+            _update_job(
+                job_id,
+                status='failed',
+                error=str(e),
+                finished_at=datetime.now(timezone.utc),
+            )
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def fail_orphaned_jobs(max_age_hours=24):
+    """
+    Mark queued or running jobs whose worker is gone as failed.
+
+    A job is orphaned when its worker ran on this host and the process no
+    longer exists, when it has no recorded worker, or (workers on other hosts
+    cannot be checked) when it was created more than `max_age_hours` ago.
+
+    Returns:
+        int: Number of jobs marked as failed
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+    orphans = []
+    candidates = db.session.query(Job.id, Job.worker, Job.created_at).filter(
+        Job.status.in_(('queued', 'running'))
+    ).all()
+    for job_id, worker, created_at in candidates:
+        host, _, pid = (worker or '').rpartition(':')
+        if created_at is not None and created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        if (not worker or (host == HOSTNAME and pid.isdigit() and not _process_alive(int(pid)))
+                or (created_at is not None and created_at < cutoff)):
+            orphans.append(job_id)
+    db.session.rollback()
+
+    if orphans:
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(Job).where(Job.id.in_(orphans), or_(Job.status == 'queued', Job.status == 'running')).values(
+                    status='failed',
+                    error='Interrupted: the worker running this job stopped',
+                    finished_at=datetime.now(timezone.utc),
+                )
+            )
+    return len(orphans)
@@ -1,7 +1,7 @@
 import jwt
 from datetime import datetime, timezone, timedelta
 from config import Config
-from models.user import User
+from utils.user_cache import get_user
 
 def generate_token(user):
     """Generate JWT token for user"""
@@ -16,11 +16,11 @@ def generate_token(user):
     return jwt.encode(payload, Config.JWT_SECRET_KEY, algorithm='HS256')
 
 def verify_token(token):
-    """Verify JWT token and return user"""
+    """Verify JWT token and return user (resolved through the in-process user cache)"""
     try:
         payload = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=['HS256'])
         user_id = payload['user_id']
-        user = User.query.filter_by(id=user_id).first()
+        user = get_user(user_id)
         
         if not user or not user.is_active:
             return None
@@ -0,0 +1,109 @@
+"""
+Prometheus metrics for the API, served on /metrics.
+
+Request hooks record per-route latency, status codes and response sizes;
+SQLAlchemy cursor events count the statements of each request and the time
+spent in the database. Routes are labelled with their URL rule
+('/api/payslips/<payslip_id>'), never the raw path.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py prepares it)
+so every worker writes its samples there and /metrics aggregates all workers.
+prometheus_client is optional: without it, no metrics are collected and
+/metrics is not registered.
+"""
+import os
+import time
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = Histogram(
+        'smartpay_http_request_duration_seconds', 'Request latency',
+        ['blueprint', 'route', 'method'],
+    )
+    REQUESTS = Counter(
+        'smartpay_http_requests_total', 'Requests by status code',
+        ['blueprint', 'route', 'method', 'status'],
+    )
+    RESPONSE_SIZE = Histogram(
+        'smartpay_http_response_size_bytes', 'Response body size (streamed responses excluded)',
+        ['blueprint', 'route'], buckets=SIZE_BUCKETS,
+    )
+    DB_QUERIES = Histogram(
+        'smartpay_db_queries_per_request', 'SQL statements executed per request',
+        ['blueprint', 'route'], buckets=QUERY_COUNT_BUCKETS,
+    )
+    DB_TIME = Histogram(
+        'smartpay_db_time_per_request_seconds', 'Time spent executing SQL per request',
+        ['blueprint', 'route'],
+    )
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.db_queries = 0
+    g.db_time = 0.0
+
+
+def _after_request(response):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    blueprint = request.blueprint or 'app'
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    REQUEST_LATENCY.labels(blueprint, route, request.method).observe(time.perf_counter() - start)
+    REQUESTS.labels(blueprint, route, request.method, str(response.status_code)).inc()
+    if not response.is_streamed:
+        RESPONSE_SIZE.labels(blueprint, route).observe(response.calculate_content_length() or 0)
+    DB_QUERIES.labels(blueprint, route).observe(g.get('db_queries', 0))
+    DB_TIME.labels(blueprint, route).observe(g.get('db_time', 0.0))
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # On the execution context: a failed statement leaves nothing behind on the connection
+    if context is not None:
+        context._metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_metrics_query_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    if has_request_context() and 'db_queries' in g:
+        g.db_queries += 1
+        g.db_time += elapsed
+
+
+def metrics_view():
+    """Expose the metrics in the Prometheus text format (all workers in multiprocess mode)."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return Response(prometheus_client.generate_latest(registry), mimetype=prometheus_client.CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    """Install the request hooks and the /metrics route when prometheus_client is available."""
+    if prometheus_client is None or not app.config.get('METRICS_ENABLED', True):
+        return app
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    return app
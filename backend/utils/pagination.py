@@ -1,5 +1,24 @@
-from flask import request
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import current_app, request
 from math import ceil
+from sqlalchemy import Row, Table, inspect, text, tuple_
+from sqlalchemy.orm import load_only
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when the fields parameter names unknown fields."""
+
+
+# How paginate_query computes `total`: an exact COUNT, the planner's estimate
+# (PostgreSQL; small results are still counted exactly) or no total at all
+COUNT_STRATEGIES = ('exact', 'estimated', 'none')
 
 
 def get_pagination_params(default_page=1, default_limit=10, max_limit=100):
@@ -27,56 +46,308 @@ def get_pagination_params(default_page=1, default_limit=10, max_limit=100):
         return default_page, default_limit
 
 
-def paginate_query(query, page, limit):
+def get_cursor_param():
+    """
+    Extract the keyset pagination cursor from the request query string.
+
+    Returns:
+        str | None: None when the client paginates by page number, otherwise the
+        opaque cursor ('' requests the first page in cursor mode)
+    """
+    if 'cursor' not in request.args:
+        return None
+    return request.args.get('cursor', '')
+
+
+def get_count_param(default=None):
+    """
+    Extract the total count strategy (`count=exact|estimated|none`) from the request.
+
+    Args:
+        default: Strategy when the parameter is missing or invalid
+            (default: the PAGINATION_COUNT_STRATEGY setting)
+
+    Returns:
+        str: One of COUNT_STRATEGIES
+    """
+    default = default or current_app.config.get('PAGINATION_COUNT_STRATEGY', 'exact')
+    strategy = request.args.get('count', default)
+    return strategy if strategy in COUNT_STRATEGIES else default
+
+
+def get_fields_param(allowed, always=('id',)):
+    """
+    Extract the sparse fieldset (`fields=id,name,...`) from the request query string.
+
+    Args:
+        allowed: Field names the listing can return, in response order
+        always: Fields returned even when not requested (default: 'id')
+
+    Returns:
+        list | None: Requested fields in `allowed` order, or None for every field
+
+    Raises:
+        InvalidFieldsError: If a requested field is not in `allowed`
+    """
+    raw = request.args.get('fields', '')
+    requested = {name.strip() for name in raw.split(',') if name.strip()}
+    if not requested:
+        return None
+    unknown = sorted(requested.difference(allowed))
+    if unknown:
+        raise InvalidFieldsError(f"Unknown fields: {', '.join(unknown)}")
+    return [name for name in allowed if name in requested or name in always]
+
+
+def load_fields(query, model, fields, keyset=()):
+    """
+    Restrict the columns SELECTed for `model` to those the requested fields read.
+
+    Computed fields declare their columns in model.FIELD_COLUMNS; the keyset
+    columns are always loaded so the next cursor can be built. Fields that are
+    not columns of `model` (e.g. joined values) are ignored.
+
+    Args:
+        query: SQLAlchemy query selecting `model`
+        model: Model class
+        fields: Fields from get_fields_param (None loads every column)
+        keyset: Keyset columns passed to paginate_query
+
+    Returns:
+        Query with load_only applied
+    """
+    if fields is None:
+        return query
+    field_columns = getattr(model, 'FIELD_COLUMNS', {})
+    column_attrs = inspect(model).column_attrs
+    names = {column.key for column in keyset}
+    for field in fields:
+        names.update(field_columns.get(field, (field,)))
+    columns = [getattr(model, name) for name in sorted(names) if name in column_attrs]
+    return query.options(load_only(*columns))
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row of a page into an opaque cursor."""
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, keyset):
+    """
+    Decode a cursor produced by encode_cursor for the given keyset columns.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or does not match the keyset
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError('Malformed cursor') from e
+    if not isinstance(values, list) or len(values) != len(keyset):
+        raise InvalidCursorError('Cursor does not match this listing')
+
+    # Coerce every value to its column type so a tampered cursor fails here
+    # with a 400 instead of reaching the database
+    try:
+        return [_coerce_cursor_value(column, value) for column, value in zip(keyset, values)]
+    except (ValueError, TypeError, ArithmeticError) as e:
+        raise InvalidCursorError('Cursor does not match this listing') from e
+
+
+def _coerce_cursor_value(column, value):
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if isinstance(value, (bool, list, dict)):
+        raise TypeError(f'Unexpected cursor value {value!r}')
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is int:
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError(f'Expected an integer, got {value!r}')
+        return int(value)
+    if python_type is Decimal:
+        # encode_cursor writes Decimals as strings
+        return Decimal(str(value))
+    if python_type is float:
+        return float(value)
+    if python_type is str:
+        if not isinstance(value, str):
+            raise TypeError(f'Expected a string, got {value!r}')
+        return value
+    return value
+
+
+def _keyset_values(item, keyset):
+    # Rows such as (Employee, position, ...) carry the keyset on their first entity
+    if isinstance(item, Row):
+        item = item[0]
+    return [getattr(item, column.key) for column in keyset]
+
+
+def estimate_count(query):
+    """
+    Planner estimate of the number of rows matched by `query` (PostgreSQL only).
+
+    An unfiltered single-table query reads pg_class.reltuples (kept current by
+    ANALYZE/autovacuum); anything else uses the row estimate of EXPLAIN.
+
+    Returns:
+        int | None: Estimated row count, None when no estimate is available
+    """
+    session = query.session
+    bind = session.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return None
+
+    statement = query.order_by(None).statement
+    froms = statement.get_final_froms()
+    if statement.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table):
+        reltuples = session.execute(
+            text('SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)'),
+            {'name': froms[0].fullname}
+        ).scalar()
+        # -1 means the table was never analyzed
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+
+    compiled = statement.compile(dialect=bind.dialect, compile_kwargs={'render_postcompile': True})
+    plan = session.connection().exec_driver_sql(
+        f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def paginate_query(query, page, limit, keyset=None, cursor=None, count='exact'):
     """
     Paginate a SQLAlchemy query.
     
+    Offset mode (default) uses OFFSET/LIMIT and reports a total according to
+    `count`:
+      - 'exact': COUNT of the matching rows
+      - 'estimated': the planner's estimate (see estimate_count), falling back
+        to an exact COUNT below PAGINATION_ESTIMATE_THRESHOLD rows or when no
+        estimate is available
+      - 'none': no COUNT; `total` and `pages` are None
+    Except for exact counts, one extra row is fetched to know whether there is
+    a next page. The strategy actually used is reported as `count`.
+
+    Cursor mode (`cursor` is not None) seeks past the last row of the previous
+    page using the keyset columns, so page N costs the same as page 1; it skips
+    the COUNT and reports `next_cursor` instead of totals.
+
     Args:
-        query: SQLAlchemy query object
-        page: Current page number (1-indexed)
+        query: SQLAlchemy query object, ordered by the keyset columns (descending)
+        page: Current page number (1-indexed, offset mode only)
         limit: Number of items per page
+        keyset: Columns forming a unique, descending sort key, e.g. (Payslips.pay_year,
+            Payslips.pay_month, Payslips.id); required for cursor mode
+        cursor: Opaque cursor from a previous page ('' for the first page)
+        count: Total count strategy, one of COUNT_STRATEGIES (offset mode only)
     
     Returns:
-        tuple: (paginated_items, total_count, total_pages)
+        tuple: (paginated_items, pagination) - pagination is the response metadata dict
+
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded
     """
-    # Get total count
-    total_count = query.count()
-    
-    # Calculate total pages
-    total_pages = ceil(total_count / limit) if limit > 0 else 0
-    
+    if cursor is not None and keyset:
+        if cursor:
+            values = decode_cursor(cursor, keyset)
+            query = query.filter(tuple_(*keyset) < tuple_(*values))
+
+        # Fetch one extra row to know whether there is a next page
+        rows = query.limit(limit + 1).all()
+        paginated_items = rows[:limit]
+        has_next = len(rows) > limit
+
+        return paginated_items, {
+            'limit': limit,
+            'cursor': cursor,
+            'next_cursor': encode_cursor(_keyset_values(paginated_items[-1], keyset)) if has_next else None,
+            'has_next': has_next,
+            'has_prev': bool(cursor),
+            'count': 'none',
+        }
+
+    total_count = None
+    if count == 'estimated':
+        total_count = estimate_count(query)
+        threshold = current_app.config.get('PAGINATION_ESTIMATE_THRESHOLD', 10000)
+        if total_count is None or total_count < threshold:
+            count, total_count = 'exact', None
+    if count == 'exact':
+        total_count = query.count()
+
     # Apply pagination
     offset = (page - 1) * limit
-    paginated_items = query.offset(offset).limit(limit).all()
-    
-    return paginated_items, total_count, total_pages
+    if count == 'exact':
+        paginated_items = query.offset(offset).limit(limit).all()
+        total_pages = ceil(total_count / limit) if limit > 0 else 0
+        has_next = page < total_pages
+    else:
+        # Fetch one extra row to know whether there is a next page
+        rows = query.offset(offset).limit(limit + 1).all()
+        paginated_items = rows[:limit]
+        has_next = len(rows) > limit
+        total_pages = None
+        if total_count is not None:
+            if has_next:
+                total_count = max(total_count, offset + limit + 1)
+            elif paginated_items:
+                # Last page: the total is known exactly
+                total_count = offset + len(paginated_items)
+            else:
+                # Past the end the rows say nothing about the total
+                count, total_count = 'exact', query.count()
+            total_pages = ceil(total_count / limit)
 
+    pagination = {
+        'page': page,
+        'limit': limit,
+        'total': total_count,
+        'pages': total_pages,
+        'has_next': has_next,
+        'has_prev': page > 1,
+        'count': count,
+    }
+    # Let offset clients switch to cursor mode from any page
+    if keyset and paginated_items and has_next:
+        pagination['next_cursor'] = encode_cursor(_keyset_values(paginated_items[-1], keyset))
 
-def create_pagination_response(items, page, limit, total_count, total_pages, resource_name):
+    return paginated_items, pagination
+
+
+def create_pagination_response(items, pagination, resource_name, fields=None):
     """
     Create a standardized pagination response.
     
     Args:
         items: List of items for the current page
-        page: Current page number
-        limit: Items per page
-        total_count: Total number of items
-        total_pages: Total number of pages
+        pagination: Pagination metadata returned by paginate_query
         resource_name: Name of the resource (e.g., 'payslips', 'employees')
+        fields: Sparse fieldset from get_fields_param (default: every field)
     
     Returns:
         dict: Response dictionary with message, resource data, and pagination info
     """
+    if fields is None:
+        serialized = [item.to_dict() if hasattr(item, 'to_dict') else item for item in items]
+    else:
+        serialized = [item.to_dict(fields) if hasattr(item, 'to_dict') else item for item in items]
     return {
         'message': f'{resource_name.capitalize()} fetched successfully',
-        resource_name: [item.to_dict() if hasattr(item, 'to_dict') else item for item in items],
-        'pagination': {
-            'page': page,
-            'limit': limit,
-            'total': total_count,
-            'pages': total_pages,
-            'has_next': page < total_pages,
-            'has_prev': page > 1
-        }
+        resource_name: serialized,
+        'pagination': pagination
     }
 
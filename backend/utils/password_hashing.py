@@ -0,0 +1,70 @@
+"""
+bcrypt hashing on a bounded thread pool.
+
+Hashing and checking a password costs a few hundred milliseconds of CPU.
+Running it on the request thread let a burst of logins occupy every worker;
+now at most PASSWORD_HASH_WORKERS hashes run at once per process and at most
+PASSWORD_HASH_QUEUE more may wait for them. Beyond that, PasswordHasherBusy is
+raised at once so the auth endpoints answer 503 instead of piling up requests
+that payroll traffic is waiting behind.
+
+The caller's request thread waits for its hash, so workers + queue must stay
+below the request threads of the process (ASGI_THREADS under uvicorn); the
+default uses half of them. Under gunicorn sync workers a process serves one
+request at a time and the pool only moves bcrypt off the request thread.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from config import Config
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password pool and its queue are full."""
+
+
+class PasswordHasher:
+    """Run bcrypt on a fixed number of threads with a bounded queue."""
+
+    def __init__(self, workers=2, queue_size=16):
+        self.workers = workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        # One slot per running or waiting hash
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='smartpay-bcrypt')
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Too many password checks in progress')
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        """Return the bcrypt hash of a password (str)."""
+        return self._run(_hash, password)
+
+    def verify(self, password, hashed):
+        """Check a password against a bcrypt hash."""
+        return self._run(_verify, password, hashed)
+
+
+def _hash(password):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def _verify(password, hashed):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+password_hasher = PasswordHasher(workers=Config.PASSWORD_HASH_WORKERS, queue_size=Config.PASSWORD_HASH_QUEUE)
@@ -0,0 +1,308 @@
+"""
+Company-wide payroll helpers.
+Loads the workforce of a company so it can be simulated or paid in bulk,
+and generates a month of payslips for it in a single transaction.
+"""
+import calendar
+from collections import defaultdict
+from datetime import date, datetime, timezone
+import numpy as np
+from sqlalchemy import func, insert, select, true
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+from models.contract import Contract
+from models.employee import Employee
+from models.payslips import Payslips
+from utils.jobs import register_job
+from utils.payroll_rollup import add_payslip_delta, apply_rollup_deltas
+from utils.simulation import build_contribution_rates, build_simulation_input
+from utils.vectorized_simulation import compute_simulation_arrays, round_half_even
+
+
+def latest_contract_join():
+    """
+    Latest contract of each employee, to outer-join on the employees of a query.
+
+    On PostgreSQL this is a correlated LATERAL subquery (ORDER BY created_at DESC,
+    id DESC LIMIT 1 per employee, served by ix_contracts_employee_created), so
+    only the employees the query actually reads are looked up. SQLite has no
+    LATERAL and falls back to ranking all contracts with ROW_NUMBER().
+
+    Returns:
+        tuple: (selectable, onclause) for query.outerjoin(selectable, onclause)
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        latest = select(Contract).where(
+            Contract.employee_id == Employee.id
+        ).order_by(
+            Contract.created_at.desc(), Contract.id.desc()
+        ).limit(1).lateral('latest_contract')
+        return latest, true()
+
+    latest = db.session.query(
+        Contract,
+        func.row_number().over(
+            partition_by=Contract.employee_id,
+            order_by=(Contract.created_at.desc(), Contract.id.desc()),
+        ).label('rank'),
+    ).subquery('latest_contract')
+    return latest, (latest.c.employee_id == Employee.id) & (latest.c.rank == 1)
+
+
+def parse_variables(variables):
+    """
+    Validate per-employee payroll variables and key them by integer employee id.
+
+    Raises:
+        ValueError: If a key is not an employee id or a value is not an object
+    """
+    parsed = {}
+    for key, value in (variables or {}).items():
+        try:
+            employee_id = int(key)
+        except (TypeError, ValueError):
+            raise ValueError(f'variables keys must be employee ids, got {key!r}')
+        if not isinstance(value, dict):
+            raise ValueError(f'variables for employee {key} must be an object')
+        parsed[employee_id] = value
+    return parsed
+
+
+def _insert_payslips_statement():
+    """INSERT ... ON CONFLICT DO NOTHING RETURNING employee_id, or None if the dialect lacks it."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in ('postgresql', 'sqlite'):
+        return None
+    dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+    return dialect_insert(Payslips).on_conflict_do_nothing(
+        index_elements=['employee_id', 'company_id', 'pay_year', 'pay_month']
+    ).returning(Payslips.employee_id)
+
+
+def missing_company_contracts(company_id):
+    """
+    True when a company has no contract at all while some contracts have no company_id.
+
+    Contracts created before company_id existed (or without it) are invisible to
+    company-wide runs; callers reject the run instead of returning nothing.
+    """
+    def exists(*criteria):
+        return db.session.query(db.session.query(Contract.id).filter(*criteria).exists()).scalar()
+    return not exists(Contract.company_id == company_id) and exists(Contract.company_id.is_(None))
+
+
+def get_active_contracts(company_id, as_of=None):
+    """
+    Load the current contract of every active employee of a company in one query.
+
+    A contract is current when it has not expired at `as_of` (default: today).
+    If an employee has several current contracts, the most recent one wins.
+
+    Args:
+        company_id: Company whose workforce to load
+        as_of: Reference date for contract expiration (default: today)
+
+    Returns:
+        list: Contract objects, one per employee, ordered by employee_id
+    """
+    as_of = as_of or date.today()
+
+    contracts = Contract.query.join(
+        Employee, Employee.id == Contract.employee_id
+    ).filter(
+        Contract.company_id == company_id,
+        Employee.status == 'active',
+        Contract.hiring_date <= as_of,
+        (Contract.expiration_date.is_(None)) | (Contract.expiration_date >= as_of)
+    ).order_by(
+        Contract.employee_id, Contract.created_at.desc(), Contract.id.desc()
+    ).all()
+
+    # Keep the latest contract for each employee (rows are sorted newest first)
+    latest = {}
+    for contract in contracts:
+        latest.setdefault(contract.employee_id, contract)
+    return list(latest.values())
+
+
+def _period_bounds(pay_month, pay_year):
+    last_day = calendar.monthrange(pay_year, pay_month)[1]
+    return date(pay_year, pay_month, 1), date(pay_year, pay_month, last_day)
+
+
+def period_end(pay_month, pay_year):
+    """Last day of a pay period (the date payroll rates are resolved at)."""
+    return _period_bounds(pay_month, pay_year)[1]
+
+
+def generate_company_payslips(company_id, pay_month, pay_year, rates, variables=None, batch_size=1000, progress=None):
+    """
+    Compute and insert the payslips of every active employee of a company for one month.
+
+    Contracts are loaded in one query, pay is computed for the whole workforce
+    with the vectorized engine, and rows are written with multi-row INSERTs of
+    `batch_size` rows. Employees who already have a payslip for the period are
+    skipped; on PostgreSQL and SQLite the INSERT also skips (ON CONFLICT DO
+    NOTHING) payslips a concurrent run created meanwhile, and only the rows
+    actually inserted are counted and added to the rollup. The caller owns the
+    transaction (commit or rollback).
+
+    Args:
+        company_id: Company to run payroll for
+        pay_month: Pay month (1-12)
+        pay_year: Pay year
+        rates: Contribution rates (see build_contribution_rates)
+        variables: Optional {employee_id: {overtime_hours, overtime_rate, bonuses, allowances, deductions}}
+            (see parse_variables)
+        batch_size: Rows per INSERT statement
+        progress: Optional callback progress(done, total) called after each batch
+
+    Returns:
+        dict: Summary with created and skipped counts and payroll totals
+    """
+    variables = parse_variables(variables)
+    period_start, period_end = _period_bounds(pay_month, pay_year)
+
+    contracts = get_active_contracts(company_id, as_of=period_end)
+
+    # Skip employees already paid for this period (one query)
+    already_paid = {
+        employee_id for (employee_id,) in db.session.query(Payslips.employee_id).filter(
+            Payslips.company_id == company_id,
+            Payslips.pay_year == pay_year,
+            Payslips.pay_month == pay_month,
+        )
+    }
+    contracts = [c for c in contracts if c.employee_id not in already_paid]
+
+    summary = {
+        'company_id': company_id,
+        'pay_month': pay_month,
+        'pay_year': pay_year,
+        'created': 0,
+        'skipped': len(already_paid),
+        'total_gross': 0.0,
+        'total_net': 0.0,
+        'total_cost': 0.0,
+    }
+    if not contracts:
+        if progress:
+            progress(0, 0)
+        return summary
+
+    sim_inputs = [
+        build_simulation_input({
+            **variables.get(c.employee_id, {}),
+            'employee_id': c.employee_id,
+            'gross_salary': c.base_salary,
+        })
+        for c in contracts
+    ]
+
+    def field(name):
+        return np.fromiter((i[name] for i in sim_inputs), dtype=np.float64, count=len(sim_inputs))
+
+    columns = compute_simulation_arrays(
+        field('gross_salary'),
+        rates,
+        overtime_hours=field('overtime_hours'),
+        overtime_rate=field('overtime_rate'),
+        bonuses=field('bonuses'),
+        allowances=field('allowances'),
+        deductions=field('deductions'),
+        tax_year=pay_year,
+    )
+    total_cost = round_half_even(columns['gross_with_overtime'] + columns['employer_total'])
+    values = {name: array.tolist() for name, array in columns.items()}
+    total_cost = total_cost.tolist()
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i, (contract, sim_input) in enumerate(zip(contracts, sim_inputs)):
+        rows.append({
+            'employee_id': contract.employee_id,
+            'company_id': company_id,
+            'pay_period_start': period_start,
+            'pay_period_end': period_end,
+            'pay_month': pay_month,
+            'pay_year': pay_year,
+            'base_salary': contract.base_salary,
+            'gross_salary': values['gross_with_overtime'][i],
+            'net_salary': values['net_salary'][i],
+            'total_cost': total_cost[i],
+            'overtime_hours': sim_input['overtime_hours'],
+            'overtime_rate': sim_input['overtime_rate'],
+            'overtime_amount': values['overtime_amount'][i],
+            'bonus_amount': sim_input['bonuses'],
+            'commission_amount': 0,
+            'transportation_allowance': 0,
+            'housing_allowance': 0,
+            'other_allowances': sim_input['allowances'],
+            'cnss_employee': f"{values['cnss_employee'][i]:.2f}",
+            'cnss_employer': f"{values['cnss_employer'][i]:.2f}",
+            'amo_employee': f"{values['amo_employee'][i]:.2f}",
+            'amo_employer': f"{values['amo_employer'][i]:.2f}",
+            'cimr_employee': f"{values['cimr_employee'][i]:.2f}",
+            'cimr_employer': f"{values['cimr_employer'][i]:.2f}",
+            'income_tax': values['igr'][i],
+            'other_deduction': {'other': sim_input['deductions']} if sim_input['deductions'] else {},
+            'total_deductions': values['employee_total'][i],
+            'status': 'pending',
+            'generated_at': now,
+            'updated_at': now,
+        })
+
+    batch_size = max(1, batch_size)
+    stmt = _insert_payslips_statement()
+    inserted = set()
+    if progress:
+        progress(0, len(rows))
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if stmt is None:
+            db.session.execute(insert(Payslips), batch)
+            inserted.update(row['employee_id'] for row in batch)
+        else:
+            inserted.update(db.session.scalars(stmt, batch))
+        if progress:
+            progress(min(start + batch_size, len(rows)), len(rows))
+
+    # Core INSERTs skip the ORM events, so update the monthly rollup once for the whole run
+    deltas = defaultdict(dict)
+    kept = []
+    for index, row in enumerate(rows):
+        if row['employee_id'] in inserted:
+            add_payslip_delta(deltas, row)
+            kept.append(index)
+    apply_rollup_deltas(db.session.connection(), deltas)
+
+    summary['created'] = len(kept)
+    summary['skipped'] += len(rows) - len(kept)
+    values = {name: [values[name][i] for i in kept] for name in ('gross_with_overtime', 'net_salary')}
+    total_cost = [total_cost[i] for i in kept]
+    summary['total_gross'] = round(sum(values['gross_with_overtime']), 2)
+    summary['total_net'] = round(sum(values['net_salary']), 2)
+    summary['total_cost'] = round(sum(total_cost), 2)
+    return summary
+
+
+@register_job('payroll_run')
+def payroll_run_job(params, progress):
+    """Background version of a payroll run (see generate_company_payslips)."""
+    summary = generate_company_payslips(
+        params['company_id'],
+        params['pay_month'],
+        params['pay_year'],
+        build_contribution_rates(
+            params.get('rates') or {}, as_of=period_end(params['pay_month'], params['pay_year'])
+        ),
+        variables=params.get('variables'),
+        batch_size=params.get('batch_size', 1000),
+        progress=progress,
+    )
+    db.session.commit()
+    result_url = (
+        f"/api/payslips?company_id={params['company_id']}"
+        f"&year={params['pay_year']}&month={params['pay_month']}"
+    )
+    return summary, result_url
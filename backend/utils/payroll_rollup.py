@@ -0,0 +1,177 @@
+"""
+Incremental maintenance of the payroll_monthly_rollup table.
+
+Every payslip contributes its amounts to the rollup row of its
+(company, year, month). ORM inserts, updates and deletes of payslips adjust
+that row in the same transaction through mapper events; bulk statements that
+bypass the ORM (payroll runs, employee deletion) apply their deltas explicitly
+with apply_rollup_deltas / subtract_payslips. rebuild_payroll_rollup()
+recomputes the whole table from payslips (backfill or repair).
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import Numeric, cast, delete, event, func, insert, inspect, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+from models.payslips import Payslips
+from models.payroll_rollup import PayrollMonthlyRollup
+
+# Rollup column -> payslip attribute it sums
+ROLLUP_FIELDS = {
+    'gross_total': 'gross_salary',
+    'net_total': 'net_salary',
+    'employer_cost': 'total_cost',
+    'cnss_employee': 'cnss_employee',
+    'cnss_employer': 'cnss_employer',
+    'amo_employee': 'amo_employee',
+    'amo_employer': 'amo_employer',
+    'cimr_employee': 'cimr_employee',
+    'cimr_employer': 'cimr_employer',
+    'income_tax': 'income_tax',
+    'total_deductions': 'total_deductions',
+}
+KEY_FIELDS = ('company_id', 'pay_year', 'pay_month')
+TRACKED_FIELDS = KEY_FIELDS + tuple(ROLLUP_FIELDS.values())
+
+
+def _to_decimal(value):
+    # Contribution amounts are stored as strings on payslips
+    if value is None or value == '':
+        return Decimal('0')
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return Decimal('0')
+
+
+def add_payslip_delta(deltas, values, sign=1):
+    """
+    Accumulate the contribution of one payslip into `deltas`.
+
+    Args:
+        deltas: defaultdict(dict) keyed by (company_id, pay_year, pay_month)
+        values: Mapping of payslip attribute -> value
+        sign: 1 to add the payslip, -1 to remove it
+    """
+    key = tuple(values[name] for name in KEY_FIELDS)
+    amounts = deltas[key]
+    amounts['headcount'] = amounts.get('headcount', 0) + sign
+    for column, attribute in ROLLUP_FIELDS.items():
+        amounts[column] = amounts.get(column, Decimal('0')) + sign * _to_decimal(values.get(attribute))
+    return deltas
+
+
+def apply_rollup_deltas(connection, deltas):
+    """
+    Add the given amounts to the rollup rows, creating rows that do not exist yet.
+
+    Args:
+        connection: Connection of the transaction that changed the payslips
+        deltas: {(company_id, pay_year, pay_month): {rollup column: amount}}
+    """
+    table = PayrollMonthlyRollup.__table__
+    now = datetime.now(timezone.utc)
+    dialect = connection.dialect.name
+
+    for (company_id, pay_year, pay_month), amounts in deltas.items():
+        if not any(amounts.values()):
+            continue
+        key = {'company_id': company_id, 'pay_year': pay_year, 'pay_month': pay_month}
+        increments = {name: table.c[name] + amount for name, amount in amounts.items()}
+
+        if dialect in ('postgresql', 'sqlite'):
+            dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = dialect_insert(table).values(**key, **amounts, updated_at=now)
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=list(KEY_FIELDS),
+                set_={**increments, 'updated_at': now},
+            ))
+        else:
+            result = connection.execute(
+                update(table).where(*(table.c[name] == value for name, value in key.items()))
+                .values(**increments, updated_at=now)
+            )
+            if result.rowcount == 0:
+                connection.execute(insert(table).values(**key, **amounts, updated_at=now))
+
+
+def _aggregate_payslips(*criteria):
+    """SELECT of rollup rows (key, headcount, totals) aggregated from payslips."""
+    sums = [
+        func.coalesce(func.sum(cast(getattr(Payslips, attribute), Numeric(14, 2))), 0).label(column)
+        for column, attribute in ROLLUP_FIELDS.items()
+    ]
+    return select(
+        Payslips.company_id, Payslips.pay_year, Payslips.pay_month,
+        func.count().label('headcount'), *sums,
+    ).where(*criteria).group_by(Payslips.company_id, Payslips.pay_year, Payslips.pay_month)
+
+
+def subtract_payslips(connection, *criteria):
+    """
+    Remove the payslips matching `criteria` from the rollup.
+
+    Call it before a bulk DELETE of those payslips (query.delete() skips mapper events).
+    """
+    deltas = {}
+    for row in connection.execute(_aggregate_payslips(*criteria)).mappings():
+        deltas[(row['company_id'], row['pay_year'], row['pay_month'])] = {
+            'headcount': -row['headcount'],
+            **{column: -_to_decimal(row[column]) for column in ROLLUP_FIELDS},
+        }
+    apply_rollup_deltas(connection, deltas)
+
+
+def rebuild_payroll_rollup():
+    """Recompute the whole rollup table from payslips. The caller commits."""
+    table = PayrollMonthlyRollup.__table__
+    aggregate = _aggregate_payslips().add_columns(literal(datetime.now(timezone.utc)).label('updated_at'))
+    db.session.execute(delete(table))
+    db.session.execute(insert(table).from_select(
+        [*KEY_FIELDS, 'headcount', *ROLLUP_FIELDS, 'updated_at'], aggregate
+    ))
+
+
+def _current_values(target):
+    return {name: getattr(target, name) for name in TRACKED_FIELDS}
+
+
+@event.listens_for(Payslips, 'after_insert')
+def _rollup_after_insert(mapper, connection, target):
+    apply_rollup_deltas(connection, add_payslip_delta(defaultdict(dict), _current_values(target)))
+
+
+@event.listens_for(Payslips, 'after_update')
+def _rollup_after_update(mapper, connection, target):
+    state = inspect(target)
+    new_values = _current_values(target)
+    old_values = dict(new_values)
+    changed = False
+    for name in TRACKED_FIELDS:
+        history = state.attrs[name].history
+        if history.has_changes():
+            changed = True
+            old_values[name] = history.deleted[0] if history.deleted else None
+    if not changed:
+        return
+
+    deltas = defaultdict(dict)
+    add_payslip_delta(deltas, old_values, sign=-1)
+    add_payslip_delta(deltas, new_values)
+    apply_rollup_deltas(connection, deltas)
+
+
+@event.listens_for(Payslips, 'before_delete')
+def _rollup_before_delete(mapper, connection, target):
+    apply_rollup_deltas(connection, add_payslip_delta(defaultdict(dict), _current_values(target), sign=-1))
+
+
+def _track_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the previous value when a tracked attribute is assigned on an expired
+# instance, so after_update always knows what to subtract
+for _name in TRACKED_FIELDS:
+    event.listen(getattr(Payslips, _name), 'set', _track_old_value, active_history=True, retval=True)
@@ -0,0 +1,177 @@
+"""
+SQL query profiler for development and tests.
+
+When QUERY_PROFILER_ENABLED is set (on by default in development), every
+statement run during a request is recorded with its duration and the
+application line that issued it. At the end of the request the profiler flags:
+  - N+1 patterns: the same statement shape run QUERY_PROFILER_N_PLUS_ONE times
+    or more (shapes ignore bound values and IN-list lengths)
+  - slow queries: statements slower than QUERY_PROFILER_SLOW_MS
+Findings are logged, and a summary is sent in the X-Query-Count,
+X-Query-Time-Ms and X-Query-Warnings headers.
+
+Tests can bound the number of statements of any block with max_queries().
+"""
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from flask import current_app, g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_THIS_FILE = os.path.abspath(__file__)
+BACKEND_DIR = os.path.dirname(os.path.dirname(_THIS_FILE))
+
+# Placeholder lists of expanded IN clauses: (?, ?, ?) / (%(id_1_1)s, %(id_1_2)s)
+_PLACEHOLDER_LIST = re.compile(r'\((?:\?|%\(\w+\)s)(?:\s*,\s*(?:\?|%\(\w+\)s))*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    duration: float
+    call_site: str
+
+    @property
+    def shape(self):
+        return statement_shape(self.statement)
+
+
+def statement_shape(statement):
+    """Normalize a statement so repeats of the same query compare equal."""
+    return _PLACEHOLDER_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+
+
+def _call_site():
+    """First frame in the application code outside this module ('controllers/x.py:42')."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(BACKEND_DIR) and filename != _THIS_FILE
+                and 'site-packages' not in filename):
+            return f'{os.path.relpath(filename, BACKEND_DIR)}:{frame.f_lineno}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+# Active recorders: the current request (g.query_log) and any max_queries() blocks
+_recorders = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # On the execution context: a failed statement leaves nothing behind on the connection
+    if context is not None:
+        context._profiler_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_profiler_start', None)
+    if start is None:
+        return
+    duration = time.perf_counter() - start
+    request_log = g.get('query_log') if has_request_context() else None
+    if request_log is None and not _recorders:
+        return
+    record = QueryRecord(statement, duration, _call_site())
+    if request_log is not None:
+        request_log.append(record)
+    for recorder in _recorders:
+        recorder.append(record)
+
+
+def _install_listeners():
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def analyze_queries(records, n_plus_one=5, slow_ms=100):
+    """
+    Find N+1 patterns and slow statements in a list of QueryRecord.
+
+    Returns:
+        dict: {'n_plus_one': [{'count', 'statement', 'call_sites'}],
+               'slow': [{'duration_ms', 'statement', 'call_site'}]}
+    """
+    shapes = Counter(record.shape for record in records)
+    repeated = []
+    for shape, count in shapes.most_common():
+        if count < n_plus_one:
+            break
+        call_sites = sorted({record.call_site for record in records if record.shape == shape})
+        repeated.append({'count': count, 'statement': shape, 'call_sites': call_sites})
+
+    slow = [
+        {'duration_ms': round(record.duration * 1000, 2), 'statement': statement_shape(record.statement),
+         'call_site': record.call_site}
+        for record in records if record.duration * 1000 >= slow_ms
+    ]
+    return {'n_plus_one': repeated, 'slow': slow}
+
+
+def _before_request():
+    g.query_log = []
+
+
+def _after_request(response):
+    records = g.pop('query_log', None)
+    if records is None:
+        return response
+    config = current_app.config
+    findings = analyze_queries(
+        records,
+        n_plus_one=config.get('QUERY_PROFILER_N_PLUS_ONE', 5),
+        slow_ms=config.get('QUERY_PROFILER_SLOW_MS', 100),
+    )
+    for item in findings['n_plus_one']:
+        current_app.logger.warning(
+            'Possible N+1: %d x %s (from %s)', item['count'], item['statement'], ', '.join(item['call_sites'])
+        )
+    for item in findings['slow']:
+        current_app.logger.warning(
+            'Slow query: %.1f ms %s (from %s)', item['duration_ms'], item['statement'], item['call_site']
+        )
+
+    response.headers['X-Query-Count'] = str(len(records))
+    response.headers['X-Query-Time-Ms'] = f'{sum(record.duration for record in records) * 1000:.2f}'
+    response.headers['X-Query-Warnings'] = str(len(findings['n_plus_one']) + len(findings['slow']))
+    return response
+
+
+def init_query_profiler(app):
+    """Profile the queries of every request when QUERY_PROFILER_ENABLED is set."""
+    if not app.config.get('QUERY_PROFILER_ENABLED', False):
+        return app
+    _install_listeners()
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    return app
+
+
+@contextmanager
+def max_queries(limit):
+    """
+    Fail with AssertionError when the block runs more than `limit` statements.
+
+    Usage (tests):
+        with max_queries(3):
+            client.get('/api/employees/')
+
+    Yields:
+        list: The QueryRecords of the block
+    """
+    _install_listeners()
+    records = []
+    _recorders.append(records)
+    try:
+        yield records
+    finally:
+        _recorders.remove(records)
+    if len(records) > limit:
+        details = '\n'.join(f'  {record.call_site}: {statement_shape(record.statement)}' for record in records)
+        raise AssertionError(f'{len(records)} queries executed, expected at most {limit}:\n{details}')
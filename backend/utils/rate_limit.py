@@ -0,0 +1,83 @@
+"""
+In-memory token-bucket rate limiting for the auth endpoints.
+
+Each key (a client IP or an email address) owns a bucket of `burst` tokens
+refilled at `per_minute` tokens per minute; an attempt takes one token and is
+refused while the bucket is empty. Buckets live in the worker process (an LRU
+of at most `max_keys` entries), so each worker enforces its own limits: the
+effective limit is the configured one times the number of workers.
+
+Behind a reverse proxy, set TRUSTED_PROXY_COUNT so the client IP is read from
+X-Forwarded-For instead of the proxy's own address.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, request
+from config import Config
+
+
+class TokenBucketLimiter:
+    """Thread-safe token buckets keyed by client; a burst of 0 disables the limiter."""
+
+    def __init__(self, burst, per_minute, max_keys=10000, clock=time.monotonic):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key):
+        """
+        Take one token from the key's bucket.
+
+        Returns:
+            float: 0 when allowed, otherwise seconds until a token is available
+        """
+        if self.burst <= 0:
+            return 0
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0
+            else:
+                retry_after = (1 - tokens) / self.rate if self.rate > 0 else math.inf
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+login_ip_limiter = TokenBucketLimiter(Config.LOGIN_RATE_IP_BURST, Config.LOGIN_RATE_IP_PER_MINUTE)
+login_email_limiter = TokenBucketLimiter(Config.LOGIN_RATE_EMAIL_BURST, Config.LOGIN_RATE_EMAIL_PER_MINUTE)
+
+
+def client_ip():
+    """Client address, taken from X-Forwarded-For when TRUSTED_PROXY_COUNT proxies are in front."""
+    proxies = current_app.config.get('TRUSTED_PROXY_COUNT', 0)
+    forwarded = request.access_route if 'X-Forwarded-For' in request.headers else []
+    if proxies > 0 and len(forwarded) >= proxies:
+        return forwarded[-proxies]
+    return request.remote_addr or 'unknown'
+
+
+def check_auth_rate(email=None):
+    """
+    Apply the per-IP limit and, when given, the per-email limit.
+
+    Returns:
+        int: 0 when allowed, otherwise the Retry-After value in seconds
+    """
+    retry_after = login_ip_limiter.consume(client_ip())
+    if email:
+        retry_after = max(retry_after, login_email_limiter.consume(email.strip().lower()))
+    return math.ceil(retry_after) if retry_after != math.inf else 3600
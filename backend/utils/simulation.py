@@ -1,6 +1,24 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from flask import has_app_context
 from utils.tax import calculate_igr
 
-def build_contribution_rates(overrides: dict | None = None) -> dict:
+# Standard monthly working hours in Morocco (40 hrs/week * 52 weeks / 12 months)
+STANDARD_MONTHLY_HOURS = 173.33
+
+# Process pool shared by batch simulations (created lazily, one per web worker)
+_batch_executor = None
+_batch_executor_workers = 0
+
+def build_contribution_rates(overrides: dict | None = None, as_of=None) -> dict:
+    """
+    Resolve the contribution rates (percentages) used by a simulation.
+
+    Starts from the built-in defaults, applies the rates configured in the
+    contribution_rates table that are in force on `as_of` (default: today;
+    served from an in-memory snapshot, only inside an app context), then the
+    per-request overrides.
+    """
     defaults = {
         "cnss_employee": 4.29,
         "cnss_employer": 8.58,
@@ -11,6 +29,10 @@ def build_contribution_rates(overrides: dict | None = None) -> dict:
         "igr": 0.0,
         "professional_tax": 0.0,
     }
+    if has_app_context():
+        from utils.contribution_rates import get_configured_rates
+        configured = get_configured_rates(as_of)
+        defaults.update({key: value for key, value in configured.items() if key in defaults})
     if not overrides:
         return defaults
 
@@ -22,7 +44,7 @@ def build_contribution_rates(overrides: dict | None = None) -> dict:
 
 
 def build_simulation_input(data: dict) -> dict:
-    return {
+    sim_input = {
         "employee_id": data.get("employee_id"),
         "gross_salary": float(data.get("gross_salary", 0)),
         "overtime_hours": float(data.get("overtime_hours", 0)),
@@ -31,6 +53,10 @@ def build_simulation_input(data: dict) -> dict:
         "allowances": float(data.get("allowances", 0)),
         "deductions": float(data.get("deductions", 0)),
     }
+    # Fiscal year whose IGR scale applies (default: current year)
+    if data.get("tax_year") is not None:
+        sim_input["tax_year"] = int(data["tax_year"])
+    return sim_input
 
 
 def compute_simulation(sim_input: dict, rates: dict) -> dict:
@@ -39,7 +65,7 @@ def compute_simulation(sim_input: dict, rates: dict) -> dict:
     # Calculate overtime: overtime_hours * hourly_rate * overtime_multiplier
     # Standard monthly working hours in Morocco: 173.33 hours (40 hrs/week * 52 weeks / 12 months)
     # Overtime is calculated based on base gross salary (not including bonuses/allowances)
-    standard_monthly_hours = 173.33 
+    standard_monthly_hours = STANDARD_MONTHLY_HOURS
     base_gross_salary = sim_input.get("gross_salary", 0.0)
     hourly_rate = base_gross_salary / standard_monthly_hours if standard_monthly_hours > 0 else 0.0
     overtime_multiplier = float(sim_input.get("overtime_rate", 1.5))
@@ -58,7 +84,7 @@ def compute_simulation(sim_input: dict, rates: dict) -> dict:
     taxable_income = gross_with_overtime - cnss_emp - amo_emp - cimr_emp
     # Convert monthly taxable income to annual for tax calculation
     annual_taxable_income = taxable_income * 12
-    annual_igr, _ = calculate_igr(annual_taxable_income)
+    annual_igr, _ = calculate_igr(annual_taxable_income, sim_input.get("tax_year"))
     # Convert annual IGR back to monthly
     igr = round(annual_igr / 12, 2)
     
@@ -99,3 +125,53 @@ def compute_simulation(sim_input: dict, rates: dict) -> dict:
     }
 
 
+
+
+def _compute_simulation_chunk(args: tuple) -> list:
+    sim_inputs, rates = args
+    return [compute_simulation(sim_input, rates) for sim_input in sim_inputs]
+
+
+def _get_batch_executor(workers: int) -> ProcessPoolExecutor:
+    global _batch_executor, _batch_executor_workers
+    if _batch_executor is None or _batch_executor_workers != workers:
+        if _batch_executor is not None:
+            _batch_executor.shutdown(wait=False)
+        # spawn (not fork) so children never inherit the parent's DB connections or locks
+        _batch_executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        _batch_executor_workers = workers
+    return _batch_executor
+
+
+def compute_simulation_batch(sim_inputs: list, rates: dict, workers: int = 1, chunk_size: int = 500,
+                             vectorize_threshold: int = 1000) -> list:
+    """
+    Run compute_simulation over many inputs sharing the same rates.
+
+    Large batches (at least `vectorize_threshold` inputs) go through the NumPy
+    engine in utils.vectorized_simulation, which gives identical results.
+    Otherwise inputs are split into chunks and spread across a process pool
+    when there is more than one chunk and more than one worker; small batches
+    run inline since the pool round trip would cost more than the math.
+
+    Returns:
+        list: One simulation result per input, in input order
+    """
+    if vectorize_threshold and len(sim_inputs) >= vectorize_threshold:
+        from utils.vectorized_simulation import compute_simulation_vectorized
+        return compute_simulation_vectorized(sim_inputs, rates)
+
+    chunk_size = max(1, chunk_size)
+    if workers <= 1 or len(sim_inputs) <= chunk_size:
+        return _compute_simulation_chunk((sim_inputs, rates))
+
+    chunks = [(sim_inputs[i:i + chunk_size], rates) for i in range(0, len(sim_inputs), chunk_size)]
+    executor = _get_batch_executor(workers)
+
+    results = []
+    for chunk_results in executor.map(_compute_simulation_chunk, chunks):
+        results.extend(chunk_results)
+    return results
@@ -1,36 +1,96 @@
-def calculate_igr(annual_income: float) -> tuple[float, float]:
-    """
-    Calculate Moroccan IGR (Impôt Général sur le Revenu) for 2025
-    and return both total tax and effective tax rate.
-
-    Args:
-        annual_income: Annual taxable income in MAD
-
-    Returns:
-        tuple: (total_tax in MAD, effective_tax_rate as a float between 0 and 1)
-    """
-    if annual_income <= 0:
-        return 0.0, 0.0
+from bisect import bisect_left, bisect_right
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple
 
-    brackets = [
+# Annual IGR brackets by the first fiscal year they apply to:
+# (upper limit in MAD, marginal rate)
+IGR_BRACKETS_BY_YEAR = {
+    # Scale in force from 2010 to 2024
+    2010: (
+        (30000, 0.00),
+        (50000, 0.10),
+        (60000, 0.20),
+        (80000, 0.30),
+        (180000, 0.34),
+        (float("inf"), 0.38),
+    ),
+    # Finance law 2025
+    2025: (
         (40000, 0.00),
         (60000, 0.10),
         (80000, 0.20),
         (100000, 0.30),
         (180000, 0.34),
         (float("inf"), 0.37),
-    ]
+    ),
+}
+_IGR_TABLE_YEARS = sorted(IGR_BRACKETS_BY_YEAR)
+
+# Brackets of the latest scale (kept for callers that don't care about the year)
+IGR_BRACKETS = list(IGR_BRACKETS_BY_YEAR[_IGR_TABLE_YEARS[-1]])
+
+# Distinct (year, income) pairs remembered by calculate_igr
+IGR_CACHE_SIZE = 4096
+
 
-    total_tax = 0.0
-    previous_limit = 0.0
+class IgrTable(NamedTuple):
+    """Bracket scale compiled for lookups: tax = base[i] + (income - lower[i]) * rates[i]."""
+    limits: tuple
+    rates: tuple
+    lower: tuple
+    base: tuple
 
-    for limit, rate in brackets:
-        if annual_income > previous_limit:
-            taxable = min(annual_income, limit) - previous_limit
-            total_tax += taxable * rate
-            previous_limit = limit
-        else:
-            break
+
+def igr_table_year(year: int | None = None) -> int:
+    """
+    Return the first year of the bracket scale in force for a fiscal year.
+
+    Args:
+        year: Fiscal year (default: current year). Years before the oldest
+            known scale use the oldest one.
+    """
+    year = date.today().year if year is None else int(year)
+    index = bisect_right(_IGR_TABLE_YEARS, year) - 1
+    return _IGR_TABLE_YEARS[max(index, 0)]
+
+
+@lru_cache(maxsize=None)
+def compile_igr_table(table_year: int) -> IgrTable:
+    """Compile a bracket scale into cumulative-tax arrays (once per scale)."""
+    brackets = IGR_BRACKETS_BY_YEAR[table_year]
+    limits = tuple(float(limit) for limit, _ in brackets)
+    rates = tuple(rate for _, rate in brackets)
+    lower = (0.0,) + limits[:-1]
+    # Tax due on all lower brackets, accumulated bracket by bracket
+    base = [0.0]
+    for i in range(1, len(brackets)):
+        base.append(base[i - 1] + (limits[i - 1] - lower[i - 1]) * rates[i - 1])
+    return IgrTable(limits, rates, lower, tuple(base))
+
+
+@lru_cache(maxsize=IGR_CACHE_SIZE)
+def _calculate_igr(table_year: int, annual_income: float) -> tuple[float, float]:
+    table = compile_igr_table(table_year)
+    bracket = min(bisect_left(table.limits, annual_income), len(table.limits) - 1)
+    total_tax = table.base[bracket] + (annual_income - table.lower[bracket]) * table.rates[bracket]
 
     effective_rate = total_tax / annual_income
     return round(total_tax, 2), round(effective_rate, 4)
+
+
+def calculate_igr(annual_income: float, year: int | None = None) -> tuple[float, float]:
+    """
+    Calculate Moroccan IGR (Impôt Général sur le Revenu) under the scale in
+    force for a fiscal year and return both total tax and effective tax rate.
+
+    Args:
+        annual_income: Annual taxable income in MAD
+        year: Fiscal year (default: current year)
+
+    Returns:
+        tuple: (total_tax in MAD, effective_tax_rate as a float between 0 and 1)
+    """
+    if annual_income <= 0:
+        return 0.0, 0.0
+    return _calculate_igr(igr_table_year(year), float(annual_income))
@@ -0,0 +1,159 @@
+"""
+In-process cache of authenticated users.
+
+Resolving the user behind a JWT used to cost one SELECT per decorated route.
+Users are now cached as detached snapshots for a bounded time (TTL) and
+re-attached to the current session with merge(load=False), which emits no SQL.
+
+Updating or deleting a user bumps the 'users' counter in cache_versions in the
+same transaction. Once the transaction commits, the user is dropped from the
+cache of this process (dropping it before the commit let a concurrent request
+cache the old row again); loads that started before the drop are not stored.
+Other workers compare the counter with the version of their cache at most once
+every AUTH_USER_CACHE_CHECK_INTERVAL seconds and clear it when it moved.
+"""
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from config import Config
+from models import db
+from models.user import User
+from utils.versioning import bump_version, get_version
+
+USERS_VERSION_KEY = 'users'
+
+
+class UserCache:
+    """Thread-safe LRU cache of user snapshots with a per-entry TTL."""
+
+    def __init__(self, ttl=60, max_size=1024, check_interval=5):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Incremented by every invalidation, so a load that raced with one is not stored
+        self.generation = 0
+        self._version = None
+        self._checked_at = 0.0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            snapshot, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def set(self, user_id, snapshot, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[user_id] = (snapshot, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def check_version(self, read_version):
+        """Clear the cache when the 'users' version moved (at most once per check_interval)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._version is not None and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+        try:
+            version = read_version()
+        except Exception as e:
+            # Keep serving the cache until the TTL if the version can't be read
+            print(f"User cache version check failed: {e}")
+            return
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    self.generation += 1
+                    self._entries.clear()
+                self._version = version
+
+
+user_cache = UserCache(
+    ttl=Config.AUTH_USER_CACHE_TTL,
+    max_size=Config.AUTH_USER_CACHE_SIZE,
+    check_interval=Config.AUTH_USER_CACHE_CHECK_INTERVAL,
+)
+
+
+def _snapshot(user):
+    """Copy a loaded user into a detached instance that no session owns."""
+    snapshot = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+def _read_version():
+    # On a connection of its own: a failed check must not abort the request's transaction
+    with db.engine.connect() as connection:
+        return get_version(USERS_VERSION_KEY, connection)
+
+
+def get_user(user_id):
+    """
+    Return the user with this id attached to the current session.
+
+    Served from the cache when possible (no query); otherwise loaded once and cached.
+    """
+    if user_cache.ttl <= 0:
+        return db.session.get(User, user_id)
+
+    user_cache.check_version(_read_version)
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        return db.session.merge(snapshot, load=False)
+
+    generation = user_cache.generation
+    user = db.session.get(User, user_id)
+    if user is not None:
+        user_cache.set(user_id, _snapshot(user), generation)
+    return user
+
+
+def invalidate_user(user_id):
+    """Drop a user from the cache (e.g. after deactivation or a role change)."""
+    user_cache.invalidate(user_id)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _note_change(mapper, connection, target):
+    bump_version(USERS_VERSION_KEY, connection)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_users', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop('changed_users', ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _forget_rolled_back(session, transaction):
+    # after_commit already took the users of a committed transaction
+    if transaction.parent is None:
+        session.info.pop('changed_users', None)
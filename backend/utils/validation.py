@@ -0,0 +1,108 @@
+"""
+Uniqueness validation shared by the create/update/import endpoints.
+
+Conflicts are looked up with a single query per request (or one IN query per
+column for bulk imports) and reported all at once. The unique constraints in
+the database stay authoritative: a concurrent insert that slips past the check
+surfaces as an IntegrityError, translated into the same response.
+"""
+import re
+from flask import jsonify
+from sqlalchemy import or_, select
+from models import db
+
+# Values per IN (...) list for set-based lookups
+LOOKUP_CHUNK_SIZE = 5000
+
+# Fields that identify a single employee / company
+EMPLOYEE_UNIQUE_FIELDS = ['email', 'cin', 'cnss_number', 'amo_number', 'cimr_number', 'bank_account']
+COMPANY_UNIQUE_FIELDS = ['fiscal_id', 'ice', 'cnss_number']
+# Names used by the company conflict errors ("Company with this ICE already exists")
+COMPANY_FIELD_LABELS = {'fiscal_id': 'fiscal_id', 'ice': 'ICE', 'cnss_number': 'CNSS number'}
+
+
+def find_unique_conflicts(model, data, fields, exclude_id=None):
+    """
+    Return the unique fields whose value in `data` is already taken, in one query.
+
+    Args:
+        model: Model class holding the unique columns
+        data: Mapping of field -> candidate value (empty values are ignored)
+        fields: Unique fields to check
+        exclude_id: Primary key of the row being updated (not a conflict with itself)
+
+    Returns:
+        list: Conflicting field names, in `fields` order
+    """
+    candidates = {field: data.get(field) for field in fields if data.get(field) not in (None, '')}
+    if not candidates:
+        return []
+
+    query = select(*(getattr(model, field) for field in candidates)).where(
+        or_(*(getattr(model, field) == value for field, value in candidates.items()))
+    )
+    if exclude_id is not None:
+        query = query.where(model.id != exclude_id)
+
+    conflicts = set()
+    for row in db.session.execute(query):
+        for field, existing in zip(candidates, row):
+            if existing is not None and str(existing) == str(candidates[field]):
+                conflicts.add(field)
+    return [field for field in fields if field in conflicts]
+
+
+def find_existing_values(column, values):
+    """Return the subset of `values` already stored in `column` (one IN query per chunk)."""
+    values = list(values)
+    existing = set()
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        chunk = values[start:start + LOOKUP_CHUNK_SIZE]
+        existing.update(db.session.execute(select(column).where(column.in_(chunk))).scalars())
+    return existing
+
+
+def integrity_error_fields(error, fields):
+    """
+    Best-effort extraction of the unique fields named by an IntegrityError.
+
+    Understands PostgreSQL ("Key (email)=(...) already exists", constraint
+    "employees_email_key") and SQLite ("UNIQUE constraint failed: employees.email").
+    """
+    message = str(getattr(error, 'orig', error))
+    named = set(re.findall(r'Key \(([^)]+)\)', message))
+    named.update(re.findall(r'UNIQUE constraint failed: \w+\.(\w+)', message))
+    named.update(re.findall(r'"\w+?_(\w+)_key"', message))
+    flattened = {part.strip() for name in named for part in name.split(',')}
+    return [field for field in fields if field in flattened]
+
+
+def unique_conflict_response(resource, conflicts, labels=None):
+    """
+    Standard 400 response listing every conflicting unique field.
+
+    With `labels` (field -> name), `error` keeps the per-field message of the
+    first conflict ("Company with this ICE already exists"); otherwise it is
+    "<resource> already exists". `message` and `conflicts` cover every field.
+    """
+    names = [labels.get(field, field) for field in conflicts] if labels else conflicts
+    return jsonify({
+        'error': f'{resource} with this {names[0]} already exists' if labels else f'{resource} already exists',
+        'message': f"{resource} with this {', '.join(names)} already exists",
+        'conflicts': conflicts,
+    }), 400
+
+
+def integrity_error_response(resource, error, fields, labels=None):
+    """
+    Response for an IntegrityError raised on commit (the caller rolls back).
+
+    A unique violation on a known field is reported like a pre-checked conflict.
+    """
+    conflicts = integrity_error_fields(error, fields)
+    if conflicts:
+        return unique_conflict_response(resource, conflicts, labels)
+    return jsonify({
+        'error': f'Invalid {resource.lower()} data',
+        'details': str(getattr(error, 'orig', error)),
+    }), 400
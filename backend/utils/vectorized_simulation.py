@@ -0,0 +1,211 @@
+"""
+Columnar (NumPy) payroll engine.
+
+Computes the same figures as utils.simulation.compute_simulation for whole
+arrays of employees at once. Every intermediate value is produced with the
+same floating point operations, in the same order, as the scalar path and
+rounded with Python's round() semantics, so results match to the centime.
+"""
+from functools import lru_cache
+import numpy as np
+from utils.tax import compile_igr_table, igr_table_year
+from utils.simulation import STANDARD_MONTHLY_HOURS
+
+
+@lru_cache(maxsize=None)
+def _igr_arrays(table_year: int) -> tuple:
+    # Compiled bracket scale (see utils.tax.compile_igr_table) as NumPy arrays
+    table = compile_igr_table(table_year)
+    return tuple(np.array(values, dtype=np.float64) for values in table)
+
+
+def round_half_even(values, ndigits: int = 2) -> np.ndarray:
+    """
+    Round an array exactly like Python's round(value, ndigits).
+
+    np.rint(values * 10**ndigits) only differs from round() when the scaled
+    value lands on (or next to) a .5 tie after the multiplication; those rare
+    elements are re-rounded one by one with round().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    result = np.rint(scaled) / scale
+
+    fraction = np.abs(scaled - np.trunc(scaled))
+    ambiguous = np.nonzero(np.abs(fraction - 0.5) < 1e-6)[0]
+    if ambiguous.size:
+        result = np.array(result, copy=True)
+        result[ambiguous] = [round(float(v), ndigits) for v in values[ambiguous]]
+    return result
+
+
+def calculate_igr_array(annual_income, year=None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized calculate_igr: bracket lookup via searchsorted.
+
+    Args:
+        annual_income: Array of annual taxable incomes in MAD
+        year: Fiscal year for every income, or an array with one year per income
+            (default: current year)
+
+    Returns:
+        tuple: (total_tax array, effective_tax_rate array)
+    """
+    income = np.asarray(annual_income, dtype=np.float64)
+
+    if year is None or np.ndim(year) == 0:
+        table_years = None
+        total_tax = _igr_tax(income, igr_table_year(year))
+    else:
+        # Mixed years: one pass per bracket scale
+        table_years = np.array([igr_table_year(y) for y in np.ravel(year)]).reshape(np.shape(year))
+        total_tax = np.zeros_like(income)
+        for table_year in np.unique(table_years):
+            mask = table_years == table_year
+            total_tax[mask] = _igr_tax(income[mask], int(table_year))
+
+    positive = income > 0
+    total_tax = np.where(positive, total_tax, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        effective_rate = np.where(positive, total_tax / np.where(positive, income, 1.0), 0.0)
+
+    return round_half_even(total_tax, 2), round_half_even(effective_rate, 4)
+
+
+def _igr_tax(income: np.ndarray, table_year: int) -> np.ndarray:
+    limits, rates, lower, base = _igr_arrays(table_year)
+    bracket = np.minimum(np.searchsorted(limits, income, side='left'), len(limits) - 1)
+    return base[bracket] + (income - lower[bracket]) * rates[bracket]
+
+
+def compute_simulation_arrays(gross_salary, rates: dict, overtime_hours=0.0, overtime_rate=1.5,
+                              bonuses=0.0, allowances=0.0, deductions=0.0, tax_year=None) -> dict:
+    """
+    Compute payroll for arrays of employees sharing the same rates.
+
+    Each argument is an array (or a scalar broadcast to every employee).
+    `tax_year` selects the IGR scale (a year, an array of years, or None for
+    the current year).
+
+    Returns:
+        dict: Column name -> float64 array, with the same figures as the
+        corresponding keys of compute_simulation
+    """
+    base = np.asarray(gross_salary, dtype=np.float64)
+    shape = base.shape
+
+    def column(value):
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), shape)
+
+    overtime_hours = column(overtime_hours)
+    overtime_multiplier = column(overtime_rate)
+    deductions_other = column(deductions)
+
+    gross = base + column(bonuses) + column(allowances)
+
+    hourly_rate = base / STANDARD_MONTHLY_HOURS
+    overtime_amount = round_half_even(overtime_hours * hourly_rate * overtime_multiplier)
+    gross_with_overtime = gross + overtime_amount
+
+    def contribution(key):
+        return round_half_even(gross_with_overtime * (rates.get(key, 0.0) / 100.0))
+
+    # Employee-side contributions
+    cnss_emp = contribution("cnss_employee")
+    amo_emp = contribution("amo_employee")
+    cimr_emp = contribution("cimr_employee")
+
+    # IGR on annualized taxable income, converted back to monthly
+    taxable_income = gross_with_overtime - cnss_emp - amo_emp - cimr_emp
+    annual_igr, _ = calculate_igr_array(taxable_income * 12, tax_year)
+    igr = round_half_even(annual_igr / 12)
+
+    professional_tax = contribution("professional_tax")
+
+    total_employee_deductions = cnss_emp + amo_emp + cimr_emp + igr + professional_tax + deductions_other
+    net = round_half_even(gross_with_overtime - total_employee_deductions)
+
+    # Employer-side
+    cnss_empr = contribution("cnss_employer")
+    amo_empr = contribution("amo_employer")
+    cimr_empr = contribution("cimr_employer")
+    employer_total = cnss_empr + amo_empr + cimr_empr
+
+    return {
+        "overtime_amount": overtime_amount,
+        "gross_with_overtime": round_half_even(gross_with_overtime),
+        "cnss_employee": cnss_emp,
+        "amo_employee": amo_emp,
+        "cimr_employee": cimr_emp,
+        "igr": igr,
+        "professional_tax": professional_tax,
+        "other": round_half_even(deductions_other),
+        "employee_total": round_half_even(total_employee_deductions),
+        "cnss_employer": cnss_empr,
+        "amo_employer": amo_empr,
+        "cimr_employer": cimr_empr,
+        "employer_total": round_half_even(employer_total),
+        "net_salary": net,
+    }
+
+
+def _tax_years(sim_inputs: list):
+    # One scalar year when the batch shares it, else one year per input
+    years = [sim_input.get("tax_year") for sim_input in sim_inputs]
+    if all(year == years[0] for year in years):
+        return years[0]
+    return [igr_table_year(year) for year in years]
+
+
+def compute_simulation_vectorized(sim_inputs: list, rates: dict) -> list:
+    """
+    Drop-in replacement for [compute_simulation(i, rates) for i in sim_inputs].
+
+    Returns:
+        list: One result dict per input, shaped exactly like compute_simulation
+    """
+    if not sim_inputs:
+        return []
+
+    def field(name, default):
+        return np.fromiter((float(i.get(name, default)) for i in sim_inputs), dtype=np.float64, count=len(sim_inputs))
+
+    columns = compute_simulation_arrays(
+        field("gross_salary", 0.0),
+        rates,
+        overtime_hours=field("overtime_hours", 0.0),
+        overtime_rate=field("overtime_rate", 1.5),
+        bonuses=field("bonuses", 0.0),
+        allowances=field("allowances", 0.0),
+        deductions=field("deductions", 0.0),
+        tax_year=_tax_years(sim_inputs),
+    )
+    # tolist() yields plain Python floats, so JSON output is identical to the scalar path
+    values = {name: array.tolist() for name, array in columns.items()}
+
+    return [
+        {
+            "inputs": sim_input,
+            "rates": rates,
+            "overtime_amount": values["overtime_amount"][i],
+            "gross_with_overtime": values["gross_with_overtime"][i],
+            "employee_contributions": {
+                "cnss_employee": values["cnss_employee"][i],
+                "amo_employee": values["amo_employee"][i],
+                "cimr_employee": values["cimr_employee"][i],
+                "igr": values["igr"][i],
+                "professional_tax": values["professional_tax"][i],
+                "other": values["other"][i],
+                "total": values["employee_total"][i],
+            },
+            "employer_contributions": {
+                "cnss_employer": values["cnss_employer"][i],
+                "amo_employer": values["amo_employer"][i],
+                "cimr_employer": values["cimr_employer"][i],
+                "total": values["employer_total"][i],
+            },
+            "net_salary": values["net_salary"][i],
+        }
+        for i, sim_input in enumerate(sim_inputs)
+    ]
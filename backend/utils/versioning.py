@@ -0,0 +1,45 @@
+"""
+Database-backed version counters for in-process caches (see models/cache_version.py).
+"""
+from datetime import datetime, timezone
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+from models.cache_version import CacheVersion
+
+
+def get_version(name, connection=None):
+    """Return the current version of a dataset (0 if it was never bumped)."""
+    connection = connection or db.session
+    version = connection.execute(
+        select(CacheVersion.version).where(CacheVersion.name == name)
+    ).scalar()
+    return version or 0
+
+
+def bump_version(name, connection=None):
+    """
+    Increment the version of a dataset.
+
+    Runs on `connection` (default: the current session) so the bump commits or
+    rolls back together with the change it announces.
+    """
+    connection = connection or db.session
+    table = CacheVersion.__table__
+    now = datetime.now(timezone.utc)
+    bind = connection.get_bind() if hasattr(connection, 'get_bind') else connection
+    dialect = bind.dialect.name
+
+    if dialect in ('postgresql', 'sqlite'):
+        dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = dialect_insert(table).values(name=name, version=1, updated_at=now)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=['name'],
+            set_={'version': table.c.version + 1, 'updated_at': now},
+        ))
+    else:
+        result = connection.execute(
+            update(table).where(table.c.name == name).values(version=table.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(name=name, version=1, updated_at=now))
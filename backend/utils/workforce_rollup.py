@@ -0,0 +1,220 @@
+"""
+Incremental maintenance of the workforce_rollup table (dashboard headcounts).
+
+Employees count in the month they were created; contracts count in the month
+they were created and under their expiration date, with their base salary.
+ORM inserts, updates and deletes adjust the rollup in the same transaction
+through mapper events; bulk statements that bypass the ORM (CSV import,
+employee deletion) apply their deltas explicitly with apply_workforce_deltas /
+subtract_contracts. rebuild_workforce_rollup() recomputes the whole table
+(backfill or repair).
+"""
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import Date, String, cast, delete, event, func, insert, inspect, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+from models.contract import Contract
+from models.employee import Employee
+from models.workforce_rollup import WorkforceRollup
+
+EMPLOYEES_CREATED = 'employees_created'
+CONTRACTS_CREATED = 'contracts_created'
+CONTRACTS_EXPIRING = 'contracts_expiring'
+# Bucket of the contracts without an expiration date
+OPEN_ENDED = date(9999, 12, 31)
+
+EMPLOYEE_TRACKED_FIELDS = ('created_at',)
+CONTRACT_TRACKED_FIELDS = ('created_at', 'expiration_date', 'base_salary')
+
+
+def _as_date(value):
+    # Attributes may still hold the strings the API assigned (e.g. '2025-01-31')
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value) if value else None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.date()
+    return value
+
+
+def month_bucket(value):
+    """First day of the (UTC) month of a date or datetime."""
+    value = _as_date(value) or datetime.now(timezone.utc).date()
+    return value.replace(day=1)
+
+
+def _to_decimal(value):
+    if value is None or value == '':
+        return Decimal('0')
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return Decimal('0')
+
+
+def _add(deltas, metric, bucket, sign, salary=Decimal('0')):
+    amounts = deltas[(metric, bucket)]
+    amounts['count'] = amounts.get('count', 0) + sign
+    amounts['salary_total'] = amounts.get('salary_total', Decimal('0')) + sign * salary
+
+
+def add_employee_delta(deltas, values, sign=1):
+    """Accumulate one employee (mapping with created_at) into `deltas`."""
+    _add(deltas, EMPLOYEES_CREATED, month_bucket(values.get('created_at')), sign)
+    return deltas
+
+
+def add_contract_delta(deltas, values, sign=1):
+    """Accumulate one contract (mapping with created_at, expiration_date, base_salary) into `deltas`."""
+    _add(deltas, CONTRACTS_CREATED, month_bucket(values.get('created_at')), sign)
+    _add(
+        deltas, CONTRACTS_EXPIRING, _as_date(values.get('expiration_date')) or OPEN_ENDED, sign,
+        salary=_to_decimal(values.get('base_salary')),
+    )
+    return deltas
+
+
+def apply_workforce_deltas(connection, deltas):
+    """
+    Add the given amounts to the rollup rows, creating rows that do not exist yet.
+
+    Args:
+        connection: Connection of the transaction that changed the rows
+        deltas: {(metric, bucket): {'count': n, 'salary_total': amount}}
+    """
+    table = WorkforceRollup.__table__
+    now = datetime.now(timezone.utc)
+    dialect = connection.dialect.name
+
+    for (metric, bucket), amounts in sorted(deltas.items()):
+        if not any(amounts.values()):
+            continue
+        key = {'metric': metric, 'bucket': bucket}
+        increments = {name: table.c[name] + amount for name, amount in amounts.items()}
+
+        if dialect in ('postgresql', 'sqlite'):
+            dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = dialect_insert(table).values(**key, **amounts, updated_at=now)
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=['metric', 'bucket'],
+                set_={**increments, 'updated_at': now},
+            ))
+        else:
+            result = connection.execute(
+                update(table).where(table.c.metric == metric, table.c.bucket == bucket)
+                .values(**increments, updated_at=now)
+            )
+            if result.rowcount == 0:
+                connection.execute(insert(table).values(**key, **amounts, updated_at=now))
+
+
+def subtract_contracts(connection, *criteria):
+    """
+    Remove the contracts matching `criteria` from the rollup.
+
+    Call it before a bulk DELETE of those contracts (query.delete() skips mapper events).
+    """
+    deltas = defaultdict(dict)
+    rows = connection.execute(
+        select(Contract.created_at, Contract.expiration_date, Contract.base_salary).where(*criteria)
+    ).mappings()
+    for row in rows:
+        add_contract_delta(deltas, row, sign=-1)
+    apply_workforce_deltas(connection, deltas)
+
+
+def _month_expression(column, dialect):
+    if dialect == 'postgresql':
+        return cast(func.date_trunc('month', func.timezone('UTC', column)), Date)
+    return func.date(column, 'start of month')
+
+
+def rebuild_workforce_rollup():
+    """Recompute the whole rollup table from employees and contracts. The caller commits."""
+    table = WorkforceRollup.__table__
+    dialect = db.session.get_bind().dialect.name
+    now = literal(datetime.now(timezone.utc)).label('updated_at')
+    columns = ['metric', 'bucket', 'count', 'salary_total', 'updated_at']
+
+    def aggregate(metric, bucket, model, salary=None):
+        return select(
+            literal(metric, String).label('metric'),
+            bucket.label('bucket'),
+            func.count().label('count'),
+            (func.coalesce(func.sum(salary), 0) if salary is not None else literal(0)).label('salary_total'),
+            now,
+        ).select_from(model).group_by(bucket)
+
+    db.session.execute(delete(table))
+    for metric, bucket, model, salary in (
+        (EMPLOYEES_CREATED, _month_expression(Employee.created_at, dialect), Employee, None),
+        (CONTRACTS_CREATED, _month_expression(Contract.created_at, dialect), Contract, None),
+        (CONTRACTS_EXPIRING, func.coalesce(Contract.expiration_date, OPEN_ENDED), Contract, Contract.base_salary),
+    ):
+        db.session.execute(insert(table).from_select(columns, aggregate(metric, bucket, model, salary)))
+
+
+def _changed_values(target, fields):
+    """(old values, new values) of the tracked fields, or None when none changed."""
+    state = inspect(target)
+    new_values = {name: getattr(target, name) for name in fields}
+    old_values = dict(new_values)
+    changed = False
+    for name in fields:
+        history = state.attrs[name].history
+        if history.has_changes():
+            changed = True
+            old_values[name] = history.deleted[0] if history.deleted else None
+    return (old_values, new_values) if changed else None
+
+
+@event.listens_for(Employee, 'after_insert')
+def _employee_after_insert(mapper, connection, target):
+    apply_workforce_deltas(connection, add_employee_delta(defaultdict(dict), {'created_at': target.created_at}))
+
+
+@event.listens_for(Employee, 'after_update')
+def _employee_after_update(mapper, connection, target):
+    changes = _changed_values(target, EMPLOYEE_TRACKED_FIELDS)
+    if changes:
+        deltas = add_employee_delta(defaultdict(dict), changes[0], sign=-1)
+        apply_workforce_deltas(connection, add_employee_delta(deltas, changes[1]))
+
+
+@event.listens_for(Employee, 'before_delete')
+def _employee_before_delete(mapper, connection, target):
+    apply_workforce_deltas(connection, add_employee_delta(defaultdict(dict), {'created_at': target.created_at}, sign=-1))
+
+
+@event.listens_for(Contract, 'after_insert')
+def _contract_after_insert(mapper, connection, target):
+    values = {name: getattr(target, name) for name in CONTRACT_TRACKED_FIELDS}
+    apply_workforce_deltas(connection, add_contract_delta(defaultdict(dict), values))
+
+
+@event.listens_for(Contract, 'after_update')
+def _contract_after_update(mapper, connection, target):
+    changes = _changed_values(target, CONTRACT_TRACKED_FIELDS)
+    if changes:
+        deltas = add_contract_delta(defaultdict(dict), changes[0], sign=-1)
+        apply_workforce_deltas(connection, add_contract_delta(deltas, changes[1]))
+
+
+@event.listens_for(Contract, 'before_delete')
+def _contract_before_delete(mapper, connection, target):
+    values = {name: getattr(target, name) for name in CONTRACT_TRACKED_FIELDS}
+    apply_workforce_deltas(connection, add_contract_delta(defaultdict(dict), values, sign=-1))
+
+
+def _track_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the previous value when a tracked attribute is assigned on an expired
+# instance, so after_update always knows what to subtract
+for _model, _fields in ((Employee, EMPLOYEE_TRACKED_FIELDS), (Contract, CONTRACT_TRACKED_FIELDS)):
+    for _name in _fields:
+        event.listen(getattr(_model, _name), 'set', _track_old_value, active_history=True, retval=True)
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { X, Loader2, FileText, Plus, Pencil, Trash2, Calendar, DollarSign, Building2, Briefcase, Clock, CheckCircle, Hash } from 'lucide-react';
 import { useContracts, useContractMutations } from '../hooks/useContracts';
+import { useCompanies } from '../hooks/useCompanies';
 import { mutate } from 'swr';
 
 export default function ContractModal({ employee, isOpen, onClose }) {
@@ -16,6 +17,9 @@ export default function ContractModal({ employee, isOpen, onClose }) {
   
   const { createContract, updateContract, deleteContract } = useContractMutations();
   
+  // Companies for the contract's employer (payroll runs and batch simulations use it)
+  const { companies } = useCompanies({}, { page: 1, limit: 100 });
+  
   // Helper function to convert backend date format to input date format
   const parseDateForInput = (dateString) => {
     if (!dateString) return '';
@@ -35,6 +39,7 @@ export default function ContractModal({ employee, isOpen, onClose }) {
   };
   
   const [formData, setFormData] = useState({
+    company_id: '',
     contract_type: 'CDI',
     hiring_date: '',
     expiration_date: '',
@@ -53,6 +58,7 @@ export default function ContractModal({ employee, isOpen, onClose }) {
       setIsCreating(false);
       setEditingContract(null);
       setFormData({
+        company_id: '',
         contract_type: 'CDI',
         hiring_date: '',
         expiration_date: '',
@@ -65,6 +71,7 @@ export default function ContractModal({ employee, isOpen, onClose }) {
       setErrors({});
     } else if (editingContract) {
       setFormData({
+        company_id: editingContract.company_id || '',
         contract_type: editingContract.contract_type || 'CDI',
         hiring_date: parseDateForInput(editingContract.hiring_date),
         expiration_date: parseDateForInput(editingContract.expiration_date),
@@ -87,6 +94,7 @@ export default function ContractModal({ employee, isOpen, onClose }) {
   
   const validateForm = () => {
     const newErrors = {};
+    if (!formData.company_id) newErrors.company_id = 'Company is required';
     if (!formData.hiring_date) newErrors.hiring_date = 'Hiring date is required';
     if (!formData.position.trim()) newErrors.position = 'Position is required';
     if (!formData.department.trim()) newErrors.department = 'Department is required';
@@ -105,6 +113,7 @@ export default function ContractModal({ employee, isOpen, onClose }) {
     try {
       const payload = {
         employee_id: employee.id,
+        company_id: Number(formData.company_id),
         contract_type: formData.contract_type,
         hiring_date: formData.hiring_date,
         position: formData.position.trim(),
@@ -142,6 +151,7 @@ export default function ContractModal({ employee, isOpen, onClose }) {
       
       // Reset form after successful submission
       setFormData({
+        company_id: '',
         contract_type: 'CDI',
         hiring_date: '',
         expiration_date: '',
@@ -177,6 +187,7 @@ export default function ContractModal({ employee, isOpen, onClose }) {
     setIsCreating(false);
     setEditingContract(null);
     setFormData({
+      company_id: '',
       contract_type: 'CDI',
       hiring_date: '',
       expiration_date: '',
@@ -239,6 +250,30 @@ export default function ContractModal({ employee, isOpen, onClose }) {
                 </h3>
                 <form onSubmit={handleSubmit} className="space-y-4">
                   <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
+                    <div>
+                      <label className="block text-sm font-medium text-gray-700 mb-1">
+                        Company <span className="text-red-500">*</span>
+                      </label>
+                      <select
+                        name="company_id"
+                        value={formData.company_id}
+                        onChange={handleChange}
+                        className={`w-full px-3 py-2 border rounded-lg focus:outline-none focus:ring-2 focus:ring-indigo-500 ${
+                          errors.company_id ? 'border-red-500' : 'border-gray-300'
+                        }`}
+                      >
+                        <option value="">Select a company</option>
+                        {companies.map((company) => (
+                          <option key={company.id} value={company.id}>
+                            {company.company_name}
+                          </option>
+                        ))}
+                      </select>
+                      {errors.company_id && (
+                        <p className="mt-1 text-xs text-red-500">{errors.company_id}</p>
+                      )}
+                    </div>
+                    
                     <div>
                       <label className="block text-sm font-medium text-gray-700 mb-1">
                         Contract Type <span className="text-red-500">*</span>
@@ -50,26 +50,10 @@ export const usePayrollSimulation = () => {
     }
   );
 
-  // Bulk payroll simulation - since backend doesn't have bulk endpoint, we simulate multiple times
+  // Bulk payroll simulation - all employees are simulated server-side in one request
   const simulateBulkPayrollMutation = async (employeesData) => {
-    const results = [];
-    const errors = [];
-    
-    for (const empData of employeesData) {
-      try {
-        const response = await api.post('/simulation/preview', empData);
-        results.push({
-          employee_id: empData.employee_id,
-          simulation: response.data.simulation
-        });
-      } catch (error) {
-        console.error(`Error simulating for employee ${empData.employee_id}:`, error);
-        errors.push({
-          employee_id: empData.employee_id,
-          error: error.response?.data?.error || 'Simulation failed'
-        });
-      }
-    }
+    const response = await api.post('/simulation/batch', { inputs: employeesData });
+    const { results = [], errors = [] } = response.data;
     
     if (errors.length > 0 && results.length === 0) {
       throw new Error(`All simulations failed. First error: ${errors[0].error}`);
@@ -112,7 +96,6 @@ export const usePayrollSimulation = () => {
   };
 
   const simulateBulkPayroll = async (params) => {
-    // Backend doesn't support bulk, so we simulate each employee
     const { employees } = params;
     if (!employees || employees.length === 0) {
       throw new Error('No employees provided for bulk simulation');